@@ -0,0 +1,103 @@
+"""
+Compare sorting accessions into sets one regex at a time with a single pass.
+
+Generate a million mixed accessions, a few of them invalid, and time both:
+
+    python benchmarks/accession_classification.py --accessions 1000000
+
+"""
+
+
+import argparse
+import random
+import re
+import sys
+import time
+from typing import List
+
+from ffqf.application.service import SetBuilder
+
+
+PREFIXES = (
+    ["SRR", "ERR", "DRR"] * 20
+    + ["SRX", "ERX", "SRS", "ERS", "SRP", "ERP", "SRA", "ERA"]
+    + ["PRJNA", "PRJEB", "SAMN", "SAMEA", "GSE", "GSM"]
+)
+
+
+def generate(total: int, invalid_fraction: float, seed: int = 42) -> List[str]:
+    rng = random.Random(seed)
+    result = [
+        f"{rng.choice(PREFIXES)}{rng.randrange(1, 30_000_000)}" for _ in range(total)
+    ]
+    for index in rng.sample(range(total), int(total * invalid_fraction)):
+        result[index] = f"XYZ{index}"
+    return result
+
+
+class SequentialSetBuilder(SetBuilder):
+    """Classify accessions as before, trying one pattern after another."""
+
+    study_pattern = re.compile(r"^(SR|ER|DR)P")
+    sample_pattern = re.compile(r"^(SR|ER|DR)S")
+    experiment_pattern = re.compile(r"^(SR|ER|DR)X")
+    run_pattern = re.compile(r"^(SR|ER|DR)R")
+    submission_pattern = re.compile(r"^(SR|ER|DR)A")
+
+    def from_accessions(self, accessions, *, strict=True) -> List[str]:
+        invalid = []
+        for acc in accessions:
+            if acc.startswith("PRJ"):
+                self.bio_projects.add(acc)
+            elif acc.startswith("SAM"):
+                self.bio_samples.add(acc)
+            elif self.study_pattern.match(acc):
+                self.studies.add(acc)
+            elif self.sample_pattern.match(acc):
+                self.samples.add(acc)
+            elif self.experiment_pattern.match(acc):
+                self.experiments.add(acc)
+            elif self.run_pattern.match(acc):
+                self.runs.add(acc)
+            elif self.submission_pattern.match(acc):
+                self.submissions.add(acc)
+            elif acc.startswith("GSE"):
+                self.geo_series.add(acc)
+            elif acc.startswith("GSM"):
+                self.geo_samples.add(acc)
+            else:
+                invalid.append(acc)
+        return invalid
+
+
+def measure(builder: SetBuilder, accessions: List[str]) -> float:
+    start = time.perf_counter()
+    invalid = builder.from_accessions(accessions, strict=False)
+    duration = time.perf_counter() - start
+    assert len(invalid) > 0
+    return duration
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--accessions", type=int, default=1_000_000)
+    parser.add_argument("--invalid", type=float, default=0.001)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    accessions = generate(args.accessions, args.invalid)
+    for name, builder in [
+        ("sequential", SequentialSetBuilder()),
+        ("single pass", SetBuilder()),
+    ]:
+        duration = measure(builder, accessions)
+        print(
+            f"{name:>12}: {duration:6.2f} s "
+            f"({1e6 * duration / len(accessions):.2f} µs per accession)"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,121 @@
+"""
+Compare the JSON and TSV wire formats of the ENA portal API.
+
+Record a `read_run` search result for some accessions in both formats once:
+
+    python benchmarks/ena_api_portal_wire_format.py record PRJNA63661 -d fixtures/
+
+Then compare transferred bytes and parse times on the recorded responses:
+
+    python benchmarks/ena_api_portal_wire_format.py compare -d fixtures/
+
+"""
+
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import List
+
+import anyio
+import httpx
+
+from ffqf.domain.model import RunInformation
+from ffqf.infrastructure.application.service import ENAAPIPortalSettings
+from ffqf.infrastructure.application.service.ena_api_portal import (
+    ENAAPIPortalRecordParser,
+)
+
+
+FORMATS = ("json", "tsv")
+
+
+def record(accessions: List[str], directory: Path) -> None:
+    """Record the portal's responses in both formats."""
+    settings = ENAAPIPortalSettings()
+    directory.mkdir(parents=True, exist_ok=True)
+    for response_format in FORMATS:
+        response = httpx.post(
+            f"{settings.api_url}search",
+            data={
+                "dataPortal": "ena",
+                "fields": ",".join(settings.fields),
+                "format": response_format,
+                "includeAccessions": ",".join(accessions),
+                "limit": 0,
+                "result": "read_run",
+            },
+            timeout=settings.timeout,
+        )
+        response.raise_for_status()
+        path = directory / f"read_run.{response_format}"
+        path.write_bytes(response.content)
+        print(f"Recorded {len(response.content):,} bytes to '{path}'.")
+
+
+def parse_incrementally(body: bytes, chunk_size: int = 2**16) -> int:
+    """Parse a body in chunks as they would arrive over the network."""
+
+    async def chunks():
+        for start in range(0, len(body), chunk_size):
+            yield body[start : start + chunk_size]
+
+    async def count() -> int:
+        result = 0
+        async for record in ENAAPIPortalRecordParser.iter_any_records(chunks()):
+            RunInformation.parse_obj(record)
+            result += 1
+        return result
+
+    return anyio.run(count)
+
+
+def compare(directory: Path, repeat: int) -> None:
+    """Compare bytes and parse times of the recorded responses."""
+    print(
+        f"{'format':<8}{'records':>10}{'bytes':>14}{'decode [s]':>14}"
+        f"{'stream [s]':>14}"
+    )
+    for response_format in FORMATS:
+        body = (directory / f"read_run.{response_format}").read_bytes()
+        response = httpx.Response(
+            status_code=200,
+            content=body,
+            request=httpx.Request("POST", ENAAPIPortalSettings().api_url),
+        )
+        num_records = len(ENAAPIPortalRecordParser.parse_records(response))
+        decode = min(
+            timeit.repeat(
+                lambda: ENAAPIPortalRecordParser.parse_records(response),
+                number=1,
+                repeat=repeat,
+            )
+        )
+        stream = min(
+            timeit.repeat(lambda: parse_incrementally(body), number=1, repeat=repeat)
+        )
+        print(
+            f"{response_format:<8}{num_records:>10,}{len(body):>14,}{decode:>14.4f}"
+            f"{stream:>14.4f}"
+        )
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record")
+    record_parser.add_argument("accessions", nargs="+")
+    record_parser.add_argument("-d", "--directory", type=Path, default=Path("."))
+    compare_parser = subparsers.add_parser("compare")
+    compare_parser.add_argument("-d", "--directory", type=Path, default=Path("."))
+    compare_parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        record(args.accessions, args.directory)
+    else:
+        compare(args.directory, args.repeat)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
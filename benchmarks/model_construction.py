@@ -0,0 +1,105 @@
+"""
+Compare validating run information records with trusting them.
+
+Generate ENA-like records with one file each, as many per study as is typical, and
+measure the time and memory needed to turn them into models:
+
+    python benchmarks/model_construction.py --runs 100000
+
+"""
+
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+from ffqf.domain.model import RunInformation
+
+
+def generate(total: int, runs_per_study: int = 50) -> List[Dict[str, Any]]:
+    """Create records with fresh string objects, as a JSON parser would."""
+    result = []
+    for index in range(total):
+        study = index // runs_per_study
+        result.append(
+            {
+                "run_accession": f"SRR{index + 1000000}",
+                "experiment_accession": f"SRX{index + 1000000}",
+                "sample_accession": f"SAMN{index + 1000000}",
+                "secondary_sample_accession": f"SRS{index + 1000000}",
+                "submission_accession": f"SRA{study + 100000}",
+                "study_accession": f"PRJNA{study + 100000}",
+                "secondary_study_accession": f"SRP{study + 100000}",
+                "study_title": f"A study of {study} Escherichia coli strains",
+                "tax_id": str(562 + index % 2),
+                "scientific_name": "".join("Escherichia coli"),
+                "instrument_platform": "".join("ILLUMINA"),
+                "instrument_model": "".join("Illumina HiSeq 2000"),
+                "library_layout": "".join("PAIRED"),
+                "library_strategy": "".join("WGS"),
+                "library_source": "".join("GENOMIC"),
+                "library_selection": "".join("RANDOM"),
+                "read_count": str(1000000 + index),
+                "base_count": str(200000000 + index),
+                "files": [
+                    {
+                        "name": f"SRR{index + 1000000}",
+                        "type": "".join("sra"),
+                        "size": 205301853,
+                        "md5": f"{index:032x}",
+                        "url": f"s3://sra-pub-run-odp/sra/SRR{index + 1000000}",
+                        "urltype": "aws",
+                        "region": "".join("us-east-1"),
+                    }
+                ],
+            }
+        )
+    return result
+
+
+def measure_time(total: int, strict: bool) -> float:
+    """Return the time in seconds to create the models."""
+    records = generate(total)
+    start = time.perf_counter()
+    for record in records:
+        RunInformation.from_record(record, strict=strict)
+    return time.perf_counter() - start
+
+
+def measure_memory(total: int, strict: bool) -> int:
+    """Return the memory in bytes retained by the models once records are gone."""
+    gc.collect()
+    tracemalloc.start()
+    records = generate(total)
+    models = [RunInformation.from_record(record, strict=strict) for record in records]
+    del records
+    gc.collect()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(models) == total
+    return memory
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--runs", type=int, default=100_000)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    scale = 100_000 / args.runs
+    for name, strict in [("strict", True), ("trusted", False)]:
+        duration = measure_time(args.runs, strict)
+        memory = measure_memory(args.runs, strict)
+        print(
+            f"{name:>8}: {scale * duration:6.2f} s and "
+            f"{scale * memory / 2 ** 20:6.1f} MiB per 100k runs"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,110 @@
+"""
+Compare request throughput for different connection pool configurations.
+
+By default, a local HTTP/1.1 server is started in a background thread:
+
+    python benchmarks/request_throughput.py --requests 2000 --concurrency 10
+
+HTTP/2 needs the `h2` package and a server that speaks it, for example:
+
+    python benchmarks/request_throughput.py --url https://localhost:8443/ --http2
+
+"""
+
+
+import argparse
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator
+
+import anyio
+
+from ffqf.infrastructure.application.service import (
+    ENAAPIPortalRequestService,
+    ENAAPIPortalSettings,
+)
+
+
+BODY = b'[{"run_accession":"SRR390277"}]'
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid delayed ACK stalls.
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def serve() -> str:
+    """Start a local server and return its URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/"
+
+
+def configurations(args: argparse.Namespace) -> Iterator[Dict[str, object]]:
+    yield {"name": "no keep-alive", "max_keepalive_connections": 0}
+    yield {"name": "keep-alive pool"}
+    if args.http2:
+        yield {"name": "HTTP/2", "http2": True}
+
+
+async def measure(settings: ENAAPIPortalSettings, total: int) -> float:
+    """Return the achieved number of requests per second."""
+    service = ENAAPIPortalRequestService(settings=settings)
+    requests = [service.client.build_request("GET", "search") for _ in range(total)]
+    async with service:
+        start = time.perf_counter()
+        async with anyio.create_task_group() as group:
+            for request in requests:
+                group.start_soon(service._make_request, service.client, request)
+        return total / (time.perf_counter() - start)
+
+
+def measure_construction(repeats: int) -> float:
+    """Return the time in milliseconds to construct a request service."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        ENAAPIPortalRequestService(settings=ENAAPIPortalSettings())
+    return 1e3 * (time.perf_counter() - start) / repeats
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--url", help="Benchmark this server instead of a local one.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--http2", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    url = args.url or serve()
+    print(f"Construct a request service: {measure_construction(20):.1f} ms")
+    for config in configurations(args):
+        name = config.pop("name")
+        settings = ENAAPIPortalSettings(
+            api_url=url, concurrency=args.concurrency, **config
+        )
+        # Warm up such that connections exist before measuring.
+        anyio.run(measure, settings, args.concurrency)
+        rate = anyio.run(measure, settings, args.requests)
+        print(f"{name:>16}: {rate:8.0f} requests/s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,16 +1,40 @@
 import logging
+import math
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
 from functools import partial
-from typing import Dict, Iterable, List, Type
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
 
 import anyio
 import httpx
+from anyio.abc import TaskGroup
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 
-from ffqf.domain.model import FileDescription, INSDCRunSet, RunInformation
+from ffqf.domain.model import (
+    AbstractAccessionSet,
+    FileDescription,
+    INSDCRunSet,
+    RunInformation,
+)
 
 from .service import (
     FileLinkService,
+    MappingCache,
     MappingService,
     RequestService,
+    RunInformationCache,
     RunInformationService,
     SetBuilder,
 )
@@ -29,10 +53,18 @@ class RunInformationApplication:
         insdc_sample_mapping_service: Type[MappingService],
         insdc_experiment_mapping_service: Type[MappingService],
         insdc_submission_mapping_service: Type[MappingService],
+        geo_mapping_service: Optional[Type[MappingService]] = None,
         run_information_service: Type[RunInformationService],
         file_link_service: Type[FileLinkService],
         ena_request_service: RequestService,
         ncbi_request_service: RequestService,
+        run_information_request_service: Optional[RequestService] = None,
+        run_information_cache: Optional[RunInformationCache] = None,
+        mapping_cache: Optional[MappingCache] = None,
+        refresh_mappings: bool = False,
+        fused_mapping: bool = False,
+        strict: bool = False,
+        linger: float = 0.5,
         **kwargs
     ) -> None:
         """"""
@@ -43,153 +75,481 @@ class RunInformationApplication:
         self.insdc_sample_mapping_service = insdc_sample_mapping_service
         self.insdc_experiment_mapping_service = insdc_experiment_mapping_service
         self.insdc_submission_mapping_service = insdc_submission_mapping_service
+        self.geo_mapping_service = geo_mapping_service
         self.run_information_service = run_information_service
         self.file_link_service = file_link_service
         self.ena_request_service = ena_request_service
         self.ncbi_request_service = ncbi_request_service
+        # The service through which run information is retrieved, ENA by default.
+        self.run_information_request_service = (
+            ena_request_service
+            if run_information_request_service is None
+            else run_information_request_service
+        )
+        self.run_information_cache = run_information_cache
+        self.mapping_cache = mapping_cache
+        self.refresh_mappings = refresh_mappings
+        # Whether mapping requests also retrieve the information on the runs.
+        self.fused_mapping = fused_mapping
+        # Whether responses from the archives are validated before use.
+        self.strict = strict
+        self.linger = linger
+        # Accessions that could not be retrieved with the reason why.
+        self.failures: Dict[str, str] = {}
+        # All accessions that were given so far.
         self.builder = SetBuilder()
 
     async def run(self, accessions: Iterable[str]) -> List[RunInformation]:
-        """"""
-        self.builder.from_accessions(accessions)
-
-        async with self.ena_request_service, self.ncbi_request_service:
-            logger.info("Map all accessions to run accessions.")
-            runs = await self._map2runs()
-            logger.info("Get run information for %d accessions.", len(runs))
-            result = await self._get_run_information(runs)
+        """Retrieve run information for all runs related to the given accessions."""
+        result: List[RunInformation] = []
+        send_results, receive_results = anyio.create_memory_object_stream(math.inf)
+        async with anyio.create_task_group() as group:
+            group.start_soon(self.stream, accessions, send_results)
+            async with receive_results:
+                async for run in receive_results:
+                    result.append(run)
         return result
 
-    async def _map2runs(self) -> INSDCRunSet:
-        ena_requests = []
-        ncbi_requests = []
-        ena_processors = []
-        ncbi_processors = []
-        if self.builder.bio_projects:
-            if self.bio_project_mapping_service.__name__.startswith("ENA"):
-                ena_requests.append(
-                    self.bio_project_mapping_service.prepare_request(
-                        self.ena_request_service, self.builder.bio_projects
-                    )
-                )
-                ena_processors.append(
-                    partial(
-                        self.bio_project_mapping_service.parse_run_set,
-                        accessions=self.builder.bio_projects,
-                    )
-                )
+    async def stream(
+        self, accessions: Iterable[str], send_results: MemoryObjectSendStream
+    ) -> None:
+        """
+        Send run information on all runs related to the given accessions as it
+        becomes available.
 
-        if self.builder.bio_samples:
-            if self.bio_sample_mapping_service.__name__.startswith("ENA"):
-                ena_requests.append(
-                    self.bio_sample_mapping_service.prepare_request(
-                        self.ena_request_service, self.builder.bio_samples
-                    )
-                )
-                ena_processors.append(
-                    partial(
-                        self.bio_sample_mapping_service.parse_run_set,
-                        accessions=self.builder.bio_samples,
-                    )
-                )
+        Mapping to runs and retrieving run information are pipelined: As soon as any
+        run accessions are known, their information is requested while other
+        accessions may still be mapped. The given stream is closed once all runs
+        were sent.
 
-        if self.builder.studies:
-            if self.insdc_study_mapping_service.__name__.startswith("ENA"):
-                ena_requests.append(
-                    self.insdc_study_mapping_service.prepare_request(
-                        self.ena_request_service, self.builder.studies
-                    )
-                )
-                ena_processors.append(
-                    partial(
-                        self.insdc_study_mapping_service.parse_run_set,
-                        accessions=self.builder.studies,
-                    )
-                )
+        """
 
-        if self.builder.samples:
-            if self.insdc_sample_mapping_service.__name__.startswith("ENA"):
-                ena_requests.append(
-                    self.insdc_sample_mapping_service.prepare_request(
-                        self.ena_request_service, self.builder.samples
-                    )
-                )
-                ena_processors.append(
-                    partial(
-                        self.insdc_sample_mapping_service.parse_run_set,
-                        accessions=self.builder.samples,
-                    )
-                )
+        async def single_window() -> AsyncIterator[Iterable[str]]:
+            yield accessions
 
-        if self.builder.experiments:
-            if self.insdc_experiment_mapping_service.__name__.startswith("ENA"):
-                ena_requests.append(
-                    self.insdc_experiment_mapping_service.prepare_request(
-                        self.ena_request_service, self.builder.experiments
-                    )
-                )
-                ena_processors.append(
-                    partial(
-                        self.insdc_experiment_mapping_service.parse_run_set,
-                        accessions=self.builder.experiments,
-                    )
-                )
+        await self.stream_windows(single_window(), send_results)
+
+    async def stream_windows(
+        self,
+        windows: AsyncIterable[Iterable[str]],
+        send_results: MemoryObjectSendStream,
+    ) -> None:
+        """
+        Send run information on all runs related to windows of accessions.
+
+        Each window is classified and mapped as soon as it arrives, such that
+        retrieval starts while later windows are still being read. Accessions that
+        occurred in earlier windows are skipped.
+
+        """
+        send_runs, receive_runs = anyio.create_memory_object_stream(math.inf)
+        async with send_results, self.ena_request_service, self.ncbi_request_service:
+            async with anyio.create_task_group() as group:
+                group.start_soon(self._dispatch_runs, group, receive_runs, send_results)
+                async with send_runs:
+                    async for accessions in windows:
+                        window = SetBuilder()
+                        self._report_failures(
+                            window.from_accessions(accessions, strict=False),
+                            "invalid or unrecognized accession",
+                        )
+                        window = self.builder.update_new(window)
+                        # Runs that were given explicitly need not be mapped.
+                        await send_runs.send(window.runs)
+                        group.start_soon(self._map2runs, window, send_runs.clone())
+
+    async def _dispatch_runs(
+        self,
+        group: TaskGroup,
+        receive_runs: MemoryObjectReceiveStream,
+        send_results: MemoryObjectSendStream,
+    ) -> None:
+        """
+        Start retrieving information on runs as they become known.
 
-        if self.builder.submissions:
-            if self.insdc_submission_mapping_service.__name__.startswith("ENA"):
-                ena_requests.append(
-                    self.insdc_submission_mapping_service.prepare_request(
-                        self.ena_request_service, self.builder.submissions
+        Runs are deduplicated and collected into chunks. A chunk that is not yet full
+        is dispatched after lingering for a short while, or once mapping is done.
+        Lists of run information that were retrieved while mapping only lack file
+        links and are dispatched immediately.
+
+        """
+        chunk_size = self.run_information_request_service.scale_chunk_size(
+            self.run_information_request_service.settings.chunk_size
+        )
+        scheduled = INSDCRunSet()
+        pending = INSDCRunSet()
+        async with receive_runs:
+            while True:
+                with anyio.move_on_after(self.linger if pending else math.inf):
+                    try:
+                        runs = await receive_runs.receive()
+                    except anyio.EndOfStream:
+                        break
+                    if isinstance(runs, list):
+                        resolved = {
+                            run.run_accession: run
+                            for run in runs
+                            if run.run_accession not in scheduled
+                        }
+                        scheduled.update(resolved)
+                        group.start_soon(
+                            self._send_mapped_run_information,
+                            list(resolved.values()),
+                            send_results,
+                        )
+                        continue
+                    new_runs = runs.difference(scheduled)
+                    scheduled.update(new_runs)
+                    # Only runs missing from the cache need to be requested.
+                    pending.update(
+                        self._send_cached_runs(group, new_runs, send_results)
                     )
+                    if len(pending) < chunk_size:
+                        continue
+                self._schedule_runs(group, pending, send_results)
+                pending = INSDCRunSet()
+        self._schedule_runs(group, pending, send_results)
+
+    def _send_cached_runs(
+        self,
+        group: TaskGroup,
+        runs: INSDCRunSet,
+        send_results: MemoryObjectSendStream,
+    ) -> INSDCRunSet:
+        """Send cached run information and return the runs that were not cached."""
+        if self.run_information_cache is None or not runs:
+            return runs
+        cached = self.run_information_cache.get_many(runs)
+        if not cached:
+            return runs
+        logger.info("Found information on %d runs in the cache.", len(cached))
+        group.start_soon(self._send_all, cached, send_results)
+        return runs.difference(run.run_accession for run in cached)
+
+    @classmethod
+    async def _send_all(
+        cls, run_info: List[RunInformation], send_results: MemoryObjectSendStream
+    ) -> None:
+        for run in run_info:
+            await send_results.send(run)
+
+    def _schedule_runs(
+        self,
+        group: TaskGroup,
+        runs: INSDCRunSet,
+        send_results: MemoryObjectSendStream,
+    ) -> None:
+        if not runs:
+            return
+        logger.info("Get run information for %d accessions.", len(runs))
+        chunk_size = self.run_information_request_service.scale_chunk_size(
+            self.run_information_request_service.settings.chunk_size
+        )
+        for chunk in runs.chunks(chunk_size):
+            group.start_soon(self._send_run_information, chunk, send_results)
+
+    async def _send_run_information(
+        self, runs: INSDCRunSet, send_results: MemoryObjectSendStream
+    ) -> None:
+        run_info = await self._get_run_information(runs)
+        self._cache_run_information(run_info)
+        await self._send_all(run_info, send_results)
+
+    async def _send_mapped_run_information(
+        self, run_info: List[RunInformation], send_results: MemoryObjectSendStream
+    ) -> None:
+        if not run_info:
+            return
+        await self._add_file_links(run_info)
+        self._cache_run_information(run_info)
+        await self._send_all(run_info, send_results)
+
+    def _cache_run_information(self, run_info: List[RunInformation]) -> None:
+        """Cache run information unless retrieving the run's file links failed."""
+        if self.run_information_cache is None:
+            return
+        # Such runs would otherwise lack their file links until the entry expires.
+        self.run_information_cache.put_many(
+            [run for run in run_info if run.run_accession not in self.failures]
+        )
+
+    def _get_mapping_tasks(
+        self, builder: SetBuilder
+    ) -> List[Tuple[Type[MappingService], RequestService, AbstractAccessionSet]]:
+        """Pair each mapping service with its API and the accessions to map."""
+        tasks = [
+            (service, self.ena_request_service, accessions)
+            for service, accessions in [
+                (self.bio_project_mapping_service, builder.bio_projects),
+                (self.bio_sample_mapping_service, builder.bio_samples),
+                (self.insdc_study_mapping_service, builder.studies),
+                (self.insdc_sample_mapping_service, builder.samples),
+                (self.insdc_experiment_mapping_service, builder.experiments),
+                (self.insdc_submission_mapping_service, builder.submissions),
+            ]
+        ]
+        for accessions in (builder.geo_series, builder.geo_samples):
+            if not accessions:
+                continue
+            if self.geo_mapping_service is None:
+                self._report_failures(accessions, "no GEO mapping service configured")
+                continue
+            tasks.append(
+                (self.geo_mapping_service, self.ncbi_request_service, accessions)
+            )
+        return tasks
+
+    async def _map2runs(
+        self, builder: SetBuilder, send_runs: MemoryObjectSendStream
+    ) -> None:
+        """Map accessions to runs and pass on each set of runs as it is parsed."""
+        async with send_runs:
+            await self._send_mapped_runs(builder, send_runs)
+
+    async def _send_mapped_runs(
+        self, builder: SetBuilder, send_runs: MemoryObjectSendStream
+    ) -> None:
+        chunks = []
+        for service, request_service, accessions in self._get_mapping_tasks(builder):
+            if not accessions:
+                continue
+            chunks.extend(
+                (service, request_service, chunk, since)
+                for since, chunk in await self._get_mapping_chunks(
+                    service, request_service, accessions, send_runs
                 )
-                ena_processors.append(
+            )
+        if not chunks:
+            return
+        logger.info("Map accessions to runs in %d chunks.", len(chunks))
+        # The request services limit how many requests are in flight. Mapping on
+        # different APIs thus happens concurrently.
+        async with anyio.create_task_group() as group:
+            for service, request_service, chunk, since in chunks:
+                group.start_soon(
+                    self._isolate_failures,
+                    chunk,
                     partial(
-                        self.insdc_submission_mapping_service.parse_run_set,
-                        accessions=self.builder.submissions,
-                    )
+                        self._map_chunk, service, request_service, since, send_runs
+                    ),
                 )
 
-        # Collect all responses.
-        ena_responses = await self.ena_request_service.perform_requests(ena_requests)
-        # Parse run accessions from responses with the correct processors.
-        runs = INSDCRunSet()
-        for proc, response in zip(ena_processors, ena_responses):
-            runs.update(proc(response))
-        return runs
+    async def _get_mapping_chunks(
+        self,
+        service: Type[MappingService],
+        request_service: RequestService,
+        accessions: AbstractAccessionSet,
+        send_runs: MemoryObjectSendStream,
+    ) -> List[Tuple[Optional[date], AbstractAccessionSet]]:
+        """
+        Split the accessions that need to be mapped to runs into chunks.
 
-    async def _get_run_information(self, runs: INSDCRunSet) -> List[RunInformation]:
-        ena_request = self.run_information_service.prepare_request(
-            self.ena_request_service, runs
+        Each chunk is sent as its own request such that no single response grows
+        with the size of the input. With a mapping cache, runs of cached accessions
+        are sent immediately and expired entries are only checked for runs that
+        were made public since they were fetched.
+
+        """
+        chunk_size = service.get_chunk_size(request_service)
+        if self.mapping_cache is None:
+            return [(None, chunk) for chunk in accessions.chunks(chunk_size)]
+        cached = self.mapping_cache.get_many(accessions)
+        if cached:
+            logger.info("Found runs of %d accessions in the cache.", len(cached))
+            runs = INSDCRunSet()
+            for mapping in cached.values():
+                runs.update(mapping.runs)
+            await send_runs.send(runs)
+        # Allow for a day of overlap since release dates lack a time of day.
+        by_since: Dict[Optional[date], AbstractAccessionSet] = defaultdict(
+            type(accessions)
         )
-        ncbi_request = self.file_link_service.prepare_request(
-            self.ncbi_request_service, runs
+        for acc in accessions:
+            mapping = cached.get(acc)
+            if mapping is None:
+                by_since[None].add(acc)
+            elif mapping.is_expired or self.refresh_mappings:
+                by_since[(mapping.fetched_at - timedelta(days=1)).date()].add(acc)
+        return [
+            (since, chunk)
+            for since, subset in by_since.items()
+            for chunk in subset.chunks(chunk_size)
+        ]
+
+    async def _map_chunk(
+        self,
+        service: Type[MappingService],
+        request_service: RequestService,
+        since: Optional[date],
+        send_runs: MemoryObjectSendStream,
+        accessions: AbstractAccessionSet,
+        done: Set[str],
+    ) -> None:
+        fetched_at = datetime.now(timezone.utc)
+        run_info: List[RunInformation] = []
+        if self.fused_mapping and service.provides_run_information:
+            mapping, run_info = await service.map_run_information(
+                request_service, accessions, strict=self.strict, since=since
+            )
+        else:
+            mapping = await service.map_accessions(
+                request_service, accessions, since=since
+            )
+        if since is None:
+            # Accessions without any runs are treated as failed.
+            mapping = {acc: runs for acc, runs in mapping.items() if runs}
+        elif self.mapping_cache is not None:
+            # Only runs made public since the last fetch were requested.
+            cached = self.mapping_cache.get_many(mapping)
+            for acc, new_runs in mapping.items():
+                if acc in cached:
+                    new_runs.update(cached[acc].runs)
+        if self.mapping_cache is not None:
+            self.mapping_cache.put_many(mapping, fetched_at=fetched_at)
+        runs = INSDCRunSet()
+        for new_runs in mapping.values():
+            runs.update(new_runs)
+        done.update(mapping)
+        if run_info:
+            # Sent first, such that these runs are not requested again.
+            await send_runs.send(run_info)
+        await send_runs.send(runs)
+
+    async def _isolate_failures(
+        self,
+        accessions: AbstractAccessionSet,
+        attempt: Callable[[AbstractAccessionSet, Set[str]], Awaitable[None]],
+    ) -> None:
+        """
+        Attempt to retrieve accessions and retry the ones that were not completed.
+
+        The attempt adds every accession that it completed to the given set. If its
+        request fails or the response lacks some accessions, the remaining ones are
+        split in halves that are retried recursively. Thus, a few bad accessions are
+        isolated in a logarithmic number of requests while all other results of a
+        batch are kept. Accessions that fail on their own are reported.
+
+        """
+        done: Set[str] = set()
+        try:
+            await attempt(accessions, done)
+            reason = "missing from the response"
+        except (httpx.HTTPError, ValueError) as error:
+            reason = f"{type(error).__name__}: {error}"
+        remaining = accessions.difference(done)
+        if not remaining:
+            return
+        if len(accessions) == 1:
+            self._report_failures(remaining, reason)
+            return
+        logger.warning(
+            "Retry %d of %d accessions in smaller batches since %s.",
+            len(remaining),
+            len(accessions),
+            reason,
         )
+        async with anyio.create_task_group() as group:
+            for part in remaining.chunks(math.ceil(len(remaining) / 2)):
+                group.start_soon(self._isolate_failures, part, attempt)
+
+    def _report_failures(self, accessions: Iterable[str], reason: str) -> None:
+        for acc in accessions:
+            logger.error("Failed to retrieve %s: %s", acc, reason)
+            self.failures[acc] = reason
+
+    async def _get_run_information(self, runs: INSDCRunSet) -> List[RunInformation]:
         run_info: List[RunInformation] = []
         file_links: Dict[str, List[FileDescription]] = {}
         async with anyio.create_task_group() as group:
-            group.start_soon(self._wrap_run_info, [ena_request], runs, run_info)
-            # Enrich with AWS and GCP links.
-            group.start_soon(self._wrap_file_links, [ncbi_request], runs, file_links)
+            for chunk in runs.chunks(
+                self.run_information_request_service.scale_chunk_size(
+                    self.run_information_request_service.settings.chunk_size
+                )
+            ):
+                group.start_soon(
+                    self._isolate_failures,
+                    chunk,
+                    partial(self._get_run_info_chunk, run_info),
+                )
+            # Enrich with AWS and GCP links unless run information suffices.
+            if not (
+                self.run_information_service.provides_file_links
+                or self.file_link_service.from_run_information
+            ):
+                self._start_file_link_batches(group, runs, file_links)
         for run in run_info:
             run.files.extend(file_links.get(run.run_accession, []))
         return run_info
 
-    async def _wrap_run_info(
+    async def _add_file_links(self, run_info: List[RunInformation]) -> None:
+        """Add file links to run information that was retrieved while mapping."""
+        if self.file_link_service.from_run_information:
+            for run in run_info:
+                run.files.extend(
+                    self.file_link_service.parse_run_information(run, self.strict)
+                )
+            return
+        runs = INSDCRunSet()
+        runs.update(run.run_accession for run in run_info)
+        file_links: Dict[str, List[FileDescription]] = {}
+        async with anyio.create_task_group() as group:
+            self._start_file_link_batches(group, runs, file_links)
+        for run in run_info:
+            run.files.extend(file_links.get(run.run_accession, []))
+
+    def _start_file_link_batches(
         self,
-        requests: List[httpx.Request],
+        group: TaskGroup,
         runs: INSDCRunSet,
-        run_info: List[RunInformation],
+        file_links: Dict[str, List[FileDescription]],
     ) -> None:
-        """"""
-        responses = await self.ena_request_service.perform_requests(requests)
-        run_info.extend(self.run_information_service.parse_run_info(responses[0], runs))
+        for batch in runs.chunks(
+            self.ncbi_request_service.scale_chunk_size(
+                self.ncbi_request_service.settings.chunk_size
+            )
+        ):
+            group.start_soon(
+                self._isolate_failures,
+                batch,
+                partial(self._get_file_links_batch, file_links),
+            )
 
-    async def _wrap_file_links(
+    async def _get_run_info_chunk(
+        self, run_info: List[RunInformation], runs: INSDCRunSet, done: Set[str]
+    ) -> None:
+        """Parse a chunk of run information while its response arrives."""
+        request = self.run_information_service.prepare_request(
+            self.run_information_request_service, runs
+        )
+        async with self.run_information_request_service.stream(request) as response:
+            async for run in self.run_information_service.iter_run_info(
+                response, runs, self.strict
+            ):
+                done.add(run.run_accession)
+                if (
+                    self.file_link_service.from_run_information
+                    and not self.run_information_service.provides_file_links
+                ):
+                    run.files.extend(
+                        self.file_link_service.parse_run_information(run, self.strict)
+                    )
+                run_info.append(run)
+
+    async def _get_file_links_batch(
         self,
-        requests: List[httpx.Request],
-        runs: INSDCRunSet,
         file_links: Dict[str, List[FileDescription]],
+        runs: INSDCRunSet,
+        done: Set[str],
     ) -> None:
-        """"""
-        responses = await self.ncbi_request_service.perform_requests(requests)
-        file_links.update(self.file_link_service.parse_file_links(responses[0], runs))
+        """Parse a batch of file links while its response arrives."""
+        request = self.file_link_service.prepare_request(
+            self.ncbi_request_service, runs
+        )
+        async with self.ncbi_request_service.stream(request) as response:
+            async for run_accession, files in self.file_link_service.iter_file_links(
+                response, runs, self.strict
+            ):
+                done.add(run_accession)
+                file_links[run_accession] = files
+        # Not every run has files in the cloud.
+        done.update(runs)
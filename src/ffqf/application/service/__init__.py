@@ -5,3 +5,8 @@ from .set_builder import SetBuilder
 from .request_service import RequestService
 from .file_link_service import FileLinkService
 from .run_information_output_writer import RunInformationOutputWriter
+from .run_information_cache import RunInformationCache
+from .mapping_cache import CachedRunMapping, MappingCache
+from .concurrency_controller import AIMDConcurrencyController, ConcurrencyController
+from .token_bucket import TokenBucket
+from .incomplete_response_error import IncompleteResponseError
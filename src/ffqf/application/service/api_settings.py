@@ -1,8 +1,31 @@
-from pydantic import BaseSettings, HttpUrl
+from typing import FrozenSet, Literal, Optional
+
+from pydantic import BaseSettings, DirectoryPath, HttpUrl
 
 
 class APISettings(BaseSettings):
 
     api_url: HttpUrl
+    # The upper bound on requests in flight.
     concurrency: int
+    # Either keep concurrency and chunk sizes fixed or adapt them with AIMD.
+    concurrency_control: Literal["fixed", "aimd"] = "fixed"
+    min_concurrency: int = 1
+    latency_target: float = 10.0
+    # The connection pool is sized to the concurrency unless set explicitly.
+    max_connections: Optional[int] = None
+    max_keepalive_connections: Optional[int] = None
+    keepalive_expiry: float = 30.0
+    # Multiplex requests over a single connection; requires the `h2` package.
+    http2: bool = False
+    # Space out requests evenly to stay below this rate, by default the concurrency.
+    max_per_second: Optional[float] = None
     timeout: int = 30
+    chunk_size: int = 500
+    # Write every raw response body to this directory for debugging.
+    dump_directory: Optional[DirectoryPath] = None
+    # Retry failed requests with jittered exponential backoff.
+    max_retries: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 60.0
+    retry_status_codes: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
@@ -0,0 +1,115 @@
+import logging
+import math
+
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyController:
+    """
+    Define how many requests may be in flight and how large batches may be.
+
+    This default controller keeps both fixed at their configured maximum.
+
+    """
+
+    def __init__(self, *, max_concurrency: int, **kwargs) -> None:
+        """"""
+        super().__init__(**kwargs)
+        self._max_concurrency = max_concurrency
+
+    @property
+    def concurrency(self) -> int:
+        """Return the current number of requests that may be in flight."""
+        return self._max_concurrency
+
+    @property
+    def chunk_fraction(self) -> float:
+        """Return the current fraction of the configured chunk sizes to use."""
+        return 1.0
+
+    def scale_chunk_size(self, size: int) -> int:
+        """Return the current chunk size given a configured one."""
+        return max(1, int(size * self.chunk_fraction))
+
+    def record(self, *, started: float, latency: float, is_success: bool) -> None:
+        """Record the outcome of a request that was sent at the given time."""
+
+
+class AIMDConcurrencyController(ConcurrencyController):
+    """
+    Define a controller that adapts to the observed health of a server.
+
+    Concurrency follows additive increase, multiplicative decrease (AIMD): It grows
+    by one request per round of successful requests and is halved when a request
+    fails. Chunks shrink in the same way when responses are slower than the
+    target latency, since smaller chunks mean smaller responses. Only outcomes of
+    requests sent after the last decrease can cause another decrease, such that a
+    burst of failures of requests in flight counts once.
+
+    """
+
+    def __init__(
+        self,
+        *,
+        min_concurrency: int = 1,
+        latency_target: float = 10.0,
+        min_chunk_fraction: float = 0.05,
+        decrease_factor: float = 0.5,
+        **kwargs,
+    ) -> None:
+        """"""
+        super().__init__(**kwargs)
+        self._min_concurrency = min(min_concurrency, self._max_concurrency)
+        self._latency_target = latency_target
+        self._min_chunk_fraction = min_chunk_fraction
+        self._decrease_factor = decrease_factor
+        # Start in the middle and probe upwards.
+        self._concurrency = max(self._min_concurrency, self._max_concurrency / 2)
+        self._chunk_fraction = 1.0
+        self._last_decrease = -math.inf
+
+    @property
+    def concurrency(self) -> int:
+        """"""
+        return int(self._concurrency)
+
+    @property
+    def chunk_fraction(self) -> float:
+        """"""
+        return self._chunk_fraction
+
+    def record(self, *, started: float, latency: float, is_success: bool) -> None:
+        """"""
+        is_slow = latency > self._latency_target
+        if not is_success or is_slow:
+            if started < self._last_decrease:
+                return
+            self._last_decrease = started + latency
+            if not is_success:
+                self._concurrency = max(
+                    self._min_concurrency, self._concurrency * self._decrease_factor
+                )
+            if is_slow:
+                self._chunk_fraction = max(
+                    self._min_chunk_fraction,
+                    self._chunk_fraction * self._decrease_factor,
+                )
+            logger.info(
+                "Decrease concurrency to %d and chunk sizes to %.0f%% after a %s "
+                "request.",
+                self.concurrency,
+                100 * self._chunk_fraction,
+                "failed" if not is_success else "slow",
+            )
+            return
+        previous = self.concurrency
+        # One more request per round trip of all requests in flight.
+        self._concurrency = min(
+            self._max_concurrency, self._concurrency + 1 / self._concurrency
+        )
+        self._chunk_fraction = min(
+            1.0, self._chunk_fraction + self._min_chunk_fraction / self._concurrency
+        )
+        if self.concurrency > previous:
+            logger.debug("Increase concurrency to %d.", self.concurrency)
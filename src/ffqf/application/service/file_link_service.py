@@ -1,22 +1,52 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, ClassVar, Dict, List, Tuple
 
 import httpx
 
-from ffqf.domain.model import INSDCRunSet, RunInformation
+from ffqf.domain.model import FileDescription, INSDCRunSet, RunInformation
 
 from .request_service import RequestService
 
 
 class FileLinkService(ABC):
+
+    # Whether file links can be derived from run information without requests.
+    from_run_information: ClassVar[bool] = False
+
     @classmethod
     @abstractmethod
-    async def prepare_request(
+    def prepare_request(
         cls, request_service: RequestService, run_set: INSDCRunSet, **kwargs
     ) -> httpx.Request:
         """"""
 
     @classmethod
     @abstractmethod
-    def parse_file_links(cls, response: httpx.Response, run_set: INSDCRunSet) -> List:
+    def parse_file_links(
+        cls, response: httpx.Response, run_set: INSDCRunSet, strict: bool = False
+    ) -> Dict[str, List[FileDescription]]:
         """"""
+
+    @classmethod
+    async def iter_file_links(
+        cls, response: httpx.Response, run_set: INSDCRunSet, strict: bool = False
+    ) -> AsyncIterator[Tuple[str, List[FileDescription]]]:
+        """
+        Yield the file links of each run from a streaming response.
+
+        By default, the entire body is read before parsing. Services that can parse
+        the body incrementally should override this method.
+
+        """
+        await response.aread()
+        for item in cls.parse_file_links(response, run_set, strict).items():
+            yield item
+
+    @classmethod
+    def parse_run_information(
+        cls, run: RunInformation, strict: bool = False
+    ) -> List[FileDescription]:
+        """Derive the file links of a run from its information."""
+        raise NotImplementedError(
+            f"{cls.__name__} cannot derive file links from run information."
+        )
@@ -0,0 +1,15 @@
+from typing import Iterable
+
+
+class IncompleteResponseError(ValueError):
+    """Signal that a response lacks some of the requested accessions."""
+
+    def __init__(self, missing: Iterable[str], **kwargs) -> None:
+        """"""
+        self.missing = frozenset(missing)
+        super().__init__(
+            f"The response lacks {len(self.missing)} of the requested accessions: "
+            f"{', '.join(sorted(self.missing)[:10])}"
+            f"{', ...' if len(self.missing) > 10 else ''}.",
+            **kwargs,
+        )
@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, Mapping
+
+import pydantic
+
+
+class CachedRunMapping(pydantic.BaseModel):
+    """Define the cached runs of one accession at the time they were fetched."""
+
+    runs: FrozenSet[str]
+    fetched_at: datetime
+    is_expired: bool
+
+    class Config:
+        frozen = True
+
+
+class MappingCache(ABC):
+    """Define the interface for storing the runs that an accession maps to."""
+
+    @abstractmethod
+    def get_many(self, accessions: Iterable[str]) -> Dict[str, CachedRunMapping]:
+        """Return all cached mappings of the given accessions, expired or not."""
+
+    @abstractmethod
+    def put_many(
+        self, mappings: Mapping[str, Iterable[str]], fetched_at: datetime
+    ) -> None:
+        """Store the complete run membership of accessions."""
@@ -1,13 +1,24 @@
 from abc import ABC, abstractmethod
+from datetime import date
+from typing import ClassVar, Dict, List, Optional, Tuple
 
 import httpx
 
-from ffqf.domain.model import AbstractAccessionSet, INSDCRunSet
+from ffqf.domain.model import AbstractAccessionSet, INSDCRunSet, RunInformation
 
 from .request_service import RequestService
 
 
 class MappingService(ABC):
+
+    # Whether mapping requests can retrieve the information on the runs, too.
+    provides_run_information: ClassVar[bool] = False
+
+    @classmethod
+    def get_chunk_size(cls, request_service: RequestService) -> int:
+        """Return the maximum number of accessions to map in a single request."""
+        return request_service.scale_chunk_size(request_service.settings.chunk_size)
+
     @classmethod
     @abstractmethod
     def prepare_request(
@@ -16,8 +27,58 @@ class MappingService(ABC):
         """"""
 
     @classmethod
-    @abstractmethod
-    def parse_run_set(
-        cls, response: httpx.Response, accessions: AbstractAccessionSet, **kwargs
-    ) -> INSDCRunSet:
-        """"""
+    async def map_accessions(
+        cls,
+        request_service: RequestService,
+        accessions: AbstractAccessionSet,
+        **kwargs,
+    ) -> Dict[str, INSDCRunSet]:
+        """
+        Map each accession to its runs.
+
+        By default, a single request is sent and its response parsed while it
+        arrives. Services that need several round trips should override this method.
+
+        """
+        request = cls.prepare_request(request_service, accessions, **kwargs)
+        async with request_service.stream(request) as response:
+            return await cls.parse_mapping_stream(response, accessions, **kwargs)
+
+    @classmethod
+    async def parse_mapping_stream(
+        cls,
+        response: httpx.Response,
+        accessions: AbstractAccessionSet,
+        since: Optional[date] = None,
+        **kwargs,
+    ) -> Dict[str, INSDCRunSet]:
+        """
+        Parse the runs of each accession from a streaming response.
+
+        Accessions without any runs map to an empty set, such that they can be
+        reported individually and the mapping can be cached. When `since` is given,
+        the request was restricted to runs first made public on or after that date.
+
+        """
+        raise NotImplementedError(
+            f"{cls.__name__} cannot attribute runs to individual accessions."
+        )
+
+    @classmethod
+    async def map_run_information(
+        cls,
+        request_service: RequestService,
+        accessions: AbstractAccessionSet,
+        strict: bool = False,
+        **kwargs,
+    ) -> Tuple[Dict[str, INSDCRunSet], List[RunInformation]]:
+        """
+        Map each accession to its runs and retrieve information on those runs.
+
+        The run information lacks file links. Only services that provide run
+        information implement this method.
+
+        """
+        raise NotImplementedError(
+            f"{cls.__name__} cannot retrieve run information while mapping."
+        )
@@ -1,29 +1,125 @@
 from __future__ import annotations
 
 import logging
+import random
 from abc import ABC, abstractmethod
-from typing import Any, Coroutine, List
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from itertools import count
+from pathlib import PurePosixPath
+from typing import AsyncIterator, ClassVar, Dict, FrozenSet, List, Optional, Tuple
 
+import anyio
 import httpx
 
 from .api_settings import APISettings
+from .concurrency_controller import AIMDConcurrencyController, ConcurrencyController
+from .token_bucket import TokenBucket
 
 
 logger = logging.getLogger(__name__)
 
 
 class RequestService(ABC):
-    def __init__(self, *, settings: APISettings, **kwargs) -> None:
+
+    # Query parameters, such as credentials, that must never be logged.
+    _secret_parameters: ClassVar[FrozenSet[str]] = frozenset()
+
+    def __init__(
+        self,
+        *,
+        settings: APISettings,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        **kwargs,
+    ) -> None:
         """"""
         super().__init__(**kwargs)
         self._settings = settings
-        self._client = httpx.AsyncClient()
+        self._client = httpx.AsyncClient(
+            base_url=self.settings.api_url,
+            params=self._get_parameters(),
+            timeout=self.settings.timeout,
+            transport=(
+                self.create_transport(self.settings) if transport is None else transport
+            ),
+        )
+        self._controller = self._create_controller()
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+        # Without an explicit rate, start at most as many requests per second as
+        # may be in flight, which is how requests were throttled before streaming.
+        self._rate_limiter = TokenBucket(
+            rate=(
+                settings.concurrency
+                if settings.max_per_second is None
+                else settings.max_per_second
+            )
+        )
+        self._dump_counter = count()
 
     @property
     def settings(self) -> APISettings:
         """"""
         return self._settings
 
+    @classmethod
+    def create_transport(cls, settings: APISettings) -> httpx.AsyncHTTPTransport:
+        """Create a transport whose connection pool is configured by the settings."""
+        max_connections = (
+            settings.concurrency
+            if settings.max_connections is None
+            else settings.max_connections
+        )
+        return httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=(
+                    max_connections
+                    if settings.max_keepalive_connections is None
+                    else settings.max_keepalive_connections
+                ),
+                keepalive_expiry=settings.keepalive_expiry,
+            ),
+            http2=settings.http2,
+        )
+
+    def _get_parameters(self) -> Dict[str, str]:
+        """Return query parameters to add to every request."""
+        return {}
+
+    def redact(self, url: httpx.URL) -> httpx.URL:
+        """Return the URL without secret query parameters, e.g., for logging."""
+        for name in self._secret_parameters:
+            url = url.copy_remove_param(name)
+        return url
+
+    @property
+    def controller(self) -> ConcurrencyController:
+        """"""
+        return self._controller
+
+    @property
+    def limiter(self) -> anyio.CapacityLimiter:
+        """Limit the number of requests in flight across all concurrent tasks."""
+        # The limiter is created lazily such that it belongs to the running event
+        # loop.
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.controller.concurrency)
+        return self._limiter
+
+    def scale_chunk_size(self, size: int) -> int:
+        """Return the number of accessions to currently request at once."""
+        return self.controller.scale_chunk_size(size)
+
+    def _create_controller(self) -> ConcurrencyController:
+        if self.settings.concurrency_control == "aimd":
+            return AIMDConcurrencyController(
+                max_concurrency=self.settings.concurrency,
+                min_concurrency=self.settings.min_concurrency,
+                latency_target=self.settings.latency_target,
+            )
+        return ConcurrencyController(max_concurrency=self.settings.concurrency)
+
     @property
     def client(self) -> httpx.AsyncClient:
         """"""
@@ -45,10 +141,146 @@ class RequestService(ABC):
     ) -> List[httpx.Response]:
         """"""
 
-    @classmethod
+    @asynccontextmanager
+    async def stream(self, request: httpx.Request) -> AsyncIterator[httpx.Response]:
+        """
+        Send a request and provide its response before the body is read.
+
+        The body can then be consumed incrementally. The request counts against the
+        concurrency limit until the response is closed. Only then is it recorded by
+        the concurrency controller, such that slow downloads and errors while
+        reading the body are taken into account.
+
+        """
+        async with self.limiter:
+            response, started = await self._send(self.client, request, stream=True)
+            is_success = response.status_code not in self.settings.retry_status_codes
+            try:
+                if self.settings.dump_directory is not None:
+                    await response.aread()
+                    self._dump(response)
+                yield response
+            except httpx.TransportError:
+                is_success = False
+                raise
+            except httpx.HTTPStatusError as error:
+                # The message names the URL and thus any credentials.
+                raise httpx.HTTPStatusError(
+                    str(error).replace(
+                        str(error.request.url), str(self.redact(error.request.url))
+                    ),
+                    request=error.request,
+                    response=error.response,
+                ) from None
+            finally:
+                await response.aclose()
+                self._record(started, is_success=is_success)
+
     async def _make_request(
-        cls, client: httpx.AsyncClient, request: httpx.Request
+        self, client: httpx.AsyncClient, request: httpx.Request
     ) -> httpx.Response:
-        logger.debug(str(request))
+        async with self.limiter:
+            response, _ = await self._send(client, request)
+        if self.settings.dump_directory is not None:
+            self._dump(response)
+        return response
+
+    async def _send(
+        self, client: httpx.AsyncClient, request: httpx.Request, stream: bool = False
+    ) -> Tuple[httpx.Response, float]:
+        """
+        Send a request and retry on transport errors and transient status codes.
+
+        Backing off happens while holding a slot of the concurrency limit such that
+        a struggling server also sees fewer other requests. Once the retry budget is
+        spent, the last error is raised or the last response is returned together
+        with the time that its attempt started. A streamed response is left for the
+        caller to record once its body was read.
+
+        """
+        logger.debug("%s %s", request.method, self.redact(request.url))
         logger.debug(request.content.decode("ASCII"))
-        return await client.send(request)
+        for attempt in count(1):
+            # Retries count against the rate limit, too.
+            await self._rate_limiter.acquire()
+            started = anyio.current_time()
+            try:
+                response = await client.send(request, stream=stream)
+            except httpx.TransportError as error:
+                self._record(started, is_success=False)
+                if attempt > self.settings.max_retries:
+                    raise
+                delay = self._get_backoff(attempt)
+                reason = f"{type(error).__name__}: {error}"
+            else:
+                is_transient = response.status_code in self.settings.retry_status_codes
+                if not is_transient or attempt > self.settings.max_retries:
+                    if not stream:
+                        self._record(started, is_success=not is_transient)
+                    return response, started
+                self._record(started, is_success=False)
+                delay = max(
+                    self._get_backoff(attempt),
+                    self._get_retry_after(response),
+                )
+                reason = f"status {response.status_code}"
+                await response.aclose()
+            logger.warning(
+                "Retry %d of %d for %s after %.1f s due to %s.",
+                attempt,
+                self.settings.max_retries,
+                self.redact(request.url),
+                delay,
+                reason,
+            )
+            await anyio.sleep(delay)
+
+    def _record(self, started: float, is_success: bool) -> None:
+        """Inform the controller about a request and apply its new concurrency."""
+        self.controller.record(
+            started=started,
+            latency=anyio.current_time() - started,
+            is_success=is_success,
+        )
+        if (
+            self._limiter is not None
+            and self._limiter.total_tokens != self.controller.concurrency
+        ):
+            self._limiter.total_tokens = self.controller.concurrency
+
+    def _get_backoff(self, attempt: int) -> float:
+        """Return an exponentially growing delay with full jitter."""
+        return random.uniform(  # noqa: S311
+            0,
+            min(
+                self.settings.backoff_max,
+                self.settings.backoff_base * 2 ** (attempt - 1),
+            ),
+        )
+
+    def _get_retry_after(self, response: httpx.Response) -> float:
+        """Return the delay requested by the server in seconds, if any."""
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return 0.0
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = (
+                    parsedate_to_datetime(value) - datetime.now(timezone.utc)
+                ).total_seconds()
+            except (TypeError, ValueError):
+                return 0.0
+        return min(max(delay, 0.0), self.settings.backoff_max)
+
+    def _dump(self, response: httpx.Response) -> None:
+        """Write the body of a read response to the dump directory."""
+        path = self.settings.dump_directory / (
+            f"{next(self._dump_counter):06d}-"
+            f"{PurePosixPath(response.request.url.path).name}"
+        )
+        logger.debug(
+            "Dump response of %s to '%s'.", self.redact(response.request.url), path
+        )
+        path.write_bytes(response.content)
@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, List
+
+from ffqf.domain.model import INSDCRunSet, RunInformation
+
+
+class RunInformationCache(ABC):
+    """Define the interface for storing complete run information by run accession."""
+
+    @abstractmethod
+    def get_many(self, run_set: INSDCRunSet) -> List[RunInformation]:
+        """Return the run information of all runs that are cached and not expired."""
+
+    @abstractmethod
+    def put_many(self, run_info: Iterable[RunInformation]) -> None:
+        """Store run information including its file descriptions."""
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterable, List, Optional
 
 from ffqf.domain.model import RunInformation
 
@@ -12,3 +12,19 @@ class RunInformationOutputWriter(ABC):
         cls, run_info: List[RunInformation], output: Optional[Path] = None, **kwargs
     ) -> None:
         """"""
+
+    @classmethod
+    async def write_stream(
+        cls,
+        run_info: AsyncIterable[RunInformation],
+        output: Optional[Path] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Write run information from an asynchronous stream.
+
+        By default, the entire stream is collected before writing. Writers that can
+        emit records one at a time should override this method.
+
+        """
+        cls.write([run async for run in run_info], output, **kwargs)
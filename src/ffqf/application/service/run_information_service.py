@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, ClassVar, List
 
 import httpx
 
@@ -9,6 +9,10 @@ from .request_service import RequestService
 
 
 class RunInformationService(ABC):
+
+    # Whether the run information already includes the runs' file links.
+    provides_file_links: ClassVar[bool] = False
+
     @classmethod
     @abstractmethod
     def prepare_request(
@@ -19,6 +23,22 @@ class RunInformationService(ABC):
     @classmethod
     @abstractmethod
     def parse_run_info(
-        cls, response: httpx.Response, run_set: INSDCRunSet
+        cls, response: httpx.Response, run_set: INSDCRunSet, strict: bool = False
     ) -> List[RunInformation]:
         """"""
+
+    @classmethod
+    async def iter_run_info(
+        cls, response: httpx.Response, run_set: INSDCRunSet, strict: bool = False
+    ) -> AsyncIterator[RunInformation]:
+        """
+        Yield run information from a streaming response.
+
+        By default, the entire body is read before parsing. Services that can parse
+        the body incrementally should override this method. Unless `strict`, run
+        information from a trusted source is not validated.
+
+        """
+        await response.aread()
+        for run in cls.parse_run_info(response, run_set, strict):
+            yield run
@@ -1,9 +1,13 @@
+from __future__ import annotations
+
 import re
-from typing import Iterable
+from typing import ClassVar, Dict, Iterable, List, Pattern, Tuple
 
 from ffqf.domain.model import (
     BioProjectSet,
     BioSampleSet,
+    GEOSampleSet,
+    GEOSeriesSet,
     INSDCExperimentSet,
     INSDCRunSet,
     INSDCSampleSet,
@@ -14,13 +18,22 @@ from ffqf.domain.model import (
 
 class SetBuilder:
 
-    BIO_PROJECT_PREFIX = "PRJ"
-    BIO_SAMPLE_PREFIX = "SAM"
-    study_pattern = re.compile(r"^(SR|ER|DR)P")
-    sample_pattern = re.compile(r"^(SR|ER|DR)S")
-    experiment_pattern = re.compile(r"^(SR|ER|DR)X")
-    run_pattern = re.compile(r"^(SR|ER|DR)R")
-    submission_pattern = re.compile(r"^(SR|ER|DR)A")
+    _accession_pattern: ClassVar[Pattern] = re.compile(
+        r"^([A-Z]+)(\d+)$", flags=re.ASCII
+    )
+    # Map each recognized accession prefix to the attribute of its set.
+    _prefixes: ClassVar[Dict[str, str]] = {
+        **dict.fromkeys(("PRJNA", "PRJEB", "PRJDB"), "bio_projects"),
+        **dict.fromkeys(("SAMN", "SAMEA", "SAMEG", "SAMD"), "bio_samples"),
+        **{f"{db}P": "studies" for db in ("SR", "ER", "DR")},
+        **{f"{db}S": "samples" for db in ("SR", "ER", "DR")},
+        **{f"{db}X": "experiments" for db in ("SR", "ER", "DR")},
+        **{f"{db}R": "runs" for db in ("SR", "ER", "DR")},
+        **{f"{db}A": "submissions" for db in ("SR", "ER", "DR")},
+        "GSE": "geo_series",
+        "GSM": "geo_samples",
+    }
+    _set_names: ClassVar[Tuple[str, ...]] = tuple(dict.fromkeys(_prefixes.values()))
 
     def __init__(self, **kwargs) -> None:
         """"""
@@ -32,25 +45,48 @@ class SetBuilder:
         self.experiments = INSDCExperimentSet()
         self.runs = INSDCRunSet()
         self.submissions = INSDCSubmissionSet()
+        self.geo_series = GEOSeriesSet()
+        self.geo_samples = GEOSampleSet()
 
-    def from_accessions(self, accessions: Iterable[str]):
-        """"""
+    def from_accessions(
+        self, accessions: Iterable[str], *, strict: bool = True
+    ) -> List[str]:
+        """
+        Sort accessions into sets by their type in a single pass.
+
+        Each accession is matched once and its prefix looked up, which both
+        classifies and validates it. Unrecognized accessions raise a `RuntimeError`
+        or, unless `strict`, are collected and returned.
+
+        """
+        invalid: List[str] = []
+        batches: Dict[Tuple[str, int], List[str]] = {}
+        match = self._accession_pattern.match
+        prefixes = self._prefixes
         for acc in accessions:
-            if acc.startswith(self.BIO_PROJECT_PREFIX):
-                self.bio_projects.add(acc)
-            elif acc.startswith(self.BIO_SAMPLE_PREFIX):
-                self.bio_samples.add(acc)
-            elif self.study_pattern.match(acc):
-                self.studies.add(acc)
-            elif self.study_pattern.match(acc):
-                self.studies.add(acc)
-            elif self.sample_pattern.match(acc):
-                self.samples.add(acc)
-            elif self.experiment_pattern.match(acc):
-                self.experiments.add(acc)
-            elif self.run_pattern.match(acc):
-                self.runs.add(acc)
-            elif self.submission_pattern.match(acc):
-                self.submissions.add(acc)
+            found = match(acc)
+            if found is None or found.group(1) not in prefixes:
+                if strict:
+                    raise RuntimeError(
+                        f"Could not match accession '{acc}'. Unexpected."
+                    )
+                invalid.append(acc)
+                continue
+            prefix, digits = found.groups()
+            key = (prefix, len(digits))
+            if key in batches:
+                batches[key].append(digits)
             else:
-                raise RuntimeError(f"Could not match accession '{acc}'. Unexpected.")
+                batches[key] = [digits]
+        for (prefix, width), digits in batches.items():
+            getattr(self, prefixes[prefix]).update_validated(prefix, width, digits)
+        return invalid
+
+    def update_new(self, other: SetBuilder) -> SetBuilder:
+        """Add the accessions of another builder and return only the new ones."""
+        result = type(self)()
+        for name in self._set_names:
+            new = getattr(other, name).difference(getattr(self, name))
+            getattr(self, name).update(new)
+            setattr(result, name, new)
+        return result
@@ -0,0 +1,51 @@
+from typing import Optional
+
+import anyio
+
+
+class TokenBucket:
+    """
+    Define a rate limiter that spaces out requests evenly.
+
+    Tokens are replenished continuously at the given rate, up to the capacity. With
+    a capacity of one, consecutive requests are at least one interval apart, such
+    that there are no bursts at second boundaries. Waiting tasks are served in
+    order.
+
+    """
+
+    def __init__(self, *, rate: float, capacity: int = 1, **kwargs) -> None:
+        """"""
+        super().__init__(**kwargs)
+        if rate <= 0:
+            raise ValueError(f"The rate must be positive, not {rate}.")
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated: Optional[float] = None
+        self._lock: Optional[anyio.Lock] = None
+
+    @property
+    def rate(self) -> float:
+        """Return the number of tokens replenished per second."""
+        return self._rate
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        # The lock is created lazily such that it belongs to the running event loop.
+        if self._lock is None:
+            self._lock = anyio.Lock()
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await anyio.sleep((1 - self._tokens) / self._rate)
+                self._refill()
+            self._tokens -= 1
+
+    def _refill(self) -> None:
+        now = anyio.current_time()
+        if self._updated is not None:
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._updated) * self._rate
+            )
+        self._updated = now
@@ -32,3 +32,5 @@ from .insdc_experiment_set import INSDCExperimentSet
 from .insdc_submission_set import INSDCSubmissionSet
 from .insdc_run_set import INSDCRunSet
 from .insdc_study_set import INSDCStudySet
+from .geo_series_set import GEOSeriesSet
+from .geo_sample_set import GEOSampleSet
@@ -28,18 +28,53 @@
 from __future__ import annotations
 
 from abc import ABC
-from typing import ClassVar, Iterable, Pattern, Set, Union
+from array import array
+from bisect import bisect_left
+from typing import (
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+    Union,
+)
+
+
+# Accessions are grouped by their prefix and the number of digits of their numeric
+# part, such that leading zeros are retained.
+Key = Tuple[str, int]
 
 
 class AbstractAccessionSet(ABC):
-    """"""
+    """
+    Define a compact set of accessions.
+
+    Accessions consist of a prefix and a numeric part. Rather than keeping each
+    accession as a string, the numeric parts are kept in sorted arrays of 64-bit
+    integers per prefix and number of digits. Additions are buffered and merged
+    into the sorted arrays in bulk. Accessions that do not fit this scheme are kept
+    as strings. Iteration yields accessions ordered by prefix and then numerically.
+
+    """
 
     _validation_pattern: ClassVar[Pattern]
+    # More digits may not fit into a signed 64-bit integer.
+    _max_digits: ClassVar[int] = 18
+    # Buffered numbers are merged once they exceed this size or an eighth of the
+    # sorted ones.
+    _merge_threshold: ClassVar[int] = 4096
 
     def __init__(self, **kwargs) -> None:
         """"""
         super().__init__(**kwargs)
-        self._accessions: Set[str] = set()
+        self._numbers: Dict[Key, array] = {}
+        # Numbers that were added but are not yet part of the sorted arrays.
+        self._pending: Dict[Key, Set[int]] = {}
+        self._strings: Set[str] = set()
 
     @classmethod
     def from_accessions(cls, accessions: Iterable[str]) -> AbstractAccessionSet:
@@ -48,33 +83,223 @@ class AbstractAccessionSet(ABC):
         result.update(accessions=accessions)
         return result
 
-    def __iter__(self) -> Iterable[str]:
+    def __iter__(self) -> Iterator[str]:
         """"""
-        return iter(self._accessions)
+        for (prefix, width), numbers in self._segments():
+            for number in numbers:
+                yield f"{prefix}{number:0{width}d}"
+        yield from sorted(self._strings)
 
     def __contains__(self, accession: str) -> bool:
         """"""
-        return accession in self._accessions
+        try:
+            key, value = self._split(accession)
+        except (TypeError, ValueError):
+            return False
+        if key is None:
+            return value in self._strings
+        return self._has(key, value)
 
     def __len__(self) -> int:
-        return len(self._accessions)
+        return (
+            sum(len(numbers) for numbers in self._numbers.values())
+            + sum(len(pending) for pending in self._pending.values())
+            + len(self._strings)
+        )
 
     def __eq__(self, other: Union[AbstractAccessionSet, Set]) -> bool:
         if isinstance(other, AbstractAccessionSet):
-            return other._accessions == self._accessions
+            return (
+                dict(self._segments()) == dict(other._segments())
+                and other._strings == self._strings
+            )
         else:
-            return other == self._accessions
+            return other == set(self)
 
     def add(self, accession: str) -> None:
         """"""
-        if self._validation_pattern.match(accession):
-            self._accessions.add(accession)
+        key, value = self._split(accession)
+        if key is None:
+            self._strings.add(value)
         else:
-            raise ValueError(f"Invalid accession '{accession}'.")
+            self._add(key, value)
 
     def update(self, accessions: Iterable[str]) -> None:
+        if type(accessions) is type(self):
+            # Accessions of a set of the same kind were validated already.
+            for key, numbers in accessions._segments():
+                self._add_many(key, numbers)
+            self._strings.update(accessions._strings)
+            return
+        # This is the bulk equivalent of `_split` with attribute lookups hoisted
+        # and numeric parts converted per key.
+        batches: Dict[Key, List[str]] = {}
+        match = self._validation_pattern.match
+        max_digits = self._max_digits
         for acc in accessions:
-            self.add(acc)
+            found = match(acc)
+            if found is None:
+                raise ValueError(f"Invalid accession '{acc}'.")
+            index = found.lastindex
+            if index is not None:
+                start, end = found.span(index)
+                width = end - start
+                if end == len(acc) and 0 < width <= max_digits:
+                    digits = acc[start:]
+                    if digits.isdigit() and digits.isascii():
+                        key = (acc[:start], width)
+                        if key in batches:
+                            batches[key].append(digits)
+                        else:
+                            batches[key] = [digits]
+                        continue
+            self._strings.add(acc)
+        for (prefix, width), digits in batches.items():
+            self.update_validated(prefix, width, digits)
+
+    def update_validated(self, prefix: str, width: int, digits: Iterable[str]) -> None:
+        """
+        Add accessions that were validated already from their parts.
+
+        All numeric parts must consist of `width` ASCII digits.
+
+        """
+        if width > self._max_digits:
+            self._strings.update(f"{prefix}{number}" for number in digits)
+        else:
+            self._add_many((prefix, width), map(int, digits))
 
     def difference(self, other: Iterable[str]) -> AbstractAccessionSet:
-        return self.from_accessions(self._accessions.difference(other))
+        if not isinstance(other, AbstractAccessionSet):
+            other = self._from_any(other)
+        result = type(self)()
+        for key, numbers in self._segments():
+            excluded = other._numbers.get(key, ())
+            pending = other._pending.get(key, ())
+            if not excluded and not pending:
+                remaining = array("q", numbers)
+            elif len(excluded) + len(pending) <= 4 * len(numbers):
+                excluded = set(excluded)
+                excluded.update(pending)
+                remaining = array("q", [n for n in numbers if n not in excluded])
+            else:
+                # Look up few numbers in many by bisection instead.
+                remaining = array("q", [n for n in numbers if not other._has(key, n)])
+            if remaining:
+                result._numbers[key] = remaining
+        result._strings = self._strings.difference(other._strings)
+        return result
+
+    def chunks(self, size: int) -> Iterator[AbstractAccessionSet]:
+        """Iterate over sorted subsets of at most `size` accessions each."""
+        if size < 1:
+            raise ValueError(f"The chunk size must be positive but is {size}.")
+        chunk = type(self)()
+        count = 0
+        for key, numbers in self._segments():
+            start = 0
+            while start < len(numbers):
+                part = numbers[start : start + size - count]
+                chunk._numbers[key] = part
+                count += len(part)
+                start += len(part)
+                if count == size:
+                    yield chunk
+                    chunk = type(self)()
+                    count = 0
+        for acc in sorted(self._strings):
+            chunk._strings.add(acc)
+            count += 1
+            if count == size:
+                yield chunk
+                chunk = type(self)()
+                count = 0
+        if count:
+            yield chunk
+
+    @classmethod
+    def _split(cls, accession: str) -> Tuple[Optional[Key], Union[int, str]]:
+        """Validate an accession and split it into its key and numeric part."""
+        match = cls._validation_pattern.match(accession)
+        if match is None:
+            raise ValueError(f"Invalid accession '{accession}'.")
+        # The numeric part must be the pattern's last group.
+        index = match.lastindex
+        if index is not None:
+            start, end = match.span(index)
+            digits = accession[start:]
+            if (
+                end == len(accession)
+                and 0 < len(digits) <= cls._max_digits
+                and digits.isdigit()
+                and digits.isascii()
+            ):
+                return (accession[:start], len(digits)), int(digits)
+        return None, accession
+
+    @classmethod
+    def _from_any(cls, accessions: Iterable[str]) -> AbstractAccessionSet:
+        """Collect those of the given accessions that could be part of this set."""
+        result = cls()
+        for acc in accessions:
+            try:
+                result.add(acc)
+            except (TypeError, ValueError):
+                continue
+        return result
+
+    def _has(self, key: Key, number: int) -> bool:
+        pending = self._pending.get(key)
+        if pending is not None and number in pending:
+            return True
+        return self._is_sorted_member(self._numbers.get(key, ()), number)
+
+    @staticmethod
+    def _is_sorted_member(numbers: array, number: int) -> bool:
+        index = bisect_left(numbers, number)
+        return index < len(numbers) and numbers[index] == number
+
+    def _add(self, key: Key, number: int) -> None:
+        if self._has(key, number):
+            return
+        pending = self._pending.setdefault(key, set())
+        pending.add(number)
+        if len(pending) > max(
+            self._merge_threshold, len(self._numbers.get(key, ())) >> 3
+        ):
+            self._merge(key)
+
+    def _add_many(self, key: Key, numbers: Iterable[int]) -> None:
+        pending = self._pending.setdefault(key, set())
+        pending.update(numbers)
+        existing = self._numbers.get(key)
+        if existing:
+            pending.difference_update(
+                [n for n in pending if self._is_sorted_member(existing, n)]
+            )
+        if len(pending) > max(self._merge_threshold, len(existing or ()) >> 3):
+            self._merge(key)
+
+    def _merge(self, key: Key) -> None:
+        """Merge the buffered numbers of a key into its sorted array."""
+        pending = sorted(self._pending.pop(key, ()))
+        if not pending:
+            return
+        numbers = self._numbers.get(key)
+        if numbers is None:
+            self._numbers[key] = array("q", pending)
+        elif pending[0] > numbers[-1]:
+            numbers.extend(pending)
+        else:
+            # Both parts are sorted and disjoint, which makes sorting them linear.
+            merged = numbers.tolist()
+            merged.extend(pending)
+            merged.sort()
+            self._numbers[key] = array("q", merged)
+
+    def _segments(self) -> Iterator[Tuple[Key, array]]:
+        """Iterate over the sorted numbers of each key in order."""
+        for key in list(self._pending):
+            self._merge(key)
+        for key in sorted(self._numbers):
+            yield key, self._numbers[key]
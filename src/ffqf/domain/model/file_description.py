@@ -22,8 +22,11 @@
 # SOFTWARE.
 
 
+from __future__ import annotations
+
 import enum
-from typing import Optional
+import sys
+from typing import Any, ClassVar, FrozenSet, Mapping, Optional
 
 import pydantic
 
@@ -47,5 +50,35 @@ class FileDescription(pydantic.BaseModel):
     urltype: URLType
     region: Optional[str]
 
+    # Trusted file descriptions are created with all fields and share their set.
+    _record_fields: ClassVar[FrozenSet[str]] = frozenset(
+        {"name", "type", "size", "md5", "url", "urltype", "region"}
+    )
+
     class Config:
         frozen = True
+
+    @classmethod
+    def from_record(
+        cls, record: Mapping[str, Any], *, strict: bool = False
+    ) -> FileDescription:
+        """
+        Create a file description from a record of a trusted source.
+
+        Unless `strict`, the record is not validated. Its type and region, which
+        repeat across files, are interned.
+
+        """
+        if strict:
+            return cls.parse_obj(record)
+        region = record.get("region")
+        return cls.construct(
+            cls._record_fields,
+            name=record["name"],
+            type=sys.intern(record["type"]),
+            size=int(record["size"]),
+            md5=record["md5"],
+            url=record["url"],
+            urltype=URLType(record["urltype"]),
+            region=None if region is None else sys.intern(region),
+        )
@@ -22,7 +22,10 @@
 # SOFTWARE.
 
 
-from typing import List
+from __future__ import annotations
+
+import sys
+from typing import Any, ClassVar, Dict, FrozenSet, List, Mapping, Tuple
 
 import pydantic
 
@@ -40,6 +43,59 @@ class RunInformation(pydantic.BaseModel):
     secondary_study_accession: str
     files: List[FileDescription] = pydantic.Field(default_factory=lambda: [])
 
+    # Values of these fields repeat across runs and are shared when interned.
+    interned_fields: ClassVar[FrozenSet[str]] = frozenset(
+        {
+            "submission_accession",
+            "study_accession",
+            "secondary_study_accession",
+            "study_alias",
+            "study_title",
+            "library_layout",
+            "library_selection",
+            "library_source",
+            "library_strategy",
+            "instrument_model",
+            "instrument_platform",
+            "tax_id",
+            "scientific_name",
+        }
+    )
+
+    # Records from the same source have the same keys and share a fields set.
+    _fields_sets: ClassVar[Dict[Tuple[str, ...], FrozenSet[str]]] = {}
+
     class Config:
         extra = pydantic.Extra.allow
         frozen = True
+
+    @classmethod
+    def from_record(
+        cls, record: Mapping[str, Any], *, strict: bool = False
+    ) -> RunInformation:
+        """
+        Create run information from a record of a trusted source.
+
+        Unless `strict`, the record is not validated, which is several times faster.
+        Values that repeat across runs are interned, which saves memory.
+
+        """
+        if strict:
+            return cls.parse_obj(record)
+        values = dict(record)
+        for field in cls.interned_fields.intersection(values):
+            if isinstance(values[field], str):
+                values[field] = sys.intern(values[field])
+        values["files"] = [
+            (
+                desc
+                if isinstance(desc, FileDescription)
+                else FileDescription.from_record(desc)
+            )
+            for desc in values.get("files", ())
+        ]
+        keys = tuple(values)
+        fields_set = cls._fields_sets.get(keys)
+        if fields_set is None:
+            fields_set = cls._fields_sets.setdefault(keys, frozenset(keys))
+        return cls.construct(fields_set, **values)
@@ -1,9 +1,12 @@
+import gzip
+import itertools
 import logging
-import re
 import sys
+import time
+from datetime import timedelta
 from enum import Enum, unique
 from pathlib import Path
-from typing import Collection, List, Optional
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, TextIO
 
 import anyio
 import typer
@@ -13,6 +16,7 @@ from ffqf.application import RunInformationApplication
 from ffqf.infrastructure.application.service import (
     ENAAPIPortalBioProjectMappingService,
     ENAAPIPortalBioSampleMappingService,
+    ENAAPIPortalFileLinkService,
     ENAAPIPortalINSDCExperimentMappingService,
     ENAAPIPortalINSDCSampleMappingService,
     ENAAPIPortalINSDCStudyMappingService,
@@ -20,17 +24,27 @@ from ffqf.infrastructure.application.service import (
     ENAAPIPortalRequestService,
     ENAAPIPortalRunInformationService,
     ENAAPIPortalSettings,
+    FileCacheTransport,
     NCBIEutilsFileLinkService,
+    NCBIEutilsGEOMappingService,
     NCBIEutilsRequestService,
+    NCBIEutilsRunInformationService,
     NCBIEutilsSettings,
     RunInformationJSONOutputWriter,
+    RunInformationNDJSONOutputWriter,
     RunInformationTableOutputWriter,
+    SQLiteMappingCache,
+    SQLiteRunInformationCache,
 )
 
 
 logger = logging.getLogger("ffqf")
 
 
+# Seconds after which a partial window of slowly arriving accessions is passed on.
+WINDOW_DELAY = 1.0
+
+
 @unique
 class LogLevel(str, Enum):
     """Define the choices for the log level option."""
@@ -49,6 +63,23 @@ class OutputFormat(str, Enum):
     TSV = "TSV"
     CSV = "CSV"
     JSON = "JSON"
+    NDJSON = "NDJSON"
+
+
+@unique
+class RunInformationSource(str, Enum):
+    """Define the choices for the source of run information."""
+
+    ENA = "ENA"
+    NCBI = "NCBI"
+
+
+@unique
+class FileLinkSource(str, Enum):
+    """Define the choices for the source of file links."""
+
+    NCBI = "NCBI"
+    ENA = "ENA"
 
 
 app = typer.Typer(
@@ -73,15 +104,94 @@ def version_callback(is_set: bool) -> None:
         raise typer.Exit()
 
 
-def validate_accessions(accessions: Collection[str]) -> None:
-    recognized_accession = re.compile(
-        r"^(((SR|ER|DR)[APRSX])|(SAM(N|EA|EG|D))|(PRJ(NA|EB|DB))|(GS[EM]))(\d+)$",
-        flags=re.ASCII,
-    )
+def open_input(path: Path) -> TextIO:
+    """Open a plain or gzip-compressed text file of accessions."""
+    with path.open("rb") as handle:
+        is_compressed = handle.read(2) == b"\x1f\x8b"
+    return gzip.open(path, "rt") if is_compressed else path.open()
+
 
-    for acc in accessions:
-        if not recognized_accession.match(acc):
-            logger.error("Invalid or unrecognized accession '%s'. Ignored.", acc)
+def peek_lines(lines: Iterable[str]) -> Optional[Iterator[str]]:
+    """
+    Return all lines unless they are blank, reading no further than the first one.
+
+    The remaining input is read later on while run information is being retrieved.
+
+    """
+    lines = iter(lines)
+    for line in lines:
+        if line.strip():
+            return itertools.chain([line], lines)
+    return None
+
+
+def iter_windows(
+    lines: Iterable[str], size: int, max_delay: Optional[float] = None
+) -> Iterator[List[str]]:
+    """
+    Collect stripped, non-empty and unique lines into windows of a given size.
+
+    With a maximum delay, a window is passed on early once that many seconds have
+    passed since its first line, such that slowly arriving input is processed.
+
+    """
+    window: Dict[str, None] = {}
+    started = 0.0
+    for line in lines:
+        accession = line.strip()
+        if not accession:
+            continue
+        if not window:
+            started = time.monotonic()
+        window[accession] = None
+        if len(window) >= size or (
+            max_delay is not None and time.monotonic() - started >= max_delay
+        ):
+            yield list(window)
+            window = {}
+    if window:
+        yield list(window)
+
+
+async def read_windows(windows: Iterator[List[str]]) -> AsyncIterator[List[str]]:
+    """Read each window in a worker thread such that waiting for input never blocks."""
+    while True:
+        window = await anyio.to_thread.run_sync(next, windows, None)
+        if window is None:
+            return
+        yield window
+
+
+async def write_run_information(
+    run_info_app: RunInformationApplication,
+    windows: Iterator[List[str]],
+    output_format: OutputFormat,
+    output: Optional[Path] = None,
+) -> None:
+    """Write run information in the desired format while it is being retrieved."""
+    # A bounded buffer applies back pressure when writing is slower than retrieval.
+    send_results, receive_results = anyio.create_memory_object_stream(1000)
+    async with anyio.create_task_group() as group:
+        group.start_soon(
+            run_info_app.stream_windows, read_windows(windows), send_results
+        )
+        async with receive_results:
+            if output_format is OutputFormat.JSON:
+                await RunInformationJSONOutputWriter.write_stream(
+                    receive_results, output
+                )
+            elif output_format is OutputFormat.NDJSON:
+                await RunInformationNDJSONOutputWriter.write_stream(
+                    receive_results, output
+                )
+            elif output_format is OutputFormat.TSV:
+                await RunInformationTableOutputWriter.write_stream(
+                    receive_results, output
+                )
+            elif output_format is OutputFormat.CSV:
+                await RunInformationTableOutputWriter.write_stream(
+                    receive_results, output, dialect="excel"
+                )
 
 
 @app.command()
@@ -92,11 +202,35 @@ def main(
         help="Any number of valid accessions.",
         show_default=False,
     ),
+    input_path: Optional[Path] = typer.Option(  # noqa: B008
+        None,
+        "--input",
+        "-i",
+        help="A plain or gzip-compressed file with one accession per line. It is "
+        "read while run information is already being retrieved.",
+        show_default=False,
+        exists=True,
+        dir_okay=False,
+    ),
+    window_size: int = typer.Option(  # noqa: B008
+        10_000,
+        "--window-size",
+        help="The number of accessions read from a file or stdin before they are "
+        "passed on. Slowly arriving accessions are passed on after a second.",
+        min=1,
+    ),
     email: Optional[str] = typer.Option(  # noqa: B008
         ...,
         help="The email address to use to identify with the NCBI E-utilities.",
         show_default=False,
     ),
+    api_key: Optional[str] = typer.Option(  # noqa: B008
+        None,
+        "--api-key",
+        envvar="NCBI_API_KEY",
+        help="An NCBI API key which allows for more requests per second.",
+        show_default=False,
+    ),
     output: Optional[Path] = typer.Option(  # noqa: B008
         None,
         "--output",
@@ -111,6 +245,85 @@ def main(
         case_sensitive=False,
         show_default=True,
     ),
+    run_info: RunInformationSource = typer.Option(  # noqa: B008
+        RunInformationSource.ENA.value,
+        "--run-info",
+        help="Retrieve run information from the ENA portal or from NCBI SRA. NCBI "
+        "lists newly published runs sooner and includes the file links in the same "
+        "response; --file-links is then ignored.",
+        case_sensitive=False,
+    ),
+    fused_mapping: bool = typer.Option(  # noqa: B008
+        False,
+        "--fused-mapping",
+        help="Request all run information of BioProjects, BioSamples, studies, etc. "
+        "while mapping them to runs on ENA, which saves a second round of requests.",
+    ),
+    strict: bool = typer.Option(  # noqa: B008
+        False,
+        "--strict",
+        help="Validate every record received from the archives. By default, their "
+        "responses are trusted, which is faster and uses less memory.",
+    ),
+    file_links: FileLinkSource = typer.Option(  # noqa: B008
+        FileLinkSource.NCBI.value,
+        "--file-links",
+        help="Either list the SRA files mirrored in the cloud by NCBI or the FASTQ "
+        "files mirrored by ENA. The latter requires no requests to NCBI.",
+        case_sensitive=False,
+    ),
+    cache: Optional[Path] = typer.Option(  # noqa: B008
+        None,
+        "--cache",
+        help="Look up runs and their information in this SQLite database first and "
+        "store newly retrieved ones in it.",
+        show_default=False,
+        dir_okay=False,
+    ),
+    cache_ttl: float = typer.Option(  # noqa: B008
+        30,
+        "--cache-ttl",
+        help="The number of days after which cached entries expire.",
+        min=0,
+    ),
+    mapping_ttl: float = typer.Option(  # noqa: B008
+        7,
+        "--mapping-ttl",
+        help="The number of days after which cached runs of projects, studies, etc. "
+        "are checked for newly added runs.",
+        min=0,
+    ),
+    refresh_mappings: bool = typer.Option(  # noqa: B008
+        False,
+        "--refresh-mappings",
+        help="Check all cached runs of projects, studies, etc. for newly added runs.",
+    ),
+    http_cache: Optional[Path] = typer.Option(  # noqa: B008
+        None,
+        "--http-cache",
+        help="Keep raw API responses in this directory and replay them when the "
+        "same request is made again.",
+        show_default=False,
+        file_okay=False,
+        dir_okay=True,
+    ),
+    http_cache_size: int = typer.Option(  # noqa: B008
+        1024,
+        "--http-cache-size",
+        help="The maximum size in MiB of the cached responses of each API before "
+        "the least recently used ones are evicted.",
+        min=1,
+    ),
+    dump_directory: Optional[Path] = typer.Option(  # noqa: B008
+        None,
+        "--dump-dir",
+        help="For debugging, write every raw response body to this directory.",
+        show_default=False,
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        writable=True,
+    ),
     version: Optional[bool] = typer.Option(  # noqa: B008
         None,
         "--version",
@@ -127,8 +340,8 @@ def main(
     ),
 ):
     """
-    Either pass a number of accessions as arguments or pipe them into stdin with one
-    accession per line.
+    Either pass a number of accessions as arguments or in a file, or pipe them into
+    stdin with one accession per line.
     """
     try:
         from rich.logging import RichHandler
@@ -141,16 +354,60 @@ def main(
         )
     except ModuleNotFoundError:
         logging.basicConfig(level=log_level.name, format="[%(levelname)s] %(message)s")
+    # httpx logs every request URL, including the NCBI API key, at INFO level.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
 
-    if not accessions:
-        accessions = [line.strip() for line in sys.stdin.readlines()]
-
-    if not accessions:
+    handle: Optional[TextIO] = None
+    if input_path is not None:
+        handle = open_input(input_path)
+    elif not accessions:
+        handle = sys.stdin
+    lines = peek_lines(itertools.chain(accessions or [], handle or []))
+    if lines is None:
         logger.error("No accessions given. Nothing to be done.")
         raise typer.Exit()
+    windows = iter_windows(lines, size=window_size, max_delay=WINDOW_DELAY)
 
-    ena_requests = ENAAPIPortalRequestService(settings=ENAAPIPortalSettings())
-    ncbi_requests = NCBIEutilsRequestService(settings=NCBIEutilsSettings(email=email))
+    ena_settings = ENAAPIPortalSettings(dump_directory=dump_directory)
+    ena_requests = ENAAPIPortalRequestService(
+        settings=ena_settings,
+        transport=(
+            FileCacheTransport(
+                directory=http_cache / "ena",
+                max_size=http_cache_size * 2**20,
+                transport=ENAAPIPortalRequestService.create_transport(ena_settings),
+            )
+            if http_cache
+            else None
+        ),
+    )
+    ncbi_settings = NCBIEutilsSettings(
+        email=email, api_key=api_key, dump_directory=dump_directory
+    )
+    ncbi_requests = NCBIEutilsRequestService(
+        settings=ncbi_settings,
+        transport=(
+            FileCacheTransport(
+                directory=http_cache / "ncbi",
+                max_size=http_cache_size * 2**20,
+                transport=NCBIEutilsRequestService.create_transport(ncbi_settings),
+            )
+            if http_cache
+            else None
+        ),
+    )
+    run_info_cache = (
+        SQLiteRunInformationCache(
+            path=cache, ttl=timedelta(days=cache_ttl), strict=strict
+        )
+        if cache
+        else None
+    )
+    mapping_cache = (
+        SQLiteMappingCache(path=cache, ttl=timedelta(days=mapping_ttl))
+        if cache
+        else None
+    )
     run_info_app = RunInformationApplication(
         bio_project_mapping_service=ENAAPIPortalBioProjectMappingService,
         bio_sample_mapping_service=ENAAPIPortalBioSampleMappingService,
@@ -158,15 +415,40 @@ def main(
         insdc_sample_mapping_service=ENAAPIPortalINSDCSampleMappingService,
         insdc_experiment_mapping_service=ENAAPIPortalINSDCExperimentMappingService,
         insdc_submission_mapping_service=ENAAPIPortalINSDCSubmissionMappingService,
-        run_information_service=ENAAPIPortalRunInformationService,
-        file_link_service=NCBIEutilsFileLinkService,
+        geo_mapping_service=NCBIEutilsGEOMappingService,
+        run_information_service=(
+            NCBIEutilsRunInformationService
+            if run_info is RunInformationSource.NCBI
+            else ENAAPIPortalRunInformationService
+        ),
+        file_link_service=(
+            ENAAPIPortalFileLinkService
+            if file_links is FileLinkSource.ENA
+            else NCBIEutilsFileLinkService
+        ),
         ena_request_service=ena_requests,
         ncbi_request_service=ncbi_requests,
+        run_information_request_service=(
+            ncbi_requests if run_info is RunInformationSource.NCBI else ena_requests
+        ),
+        run_information_cache=run_info_cache,
+        mapping_cache=mapping_cache,
+        refresh_mappings=refresh_mappings,
+        fused_mapping=fused_mapping,
+        strict=strict,
     )
-    result = anyio.run(run_info_app.run, accessions)
-    if output_format is OutputFormat.JSON:
-        RunInformationJSONOutputWriter.write(result, output)
-    elif output_format is OutputFormat.TSV:
-        RunInformationTableOutputWriter.write(result, output)
-    elif output_format is OutputFormat.CSV:
-        RunInformationTableOutputWriter.write(result, output, dialect="excel")
+    try:
+        anyio.run(write_run_information, run_info_app, windows, output_format, output)
+    finally:
+        if handle is not None and handle is not sys.stdin:
+            handle.close()
+        if run_info_cache is not None:
+            run_info_cache.close()
+        if mapping_cache is not None:
+            mapping_cache.close()
+    if run_info_app.failures:
+        logger.error(
+            "Could not retrieve %d accessions: %s",
+            len(run_info_app.failures),
+            ", ".join(sorted(run_info_app.failures)),
+        )
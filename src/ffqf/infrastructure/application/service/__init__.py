@@ -1,20 +1,27 @@
 from .ena_api_portal import (
     ENAAPIPortalBioProjectMappingService,
     ENAAPIPortalBioSampleMappingService,
+    ENAAPIPortalFileLinkService,
     ENAAPIPortalINSDCExperimentMappingService,
     ENAAPIPortalINSDCSampleMappingService,
     ENAAPIPortalINSDCStudyMappingService,
     ENAAPIPortalINSDCSubmissionMappingService,
+    ENAAPIPortalMappingService,
     ENAAPIPortalRequestService,
     ENAAPIPortalRunInformationService,
     ENAAPIPortalSettings,
 )
 from .ncbi_eutils import (
     NCBIEutilsFileLinkService,
+    NCBIEutilsGEOMappingService,
     NCBIEutilsRequestService,
+    NCBIEutilsRunInformationService,
     NCBIEutilsSettings,
 )
 from .run_information_output_writer import (
     RunInformationTableOutputWriter,
     RunInformationJSONOutputWriter,
+    RunInformationNDJSONOutputWriter,
 )
+from .sqlite import SQLiteMappingCache, SQLiteRunInformationCache
+from .http_cache import FileCacheTransport
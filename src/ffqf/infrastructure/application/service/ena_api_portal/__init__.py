@@ -4,6 +4,7 @@ from .ena_api_portal_bio_project_mapping_service import (
 from .ena_api_portal_bio_sample_mapping_service import (
     ENAAPIPortalBioSampleMappingService,
 )
+from .ena_api_portal_file_link_service import ENAAPIPortalFileLinkService
 from .ena_api_portal_insdc_experiment_mapping_service import (
     ENAAPIPortalINSDCExperimentMappingService,
 )
@@ -16,6 +17,8 @@ from .ena_api_portal_insdc_study_mapping_service import (
 from .ena_api_portal_insdc_submission_mapping_service import (
     ENAAPIPortalINSDCSubmissionMappingService,
 )
+from .ena_api_portal_mapping_service import ENAAPIPortalMappingService
+from .ena_api_portal_record_parser import ENAAPIPortalRecordParser
 from .ena_api_portal_request_service import ENAAPIPortalRequestService
 from .ena_api_portal_run_information_service import ENAAPIPortalRunInformationService
 from .ena_api_portal_settings import ENAAPIPortalSettings
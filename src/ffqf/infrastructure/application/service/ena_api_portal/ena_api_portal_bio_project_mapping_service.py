@@ -22,15 +22,15 @@
 # SOFTWARE.
 
 
-from typing import List
+from datetime import date
+from typing import ClassVar, Optional, Type
 
 import httpx
 import pydantic
-from pydantic import parse_obj_as
 
-from ffqf.application.service import MappingService
-from ffqf.domain.model import BioProjectSet, INSDCRunSet
+from ffqf.domain.model import BioProjectSet
 
+from .ena_api_portal_mapping_service import ENAAPIPortalMappingService
 from .ena_api_portal_request_service import ENAAPIPortalRequestService
 
 
@@ -43,36 +43,35 @@ class BioProject2INSDCRunAssociation(pydantic.BaseModel):
         frozen = True
 
 
-class ENAAPIPortalBioProjectMappingService(MappingService):
+class ENAAPIPortalBioProjectMappingService(ENAAPIPortalMappingService):
+
+    _association: ClassVar[Type[pydantic.BaseModel]] = BioProject2INSDCRunAssociation
+    _accession_field: ClassVar[str] = "study_accession"
+    _chunk_size_setting: ClassVar[str] = "bio_project_chunk_size"
+
     @classmethod
     def prepare_request(
         cls,
         request_service: ENAAPIPortalRequestService,
         accessions: BioProjectSet,
-        **kwargs
+        since: Optional[date] = None,
+        run_information: bool = False,
+        **kwargs,
     ) -> httpx.Request:
         """"""
         return request_service.client.build_request(
             method="POST",
             url="search",
-            data={
-                "dataPortal": "ena",
-                "fields": ",".join(BioProject2INSDCRunAssociation.__fields__),
-                "format": "json",
-                "includeAccessionType": "study",
-                "includeAccessions": ",".join(sorted(accessions)),
-                "limit": 0,
-                "result": "read_run",
-            },
-        )
-
-    @classmethod
-    def parse_run_set(
-        cls, response: httpx.Response, accessions: BioProjectSet, **kwargs
-    ) -> INSDCRunSet:
-        response.raise_for_status()
-        mapping = parse_obj_as(List[BioProject2INSDCRunAssociation], response.json())
-        assert {m.study_accession for m in mapping} == accessions
-        return INSDCRunSet.from_accessions(
-            accessions=[m.run_accession for m in mapping]
+            data=cls._restrict_to_new_runs(
+                {
+                    "dataPortal": "ena",
+                    "fields": cls._get_fields(request_service, run_information),
+                    "format": request_service.settings.response_format,
+                    "includeAccessionType": "study",
+                    "includeAccessions": ",".join(sorted(accessions)),
+                    "limit": 0,
+                    "result": "read_run",
+                },
+                since,
+            ),
         )
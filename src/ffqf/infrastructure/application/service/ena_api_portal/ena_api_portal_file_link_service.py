@@ -0,0 +1,134 @@
+import logging
+from pathlib import PurePosixPath
+from typing import AsyncIterator, ClassVar, Dict, List, Optional, Tuple
+
+import httpx
+
+from ffqf.application.service import FileLinkService
+from ffqf.domain.model import FileDescription, INSDCRunSet, RunInformation, URLType
+
+from .ena_api_portal_record_parser import ENAAPIPortalRecordParser
+from .ena_api_portal_request_service import ENAAPIPortalRequestService
+
+
+logger = logging.getLogger(__name__)
+
+
+class ENAAPIPortalFileLinkService(FileLinkService):
+    """
+    Define a service that describes the FASTQ files mirrored by ENA.
+
+    ENA lists the FTP and Aspera locations of each run's FASTQ files together with
+    their sizes and checksums. Since these fields are part of the run information,
+    no separate requests are needed.
+
+    """
+
+    from_run_information: ClassVar[bool] = True
+    _fields: ClassVar[Tuple[str, ...]] = (
+        "run_accession",
+        "fastq_ftp",
+        "fastq_md5",
+        "fastq_bytes",
+        "fastq_aspera",
+    )
+
+    @classmethod
+    def prepare_request(
+        cls, request_service: ENAAPIPortalRequestService, run_set: INSDCRunSet, **kwargs
+    ) -> httpx.Request:
+        """"""
+        return request_service.client.build_request(
+            method="POST",
+            url="search",
+            data={
+                "dataPortal": "ena",
+                "fields": ",".join(cls._fields),
+                "format": request_service.settings.response_format,
+                "includeAccessionType": "run",
+                "includeAccessions": ",".join(sorted(run_set)),
+                "limit": 0,
+                "result": "read_run",
+            },
+        )
+
+    @classmethod
+    def parse_file_links(
+        cls, response: httpx.Response, run_set: INSDCRunSet, strict: bool = False
+    ) -> Dict[str, List[FileDescription]]:
+        """"""
+        return {
+            record["run_accession"]: cls._parse_fastq(record, strict)
+            for record in ENAAPIPortalRecordParser.parse_records(response)
+        }
+
+    @classmethod
+    async def iter_file_links(
+        cls, response: httpx.Response, run_set: INSDCRunSet, strict: bool = False
+    ) -> AsyncIterator[Tuple[str, List[FileDescription]]]:
+        """"""
+        async for record in ENAAPIPortalRecordParser.iter_records(response):
+            yield record["run_accession"], cls._parse_fastq(record, strict)
+
+    @classmethod
+    def parse_run_information(
+        cls, run: RunInformation, strict: bool = False
+    ) -> List[FileDescription]:
+        """"""
+        return cls._parse_fastq(
+            {field: getattr(run, field, None) for field in cls._fields}, strict
+        )
+
+    @classmethod
+    def _parse_fastq(
+        cls, record: Dict[str, Optional[str]], strict: bool = False
+    ) -> List[FileDescription]:
+        """Describe each FASTQ file once per location; fields are ';'-separated."""
+        locations = cls._split(record.get("fastq_ftp"))
+        checksums = cls._split(record.get("fastq_md5"))
+        sizes = cls._split(record.get("fastq_bytes"))
+        aspera = cls._split(record.get("fastq_aspera"))
+        if not (len(locations) == len(checksums) == len(sizes)):
+            logger.warning(
+                "Inconsistent FASTQ file fields for run %s.",
+                record.get("run_accession"),
+            )
+            return []
+        result = []
+        for index, (location, md5, size) in enumerate(zip(locations, checksums, sizes)):
+            name = PurePosixPath(location).name
+            result.append(
+                FileDescription.from_record(
+                    {
+                        "name": name,
+                        "type": "fastq",
+                        "size": int(size),
+                        "md5": md5,
+                        "url": f"ftp://{location}",
+                        "urltype": URLType.FTP,
+                        "region": None,
+                    },
+                    strict=strict,
+                )
+            )
+            if index < len(aspera):
+                result.append(
+                    FileDescription.from_record(
+                        {
+                            "name": name,
+                            "type": "fastq",
+                            "size": int(size),
+                            "md5": md5,
+                            # Aspera locations are given as `host:/path`.
+                            "url": f"fasp://{aspera[index].replace(':/', '/', 1)}",
+                            "urltype": URLType.EBI,
+                            "region": None,
+                        },
+                        strict=strict,
+                    )
+                )
+        return result
+
+    @classmethod
+    def _split(cls, value: Optional[str]) -> List[str]:
+        return value.split(";") if value else []
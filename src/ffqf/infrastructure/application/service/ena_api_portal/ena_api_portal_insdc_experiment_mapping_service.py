@@ -22,15 +22,15 @@
 # SOFTWARE.
 
 
-from typing import List
+from datetime import date
+from typing import ClassVar, Optional, Type
 
 import httpx
 import pydantic
-from pydantic import parse_obj_as
 
-from ffqf.application.service import MappingService
-from ffqf.domain.model import INSDCExperimentSet, INSDCRunSet
+from ffqf.domain.model import INSDCExperimentSet
 
+from .ena_api_portal_mapping_service import ENAAPIPortalMappingService
 from .ena_api_portal_request_service import ENAAPIPortalRequestService
 
 
@@ -43,38 +43,37 @@ class INSDCExperiment2INSDCRunAssociation(pydantic.BaseModel):
         frozen = True
 
 
-class ENAAPIPortalINSDCExperimentMappingService(MappingService):
+class ENAAPIPortalINSDCExperimentMappingService(ENAAPIPortalMappingService):
+
+    _association: ClassVar[Type[pydantic.BaseModel]] = (
+        INSDCExperiment2INSDCRunAssociation
+    )
+    _accession_field: ClassVar[str] = "experiment_accession"
+    _chunk_size_setting: ClassVar[str] = "experiment_chunk_size"
+
     @classmethod
     def prepare_request(
         cls,
         request_service: ENAAPIPortalRequestService,
         accessions: INSDCExperimentSet,
-        **kwargs
+        since: Optional[date] = None,
+        run_information: bool = False,
+        **kwargs,
     ) -> httpx.Request:
         """"""
         return request_service.client.build_request(
             method="POST",
             url="search",
-            data={
-                "dataPortal": "ena",
-                "fields": ",".join(INSDCExperiment2INSDCRunAssociation.__fields__),
-                "format": "json",
-                "includeAccessionType": "experiment",
-                "includeAccessions": ",".join(sorted(accessions)),
-                "limit": 0,
-                "result": "read_run",
-            },
-        )
-
-    @classmethod
-    def parse_run_set(
-        cls, response: httpx.Response, accessions: INSDCExperimentSet, **kwargs
-    ) -> INSDCRunSet:
-        response.raise_for_status()
-        mapping = parse_obj_as(
-            List[INSDCExperiment2INSDCRunAssociation], response.json()
-        )
-        assert {m.experiment_accession for m in mapping} == accessions
-        return INSDCRunSet.from_accessions(
-            accessions=[m.run_accession for m in mapping]
+            data=cls._restrict_to_new_runs(
+                {
+                    "dataPortal": "ena",
+                    "fields": cls._get_fields(request_service, run_information),
+                    "format": request_service.settings.response_format,
+                    "includeAccessionType": "experiment",
+                    "includeAccessions": ",".join(sorted(accessions)),
+                    "limit": 0,
+                    "result": "read_run",
+                },
+                since,
+            ),
         )
@@ -22,22 +22,18 @@
 # SOFTWARE.
 
 
-import logging
-from typing import List
+from datetime import date
+from typing import ClassVar, Optional, Type
 
 import httpx
 import pydantic
-from pydantic import parse_obj_as
 
-from ffqf.application.service import MappingService
-from ffqf.domain.model import INSDCRunSet, INSDCSampleSet
+from ffqf.domain.model import INSDCSampleSet
 
+from .ena_api_portal_mapping_service import ENAAPIPortalMappingService
 from .ena_api_portal_request_service import ENAAPIPortalRequestService
 
 
-logger = logging.getLogger(__name__)
-
-
 class INSDCSample2INSDCRunAssociation(pydantic.BaseModel):
 
     secondary_sample_accession: pydantic.constr(regex=r"^((SR|ER|DR)S)(\d+)$")
@@ -47,42 +43,36 @@ class INSDCSample2INSDCRunAssociation(pydantic.BaseModel):
         frozen = True
 
 
-class ENAAPIPortalINSDCSampleMappingService(MappingService):
+class ENAAPIPortalINSDCSampleMappingService(ENAAPIPortalMappingService):
+
+    _association: ClassVar[Type[pydantic.BaseModel]] = INSDCSample2INSDCRunAssociation
+    _accession_field: ClassVar[str] = "secondary_sample_accession"
+    _chunk_size_setting: ClassVar[str] = "sample_chunk_size"
+
     @classmethod
     def prepare_request(
         cls,
         request_service: ENAAPIPortalRequestService,
         accessions: INSDCSampleSet,
+        since: Optional[date] = None,
+        run_information: bool = False,
         **kwargs,
     ) -> httpx.Request:
         """"""
         return request_service.client.build_request(
             method="POST",
             url="search",
-            data={
-                "dataPortal": "ena",
-                "query": " OR ".join(
-                    [f'secondary_sample_accession="{acc}"' for acc in accessions]
-                ),
-                "fields": ",".join(INSDCSample2INSDCRunAssociation.__fields__),
-                "format": "json",
-                "limit": 0,
-                "result": "read_run",
-            },
-        )
-
-    @classmethod
-    def parse_run_set(
-        cls, response: httpx.Response, accessions: INSDCSampleSet, **kwargs
-    ) -> INSDCRunSet:
-        response.raise_for_status()
-        mapping = parse_obj_as(List[INSDCSample2INSDCRunAssociation], response.json())
-        found = {m.secondary_sample_accession for m in mapping}
-        if found != accessions:
-            logger.error(
-                "The following sample accessions could not be mapped: %s",
-                ", ".join(accessions.difference(found)),
-            )
-        return INSDCRunSet.from_accessions(
-            accessions=[m.run_accession for m in mapping]
+            data=cls._restrict_to_new_runs(
+                {
+                    "dataPortal": "ena",
+                    "query": " OR ".join(
+                        [f'secondary_sample_accession="{acc}"' for acc in accessions]
+                    ),
+                    "fields": cls._get_fields(request_service, run_information),
+                    "format": request_service.settings.response_format,
+                    "limit": 0,
+                    "result": "read_run",
+                },
+                since,
+            ),
         )
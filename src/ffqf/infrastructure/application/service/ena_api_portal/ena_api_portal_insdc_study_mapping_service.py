@@ -22,15 +22,15 @@
 # SOFTWARE.
 
 
-from typing import List
+from datetime import date
+from typing import ClassVar, Optional, Type
 
 import httpx
 import pydantic
-from pydantic import parse_obj_as
 
-from ffqf.application.service import MappingService
-from ffqf.domain.model import INSDCRunSet, INSDCStudySet
+from ffqf.domain.model import INSDCStudySet
 
+from .ena_api_portal_mapping_service import ENAAPIPortalMappingService
 from .ena_api_portal_request_service import ENAAPIPortalRequestService
 
 
@@ -43,37 +43,36 @@ class INSDCStudy2INSDCRunAssociation(pydantic.BaseModel):
         frozen = True
 
 
-class ENAAPIPortalINSDCStudyMappingService(MappingService):
+class ENAAPIPortalINSDCStudyMappingService(ENAAPIPortalMappingService):
+
+    _association: ClassVar[Type[pydantic.BaseModel]] = INSDCStudy2INSDCRunAssociation
+    _accession_field: ClassVar[str] = "secondary_study_accession"
+    _chunk_size_setting: ClassVar[str] = "study_chunk_size"
+
     @classmethod
     def prepare_request(
         cls,
         request_service: ENAAPIPortalRequestService,
         accessions: INSDCStudySet,
+        since: Optional[date] = None,
+        run_information: bool = False,
         **kwargs,
     ) -> httpx.Request:
         """"""
         return request_service.client.build_request(
             method="POST",
             url="search",
-            data={
-                "dataPortal": "ena",
-                "query": " OR ".join(
-                    [f'secondary_study_accession="{acc}"' for acc in accessions]
-                ),
-                "fields": ",".join(INSDCStudy2INSDCRunAssociation.__fields__),
-                "format": "json",
-                "limit": 0,
-                "result": "read_run",
-            },
-        )
-
-    @classmethod
-    def parse_run_set(
-        cls, response: httpx.Response, accessions: INSDCStudySet, **kwargs
-    ) -> INSDCRunSet:
-        response.raise_for_status()
-        mapping = parse_obj_as(List[INSDCStudy2INSDCRunAssociation], response.json())
-        assert {m.secondary_study_accession for m in mapping} == accessions
-        return INSDCRunSet.from_accessions(
-            accessions=[m.run_accession for m in mapping]
+            data=cls._restrict_to_new_runs(
+                {
+                    "dataPortal": "ena",
+                    "query": " OR ".join(
+                        [f'secondary_study_accession="{acc}"' for acc in accessions]
+                    ),
+                    "fields": cls._get_fields(request_service, run_information),
+                    "format": request_service.settings.response_format,
+                    "limit": 0,
+                    "result": "read_run",
+                },
+                since,
+            ),
         )
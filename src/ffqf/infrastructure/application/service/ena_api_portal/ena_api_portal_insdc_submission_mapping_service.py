@@ -22,22 +22,18 @@
 # SOFTWARE.
 
 
-import logging
-from typing import List
+from datetime import date
+from typing import ClassVar, Optional, Type
 
 import httpx
 import pydantic
-from pydantic import parse_obj_as
 
-from ffqf.application.service import MappingService
-from ffqf.domain.model import INSDCRunSet, INSDCSubmissionSet
+from ffqf.domain.model import INSDCSubmissionSet
 
+from .ena_api_portal_mapping_service import ENAAPIPortalMappingService
 from .ena_api_portal_request_service import ENAAPIPortalRequestService
 
 
-logger = logging.getLogger(__name__)
-
-
 class INSDCSubmission2INSDCRunAssociation(pydantic.BaseModel):
 
     submission_accession: pydantic.constr(regex=r"^((SR|ER|DR)A)(\d+)$")
@@ -47,44 +43,38 @@ class INSDCSubmission2INSDCRunAssociation(pydantic.BaseModel):
         frozen = True
 
 
-class ENAAPIPortalINSDCSubmissionMappingService(MappingService):
+class ENAAPIPortalINSDCSubmissionMappingService(ENAAPIPortalMappingService):
+
+    _association: ClassVar[Type[pydantic.BaseModel]] = (
+        INSDCSubmission2INSDCRunAssociation
+    )
+    _accession_field: ClassVar[str] = "submission_accession"
+    _chunk_size_setting: ClassVar[str] = "submission_chunk_size"
+
     @classmethod
     def prepare_request(
         cls,
         request_service: ENAAPIPortalRequestService,
         accessions: INSDCSubmissionSet,
+        since: Optional[date] = None,
+        run_information: bool = False,
         **kwargs,
     ) -> httpx.Request:
         """"""
         result = request_service.client.build_request(
             method="POST",
             url="search",
-            data={
-                "dataPortal": "ena",
-                "fields": ",".join(INSDCSubmission2INSDCRunAssociation.__fields__),
-                "format": "json",
-                "includeAccessionType": "submission",
-                "includeAccessions": ",".join(sorted(accessions)),
-                "limit": 0,
-                "result": "read_run",
-            },
+            data=cls._restrict_to_new_runs(
+                {
+                    "dataPortal": "ena",
+                    "fields": cls._get_fields(request_service, run_information),
+                    "format": request_service.settings.response_format,
+                    "includeAccessionType": "submission",
+                    "includeAccessions": ",".join(sorted(accessions)),
+                    "limit": 0,
+                    "result": "read_run",
+                },
+                since,
+            ),
         )
         return result
-
-    @classmethod
-    def parse_run_set(
-        cls, response: httpx.Response, accessions: INSDCSubmissionSet, **kwargs
-    ) -> INSDCRunSet:
-        response.raise_for_status()
-        mapping = parse_obj_as(
-            List[INSDCSubmission2INSDCRunAssociation], response.json()
-        )
-        found = {m.submission_accession for m in mapping}
-        if found != accessions:
-            logger.error(
-                "The following submission accessions could not be mapped: %s",
-                ", ".join(accessions.difference(found)),
-            )
-        return INSDCRunSet.from_accessions(
-            accessions=[m.run_accession for m in mapping]
-        )
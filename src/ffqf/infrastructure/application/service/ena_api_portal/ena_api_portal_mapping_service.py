@@ -0,0 +1,120 @@
+from datetime import date
+from typing import (
+    Any,
+    AsyncIterator,
+    ClassVar,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    cast,
+)
+
+import httpx
+import pydantic
+
+from ffqf.application.service import MappingService
+from ffqf.domain.model import AbstractAccessionSet, INSDCRunSet, RunInformation
+
+from .ena_api_portal_record_parser import ENAAPIPortalRecordParser
+from .ena_api_portal_request_service import ENAAPIPortalRequestService
+from .ena_api_portal_settings import ENAAPIPortalSettings
+
+
+class ENAAPIPortalMappingService(MappingService):
+    """Define common behavior of mapping services backed by the ENA portal API."""
+
+    provides_run_information: ClassVar[bool] = True
+
+    _chunk_size_setting: ClassVar[str]
+    _association: ClassVar[Type[pydantic.BaseModel]]
+    _accession_field: ClassVar[str]
+
+    @classmethod
+    def get_chunk_size(cls, request_service: ENAAPIPortalRequestService) -> int:
+        """Return the chunk size configured for this service's accession type."""
+        return request_service.scale_chunk_size(
+            getattr(request_service.settings, cls._chunk_size_setting)
+        )
+
+    @classmethod
+    async def parse_mapping_stream(
+        cls,
+        response: httpx.Response,
+        accessions: AbstractAccessionSet,
+        since: Optional[date] = None,
+        **kwargs,
+    ) -> Dict[str, INSDCRunSet]:
+        """Parse the runs of each accession while the body is being downloaded."""
+        result = {acc: INSDCRunSet() for acc in accessions}
+        async for association in cls.iter_associations(response):
+            result.setdefault(
+                getattr(association, cls._accession_field), INSDCRunSet()
+            ).add(association.run_accession)
+        return result
+
+    @classmethod
+    async def map_run_information(
+        cls,
+        request_service: ENAAPIPortalRequestService,
+        accessions: AbstractAccessionSet,
+        strict: bool = False,
+        **kwargs,
+    ) -> Tuple[Dict[str, INSDCRunSet], List[RunInformation]]:
+        """
+        Map each accession to its runs while requesting all fields of the runs.
+
+        Each row of the response then describes a run completely, which saves a
+        separate request for the run information.
+
+        """
+        request = cls.prepare_request(
+            request_service, accessions, run_information=True, **kwargs
+        )
+        mapping = {acc: INSDCRunSet() for acc in accessions}
+        run_info: List[RunInformation] = []
+        async with request_service.stream(request) as response:
+            async for record in ENAAPIPortalRecordParser.iter_records(response):
+                association = cls._association.parse_obj(record)
+                mapping.setdefault(
+                    getattr(association, cls._accession_field), INSDCRunSet()
+                ).add(association.run_accession)
+                run_info.append(RunInformation.from_record(record, strict=strict))
+        return mapping, run_info
+
+    @classmethod
+    async def iter_associations(
+        cls, response: httpx.Response
+    ) -> AsyncIterator[pydantic.BaseModel]:
+        """Yield the accession to run associations of a response one by one."""
+        async for record in ENAAPIPortalRecordParser.iter_records(response):
+            yield cls._association.parse_obj(record)
+
+    @classmethod
+    def _get_fields(
+        cls, request_service: ENAAPIPortalRequestService, run_information: bool = False
+    ) -> str:
+        """Return the fields to request, optionally including all run information."""
+        fields = list(cls._association.__fields__)
+        if run_information:
+            fields.extend(
+                field
+                for field in cast(ENAAPIPortalSettings, request_service.settings).fields
+                if field not in fields
+            )
+        return ",".join(fields)
+
+    @classmethod
+    def _restrict_to_new_runs(
+        cls, data: Dict[str, Any], since: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """Restrict a search to runs that were first made public on or after a date."""
+        if since is None:
+            return data
+        restriction = f"first_public>={since.isoformat()}"
+        if "query" in data:
+            data["query"] = f"({data['query']}) AND {restriction}"
+        else:
+            data["query"] = restriction
+        return data
@@ -0,0 +1,174 @@
+import codecs
+import csv
+import json
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import httpx
+
+
+class ENAAPIPortalRecordParser:
+    """
+    Define an incremental parser for ENA portal API search results.
+
+    The portal returns either a JSON array of flat objects or a table of
+    tab-separated values with a header line. Records are decoded and yielded one by
+    one while the response body is still being downloaded such that neither the raw
+    body nor the entire list of records need to be kept in memory.
+
+    """
+
+    _decoder = json.JSONDecoder()
+    _whitespace = " \t\n\r"
+
+    @classmethod
+    def parse_records(cls, response: httpx.Response) -> List[Dict[str, str]]:
+        """Return all records of a response that was read completely."""
+        response.raise_for_status()
+        text = response.text
+        if text.lstrip(cls._whitespace).startswith("["):
+            return json.loads(text)
+        return list(cls._decode_tsv_rows(text.splitlines()))
+
+    @classmethod
+    async def iter_records(
+        cls, response: httpx.Response
+    ) -> AsyncIterator[Dict[str, str]]:
+        """Yield the records of a (streaming) response one by one."""
+        response.raise_for_status()
+        async for record in cls.iter_any_records(response.aiter_bytes()):
+            yield record
+
+    @classmethod
+    async def iter_any_records(
+        cls, chunks: AsyncIterable[bytes]
+    ) -> AsyncIterator[Dict[str, str]]:
+        """Yield records of either format, which is detected from the first byte."""
+        chunks = chunks.__aiter__()
+        head = b""
+        async for head in chunks:
+            head = head.lstrip(cls._whitespace.encode())
+            if head:
+                break
+        if not head:
+            return
+        decode = cls.iter_json_records if head[:1] == b"[" else cls.iter_tsv_records
+        async for record in decode(cls._prepend(head, chunks)):
+            yield record
+
+    @classmethod
+    async def _prepend(
+        cls, head: bytes, chunks: AsyncIterable[bytes]
+    ) -> AsyncIterator[bytes]:
+        yield head
+        async for chunk in chunks:
+            yield chunk
+
+    @classmethod
+    async def iter_tsv_records(
+        cls, chunks: AsyncIterable[bytes]
+    ) -> AsyncIterator[Dict[str, str]]:
+        """Yield the rows of a table of tab-separated values that arrives in chunks."""
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        header = None
+        remainder = ""
+        async for chunk in chunks:
+            lines = (remainder + decoder.decode(chunk)).split("\n")
+            remainder = lines.pop()
+            if header is None and lines:
+                header = lines.pop(0).rstrip("\r").split("\t")
+            if header is not None:
+                for record in cls._decode_tsv_rows(lines, header):
+                    yield record
+        lines = (remainder + decoder.decode(b"", final=True)).split("\n")
+        if header is None:
+            header = lines.pop(0).rstrip("\r").split("\t")
+        for record in cls._decode_tsv_rows(lines, header):
+            yield record
+
+    @classmethod
+    def _decode_tsv_rows(
+        cls, lines: Iterable[str], header: Optional[List[str]] = None
+    ) -> Iterator[Dict[str, str]]:
+        reader = csv.reader(lines, delimiter="\t", quoting=csv.QUOTE_NONE, strict=True)
+        if header is None:
+            header = next(reader, None)
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != len(header):
+                raise ValueError(
+                    f"Expected {len(header)} tab-separated values but found "
+                    f"{len(row)}."
+                )
+            yield dict(zip(header, row))
+
+    @classmethod
+    async def iter_json_records(
+        cls, chunks: AsyncIterable[bytes]
+    ) -> AsyncIterator[Dict[str, str]]:
+        """Yield the elements of a JSON array that arrives in chunks of bytes."""
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        buffer = ""
+        is_open = False
+        is_closed = False
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            records, buffer, is_open, is_closed = cls._decode_json_records(
+                buffer, is_open, is_closed
+            )
+            for record in records:
+                yield record
+        buffer += decoder.decode(b"", final=True)
+        records, buffer, is_open, is_closed = cls._decode_json_records(
+            buffer, is_open, is_closed
+        )
+        for record in records:
+            yield record
+        if buffer.strip(cls._whitespace):
+            raise ValueError(f"Unexpected trailing content '{buffer[:50]}'.")
+        # An empty body is treated like an empty array.
+        if is_open and not is_closed:
+            raise ValueError("Incomplete JSON array in response.")
+
+    @classmethod
+    def _decode_json_records(
+        cls, buffer: str, is_open: bool, is_closed: bool
+    ) -> Tuple[List[Dict[str, str]], str, bool, bool]:
+        """Decode as many complete records as possible from the start of a buffer."""
+        records = []
+        end = len(buffer)
+        index = 0
+        while not is_closed:
+            while index < end and buffer[index] in cls._whitespace:
+                index += 1
+            if index == end:
+                break
+            if not is_open:
+                if buffer[index] != "[":
+                    raise ValueError("Expected a JSON array in response.")
+                is_open = True
+                index += 1
+                continue
+            if buffer[index] == "]":
+                is_closed = True
+                index += 1
+                break
+            if buffer[index] == ",":
+                index += 1
+                continue
+            try:
+                record, index = cls._decoder.raw_decode(buffer, index)
+            except json.JSONDecodeError:
+                # The record is incomplete; wait for more data.
+                break
+            records.append(record)
+        return records, buffer[index:], is_open, is_closed
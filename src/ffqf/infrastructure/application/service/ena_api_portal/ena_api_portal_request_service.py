@@ -13,9 +13,6 @@ class ENAAPIPortalRequestService(RequestService):
     def __init__(self, *, settings: ENAAPIPortalSettings, **kwargs) -> None:
         """"""
         super().__init__(settings=settings, **kwargs)
-        self._client = httpx.AsyncClient(
-            base_url=self.settings.api_url, timeout=self.settings.timeout
-        )
 
     @property
     def settings(self) -> ENAAPIPortalSettings:
@@ -31,5 +28,4 @@ class ENAAPIPortalRequestService(RequestService):
         return await aiometer.run_all(
             [partial(self._make_request, self.client, r) for r in requests],
             max_at_once=self.settings.concurrency,
-            max_per_second=self.settings.concurrency,
         )
@@ -1,11 +1,11 @@
-from typing import List, cast
+from typing import AsyncIterator, List, Set, cast
 
 import httpx
-from pydantic import parse_obj_as
 
-from ffqf.application.service import RunInformationService
+from ffqf.application.service import IncompleteResponseError, RunInformationService
 from ffqf.domain.model import INSDCRunSet, RunInformation
 
+from .ena_api_portal_record_parser import ENAAPIPortalRecordParser
 from .ena_api_portal_request_service import ENAAPIPortalRequestService
 from .ena_api_portal_settings import ENAAPIPortalSettings
 
@@ -24,7 +24,7 @@ class ENAAPIPortalRunInformationService(RunInformationService):
                 "fields": ",".join(
                     cast(ENAAPIPortalSettings, request_service.settings).fields
                 ),
-                "format": "json",
+                "format": request_service.settings.response_format,
                 "includeAccessionType": "run",
                 "includeAccessions": ",".join(sorted(run_set)),
                 "limit": 0,
@@ -34,9 +34,29 @@ class ENAAPIPortalRunInformationService(RunInformationService):
 
     @classmethod
     def parse_run_info(
-        cls, response: httpx.Response, run_set: INSDCRunSet
+        cls, response: httpx.Response, run_set: INSDCRunSet, strict: bool = False
     ) -> List[RunInformation]:
-        response.raise_for_status()
-        result = parse_obj_as(List[RunInformation], response.json())
-        assert {r.run_accession for r in result} == run_set
+        result = [
+            RunInformation.from_record(record, strict=strict)
+            for record in ENAAPIPortalRecordParser.parse_records(response)
+        ]
+        cls._check_complete({r.run_accession for r in result}, run_set)
         return result
+
+    @classmethod
+    async def iter_run_info(
+        cls, response: httpx.Response, run_set: INSDCRunSet, strict: bool = False
+    ) -> AsyncIterator[RunInformation]:
+        """Yield run information while the response body is being downloaded."""
+        found = set()
+        async for record in ENAAPIPortalRecordParser.iter_records(response):
+            run = RunInformation.from_record(record, strict=strict)
+            found.add(run.run_accession)
+            yield run
+        cls._check_complete(found, run_set)
+
+    @classmethod
+    def _check_complete(cls, found: Set[str], run_set: INSDCRunSet) -> None:
+        missing = run_set.difference(found)
+        if missing:
+            raise IncompleteResponseError(missing)
@@ -1,4 +1,4 @@
-from typing import Collection
+from typing import Collection, Literal
 
 from pydantic import HttpUrl
 
@@ -9,6 +9,16 @@ class ENAAPIPortalSettings(APISettings):
 
     api_url: HttpUrl = "https://www.ebi.ac.uk/ena/portal/api/"
     concurrency: int = 10
+    # Tab-separated values do not repeat every field name in every record.
+    response_format: Literal["json", "tsv"] = "json"
+    # Studies, projects, and submissions may each map to thousands of runs.
+    bio_project_chunk_size: int = 20
+    study_chunk_size: int = 20
+    submission_chunk_size: int = 50
+    bio_sample_chunk_size: int = 200
+    experiment_chunk_size: int = 200
+    # Sample mappings are expressed as a query with one clause per accession.
+    sample_chunk_size: int = 100
     fields: Collection[str] = (
         "run_accession",
         "experiment_accession",
@@ -0,0 +1 @@
+from .file_cache_transport import FileCacheTransport
@@ -0,0 +1,253 @@
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Optional, Union
+from urllib.parse import parse_qsl
+
+import httpx
+from httpx._decoders import (
+    SUPPORTED_DECODERS,
+    ContentDecoder,
+    IdentityDecoder,
+    MultiDecoder,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_SIZE = 2**30
+
+
+class FileCacheTransport(httpx.AsyncBaseTransport):
+    """
+    Define an HTTP transport that keeps successful responses on disk.
+
+    Requests are identified by their method, URL and form body. Parameters are
+    sorted and so are comma-separated values, such that the same accessions
+    requested in a different order hit the same entry. Once the cached bodies
+    exceed the maximum size, the least recently used entries are evicted. Error
+    documents that E-utilities return with status 200 are never stored. They are
+    recognized in the decoded body, since bodies are stored as they were received.
+
+    """
+
+    _suffix = ".response"
+    # Credentials do not change the response.
+    _ignored_parameters = frozenset({"api_key"})
+    # E-utilities report some failures, e.g., `<eFetchResult><ERROR>`, with 200 OK.
+    _error_marker = b"<ERROR>"
+
+    def __init__(
+        self,
+        *,
+        directory: Union[str, Path],
+        max_size: int = DEFAULT_MAX_SIZE,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        **kwargs,
+    ) -> None:
+        """"""
+        super().__init__(**kwargs)
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        self._transport = httpx.AsyncHTTPTransport() if transport is None else transport
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        for path in sorted(
+            self._directory.glob(f"*{self._suffix}"), key=lambda p: p.stat().st_mtime
+        ):
+            self._entries[path.stem] = path.stat().st_size
+            self._size += path.stat().st_size
+
+    @classmethod
+    def cache_key(cls, request: httpx.Request) -> str:
+        """Return a key that is independent of the order of parameters and values."""
+        digest = hashlib.sha256()
+        digest.update(request.method.upper().encode())
+        digest.update(b"\n")
+        digest.update(str(request.url.copy_with(query=None, fragment=None)).encode())
+        digest.update(b"\n")
+        digest.update(cls._normalize_parameters(request.url.query.decode()).encode())
+        digest.update(b"\n")
+        body = request.read()
+        if request.headers.get("Content-Type", "").startswith(
+            "application/x-www-form-urlencoded"
+        ):
+            digest.update(cls._normalize_parameters(body.decode()).encode())
+        else:
+            digest.update(body)
+        return digest.hexdigest()
+
+    @classmethod
+    def _normalize_parameters(cls, query: str) -> str:
+        return json.dumps(
+            sorted(
+                (key, ",".join(sorted(value.split(","))))
+                for key, value in parse_qsl(query, keep_blank_values=True)
+                if key not in cls._ignored_parameters
+            )
+        )
+
+    @classmethod
+    def _redact(cls, url: httpx.URL) -> httpx.URL:
+        """Remove credentials from a URL before logging it."""
+        for name in cls._ignored_parameters:
+            url = url.copy_remove_param(name)
+        return url
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """"""
+        key = self.cache_key(request)
+        response = self._load(key, request)
+        if response is not None:
+            logger.debug("Replay cached response for %s.", self._redact(request.url))
+            return response
+        response = await self._transport.handle_async_request(request)
+        if response.status_code != 200:
+            return response
+        # The body is written to disk while it is being consumed such that
+        # responses can still be parsed incrementally.
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_CachingStream(self, key, response),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    def _path(self, key: str) -> Path:
+        return self._directory / f"{key}{self._suffix}"
+
+    def _load(self, key: str, request: httpx.Request) -> Optional[httpx.Response]:
+        if key not in self._entries:
+            return None
+        path = self._path(key)
+        try:
+            with path.open("rb") as handle:
+                meta = json.loads(handle.readline())
+                body = handle.read()
+        except (OSError, ValueError):
+            self._forget(key)
+            return None
+        if self._is_error_document(httpx.Headers(meta["headers"]), body):
+            # Entries stored before error documents were recognized.
+            self._forget(key)
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)
+        self._entries.move_to_end(key)
+        return httpx.Response(
+            status_code=meta["status_code"],
+            headers=meta["headers"],
+            stream=httpx.ByteStream(body),
+            request=request,
+        )
+
+    @classmethod
+    def _is_error_document(cls, headers: httpx.Headers, body: bytes) -> bool:
+        decoder = _content_decoder(headers)
+        try:
+            content = decoder.decode(body) + decoder.flush()
+        except httpx.DecodingError:
+            return True
+        return cls._error_marker in content
+
+    def _store(self, key: str, tmp: Path) -> None:
+        path = self._path(key)
+        os.replace(tmp, path)
+        self._forget(key)
+        size = path.stat().st_size
+        self._entries[key] = size
+        self._size += size
+        while self._size > self._max_size and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._forget(oldest)
+            self._path(oldest).unlink(missing_ok=True)
+
+    def _forget(self, key: str) -> None:
+        self._size -= self._entries.pop(key, 0)
+
+    @classmethod
+    def _header(cls, response: httpx.Response) -> bytes:
+        return (
+            json.dumps(
+                {
+                    "status_code": response.status_code,
+                    "headers": response.headers.multi_items(),
+                }
+            ).encode()
+            + b"\n"
+        )
+
+
+def _content_decoder(headers: httpx.Headers) -> ContentDecoder:
+    """Return a decoder for the content encodings of a response, as httpx does."""
+    decoders = [
+        SUPPORTED_DECODERS[encoding]()
+        for encoding in (
+            value.strip().lower()
+            for value in headers.get_list("content-encoding", split_commas=True)
+        )
+        if encoding in SUPPORTED_DECODERS
+    ]
+    if len(decoders) == 1:
+        return decoders[0]
+    if decoders:
+        return MultiDecoder(children=decoders)
+    return IdentityDecoder()
+
+
+class _CachingStream(httpx.AsyncByteStream):
+    """Pass on the chunks of a response body while copying them to the cache."""
+
+    def __init__(
+        self, cache: FileCacheTransport, key: str, response: httpx.Response
+    ) -> None:
+        self._cache = cache
+        self._key = key
+        self._response = response
+        self._tmp = cache._path(key).with_suffix(f".{os.getpid()}.{id(self)}.tmp")
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        marker = self._cache._error_marker
+        # Compressed bodies are checked after decoding them.
+        decoder = _content_decoder(self._response.headers)
+        # Keep the end of the body so far to find markers split across chunks.
+        overlap = len(marker) - 1
+        tail = b""
+        is_error = False
+        with self._tmp.open("wb") as handle:
+            handle.write(self._cache._header(self._response))
+            async for chunk in self._response.stream:
+                handle.write(chunk)
+                if not is_error:
+                    try:
+                        content = decoder.decode(chunk)
+                    except httpx.DecodingError:
+                        # The client fails to decode the body itself.
+                        is_error = True
+                    else:
+                        is_error = marker in tail + content
+                        tail = (tail + content)[-overlap:]
+                yield chunk
+            if not is_error:
+                try:
+                    is_error = marker in tail + decoder.flush()
+                except httpx.DecodingError:
+                    is_error = True
+        if is_error:
+            logger.debug("Do not cache the error document of %s.", self._key)
+            self._tmp.unlink(missing_ok=True)
+            return
+        # Only a completely received body is stored.
+        self._cache._store(self._key, self._tmp)
+
+    async def aclose(self) -> None:
+        self._tmp.unlink(missing_ok=True)
+        await self._response.aclose()
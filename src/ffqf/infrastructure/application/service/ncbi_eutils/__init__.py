@@ -1,3 +1,6 @@
+from .ncbi_eutils_experiment_package_parser import NCBIEutilsExperimentPackageParser
 from .ncbi_eutils_file_link_service import NCBIEutilsFileLinkService
+from .ncbi_eutils_geo_mapping_service import NCBIEutilsGEOMappingService
 from .ncbi_eutils_request_service import NCBIEutilsRequestService
+from .ncbi_eutils_run_information_service import NCBIEutilsRunInformationService
 from .ncbi_eutils_settings import NCBIEutilsSettings
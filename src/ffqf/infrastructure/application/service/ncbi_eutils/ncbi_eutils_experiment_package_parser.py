@@ -0,0 +1,163 @@
+import io
+import logging
+import re
+from contextlib import contextmanager
+from typing import AsyncIterator, ClassVar, Dict, Iterator, List, Pattern
+
+import httpx
+from lxml import etree
+
+from ffqf.domain.model import FileDescription, INSDCRunSet, URLType
+
+
+logger = logging.getLogger(__name__)
+
+
+class NCBIEutilsExperimentPackageParser:
+    """
+    Define an incremental parser for SRA experiment packages fetched with efetch.
+
+    Packages are yielded one by one, while the response body is still being
+    downloaded, and their memory is freed once the caller has processed them.
+
+    """
+
+    root_tag: ClassVar[str] = "EXPERIMENT_PACKAGE_SET"
+    package_tag: ClassVar[str] = "EXPERIMENT_PACKAGE"
+    _fastq_pattern: ClassVar[Pattern] = re.compile(r"\.(fastq|fq)(.gz)?$")
+
+    @classmethod
+    def parse_packages(cls, response: httpx.Response) -> Iterator[etree._Element]:
+        """Yield the packages of a response that was read completely."""
+        response.raise_for_status()
+        context = etree.iterparse(
+            io.BytesIO(response.content), events=("end",), tag=cls.package_tag
+        )
+        with cls._reject_malformed():
+            for _, package in context:
+                yield package
+                cls._release(package)
+        cls._check_root(context.root)
+
+    @classmethod
+    async def iter_packages(
+        cls, response: httpx.Response
+    ) -> AsyncIterator[etree._Element]:
+        """Yield the packages of a (streaming) response one by one."""
+        response.raise_for_status()
+        parser = etree.XMLPullParser(events=("end",), tag=cls.package_tag)
+        with cls._reject_malformed():
+            async for chunk in response.aiter_bytes():
+                parser.feed(chunk)
+                for _, package in parser.read_events():
+                    yield package
+                    cls._release(package)
+            root = parser.close()
+        cls._check_root(root)
+
+    @classmethod
+    def parse_file_links(
+        cls, package: etree._Element, run_set: INSDCRunSet, strict: bool = False
+    ) -> Dict[str, List[FileDescription]]:
+        """Return the file descriptions of the requested runs in a package."""
+        result: Dict[str, List[FileDescription]] = {}
+        for run in package.iter("RUN"):  # type: etree._Element
+            # NCBI returns experiment packages which may contain unrequested runs.
+            if run.get("accession") not in run_set:
+                logger.warning(
+                    "Run accession '%s' not in the requested set.", run.get("accession")
+                )
+                continue
+            clouds = [
+                (cloud_file.get("provider"), cloud_file.get("location"))
+                for cloud_file in run.iter("CloudFile")
+            ]
+            files = []
+            for sra_file in run.iter("SRAFile"):  # type: etree._Element
+                size = cls._parse_size(sra_file)
+                for alt in sra_file.iter("Alternatives"):  # type: etree._Element
+                    url = alt.get("url")
+                    if url is None:
+                        # Some alternatives only describe restricted access.
+                        continue
+                    region = None
+                    for scheme, location in clouds:
+                        if url.startswith(scheme):
+                            region = location
+                    if url.endswith("bam"):
+                        file_type = "bam"
+                    elif cls._fastq_pattern.search(url):
+                        file_type = "fastq"
+                    else:
+                        file_type = "sra"
+                    files.append(
+                        FileDescription.from_record(
+                            {
+                                "name": sra_file.get("filename"),
+                                "type": file_type,
+                                "size": size,
+                                "md5": sra_file.get("md5"),
+                                "url": url,
+                                "urltype": URLType(
+                                    cls.get_required(alt, "org").lower()
+                                ),
+                                "region": region,
+                            },
+                            strict=strict,
+                        )
+                    )
+                # run["total_spots"],
+                # run["total_bases"],
+            result[run.get("accession")] = files
+        return result
+
+    @classmethod
+    def find_required(cls, element: etree._Element, path: str) -> etree._Element:
+        """Return a sub-element that a package cannot do without."""
+        child = element.find(path)
+        if child is None:
+            raise ValueError(f"Element <{element.tag}> lacks a <{path}> element.")
+        return child
+
+    @classmethod
+    def get_required(cls, element: etree._Element, name: str) -> str:
+        """Return an attribute that a package cannot do without."""
+        value = element.get(name)
+        if value is None:
+            raise ValueError(f"Element <{element.tag}> lacks the attribute '{name}'.")
+        return value
+
+    @classmethod
+    def _parse_size(cls, sra_file: etree._Element) -> int:
+        size = cls.get_required(sra_file, "size")
+        try:
+            return int(size)
+        except ValueError:
+            raise ValueError(
+                f"Expected an integer file size but found '{size}'."
+            ) from None
+
+    @classmethod
+    @contextmanager
+    def _reject_malformed(cls) -> Iterator[None]:
+        """Turn syntax errors, e.g., of a truncated body, into a `ValueError`."""
+        try:
+            yield
+        except etree.XMLSyntaxError as error:
+            raise ValueError(f"Malformed E-utilities response: {error}") from error
+
+    @classmethod
+    def _check_root(cls, root: etree._Element) -> None:
+        """Reject responses that are not a set of experiment packages."""
+        if root.tag != cls.root_tag:
+            raise ValueError(
+                f"Unexpected root element <{root.tag}> instead of <{cls.root_tag}>."
+            )
+
+    @classmethod
+    def _release(cls, package: etree._Element) -> None:
+        """Free the memory of a processed package and of its predecessors."""
+        package.clear()
+        parent = package.getparent()
+        while package.getprevious() is not None:
+            del parent[0]
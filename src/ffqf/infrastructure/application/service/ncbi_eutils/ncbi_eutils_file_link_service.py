@@ -1,13 +1,12 @@
 import logging
-import re
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List, Tuple
 
 import httpx
-from lxml import etree
 
 from ffqf.application.service import FileLinkService
-from ffqf.domain.model import FileDescription, INSDCRunSet, URLType
+from ffqf.domain.model import FileDescription, INSDCRunSet
 
+from .ncbi_eutils_experiment_package_parser import NCBIEutilsExperimentPackageParser
 from .ncbi_eutils_request_service import NCBIEutilsRequestService
 
 
@@ -15,6 +14,7 @@ logger = logging.getLogger(__name__)
 
 
 class NCBIEutilsFileLinkService(FileLinkService):
+
     @classmethod
     def prepare_request(
         cls, request_service: NCBIEutilsRequestService, run_set: INSDCRunSet, **kwargs
@@ -31,52 +31,29 @@ class NCBIEutilsFileLinkService(FileLinkService):
 
     @classmethod
     def parse_file_links(
-        cls, response: httpx.Response, run_set: INSDCRunSet
+        cls, response: httpx.Response, run_set: INSDCRunSet, strict: bool = False
     ) -> Dict[str, List[FileDescription]]:
-        response.raise_for_status()
-        fastq_pattern = re.compile(r"\.(fastq|fq)(.gz)?$")
         result: Dict[str, List[FileDescription]] = {}
-        with open("/tmp/ncbi.xml", "wb") as handle:
-            handle.write(response.content)
-        root: etree._Element = etree.fromstring(response.content)
-        assert root.tag == "EXPERIMENT_PACKAGE_SET"
-        for run in root.iter("RUN"):  # type: etree._Element
-            # NCBI returns experiment packages which may contain unrequested runs.
-            if run.get("accession") not in run_set:
-                logger.warning(
-                    "Run accession '%s' not in the requested set.", run["accession"]
+        for package in NCBIEutilsExperimentPackageParser.parse_packages(response):
+            result.update(
+                NCBIEutilsExperimentPackageParser.parse_file_links(
+                    package, run_set, strict
                 )
-                continue
-            clouds = [
-                (cloud_file.get("provider"), cloud_file.get("location"))
-                for cloud_file in run.iter("CloudFile")
-            ]
-            files = []
-            for sra_file in run.iter("SRAFile"):  # type: etree._Element
-                for alt in sra_file.iter("Alternatives"):  # type: etree._Element
-                    region = None
-                    for scheme, location in clouds:
-                        if alt.get("url").startswith(scheme):
-                            region = location
-                    if alt.get("url").endswith("bam"):
-                        file_type = "bam"
-                    elif fastq_pattern.search(alt.get("url")):
-                        file_type = "fastq"
-                    else:
-                        file_type = "sra"
-                    files.append(
-                        FileDescription(
-                            name=sra_file.get("filename"),
-                            type=file_type,
-                            size=int(sra_file.get("size")),
-                            md5=sra_file.get("md5"),
-                            url=alt.get("url"),
-                            urltype=URLType(alt.get("org").lower()),
-                            region=region,
-                        )
-                    )
-                # run["total_spots"],
-                # run["total_bases"],
-            result[run.get("accession")] = files
-        # assert result == run_set
+            )
         return result
+
+    @classmethod
+    async def iter_file_links(
+        cls, response: httpx.Response, run_set: INSDCRunSet, strict: bool = False
+    ) -> AsyncIterator[Tuple[str, List[FileDescription]]]:
+        """
+        Yield file links per run while the response body is being downloaded.
+
+        Only one experiment package is kept in memory at any time.
+
+        """
+        async for package in NCBIEutilsExperimentPackageParser.iter_packages(response):
+            for item in NCBIEutilsExperimentPackageParser.parse_file_links(
+                package, run_set, strict
+            ).items():
+                yield item
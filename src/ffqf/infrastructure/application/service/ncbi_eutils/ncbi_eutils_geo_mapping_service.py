@@ -0,0 +1,150 @@
+import re
+from typing import Dict, List, Set
+
+import httpx
+from lxml import etree
+
+from ffqf.application.service import MappingService
+from ffqf.domain.model import AbstractAccessionSet, INSDCRunSet
+
+from .ncbi_eutils_request_service import NCBIEutilsRequestService
+
+
+class NCBIEutilsGEOMappingService(MappingService):
+    """
+    Define a service that maps GEO series and sample accessions to SRA runs.
+
+    GEO accessions are resolved with a chain of batched E-utilities requests:
+    esearch finds the GEO DataSets (gds) records, esummary attributes records to
+    accessions, elink follows each record to its SRA experiments, and a final
+    esummary lists the runs of those experiments.
+
+    """
+
+    _run_pattern = re.compile(r'acc="((?:SR|ER|DR)R\d+)"')
+
+    @classmethod
+    def get_chunk_size(cls, request_service: NCBIEutilsRequestService) -> int:
+        """"""
+        return request_service.scale_chunk_size(request_service.settings.geo_chunk_size)
+
+    @classmethod
+    def prepare_request(
+        cls,
+        request_service: NCBIEutilsRequestService,
+        accessions: AbstractAccessionSet,
+        **kwargs,
+    ) -> httpx.Request:
+        """Prepare the search for the GEO DataSets records of the accessions."""
+        return request_service.client.build_request(
+            method="POST",
+            url="esearch.fcgi",
+            data={
+                "db": "gds",
+                "term": " OR ".join(f"{acc}[ACCN]" for acc in sorted(accessions)),
+                "retmax": 10000,
+            },
+        )
+
+    @classmethod
+    async def map_accessions(
+        cls,
+        request_service: NCBIEutilsRequestService,
+        accessions: AbstractAccessionSet,
+        **kwargs,
+    ) -> Dict[str, INSDCRunSet]:
+        """"""
+        result = {acc: INSDCRunSet() for acc in accessions}
+        root = await cls._fetch(
+            request_service, cls.prepare_request(request_service, accessions)
+        )
+        uids = [uid.text for uid in root.iterfind("IdList/Id")]
+        if not uids:
+            return result
+        # Searching by accession may match related records, too.
+        gds2acc = {
+            uid: acc
+            for uid, acc in cls._parse_summaries(
+                await cls._fetch(
+                    request_service, cls._prepare_summary(request_service, "gds", uids)
+                ),
+                "Accession",
+            ).items()
+            if acc in result
+        }
+        if not gds2acc:
+            return result
+        gds2sra = cls._parse_links(
+            await cls._fetch(
+                request_service, cls._prepare_link(request_service, list(gds2acc))
+            )
+        )
+        sra_uids = sorted({uid for links in gds2sra.values() for uid in links})
+        if not sra_uids:
+            return result
+        sra2runs = cls._parse_summaries(
+            await cls._fetch(
+                request_service,
+                cls._prepare_summary(request_service, "sra", sra_uids),
+            ),
+            "Runs",
+        )
+        for gds_uid, links in gds2sra.items():
+            runs = result[gds2acc[gds_uid]]
+            for sra_uid in links:
+                runs.update(cls._run_pattern.findall(sra2runs.get(sra_uid, "")))
+        return result
+
+    @classmethod
+    async def _fetch(
+        cls, request_service: NCBIEutilsRequestService, request: httpx.Request
+    ) -> etree._Element:
+        async with request_service.stream(request) as response:
+            response.raise_for_status()
+            try:
+                root = etree.fromstring(await response.aread())
+            except etree.XMLSyntaxError as error:
+                raise ValueError(f"Malformed E-utilities response: {error}") from error
+        error = root.findtext("ERROR")
+        if error:
+            raise ValueError(f"E-utilities reported an error: {error}")
+        return root
+
+    @classmethod
+    def _prepare_summary(
+        cls, request_service: NCBIEutilsRequestService, database: str, uids: List[str]
+    ) -> httpx.Request:
+        return request_service.client.build_request(
+            method="POST",
+            url="esummary.fcgi",
+            data={"db": database, "id": ",".join(uids)},
+        )
+
+    @classmethod
+    def _prepare_link(
+        cls, request_service: NCBIEutilsRequestService, uids: List[str]
+    ) -> httpx.Request:
+        # Repeating the `id` parameter yields one link set per record.
+        return request_service.client.build_request(
+            method="POST",
+            url="elink.fcgi",
+            data={"dbfrom": "gds", "db": "sra", "id": uids},
+        )
+
+    @classmethod
+    def _parse_summaries(cls, root: etree._Element, item: str) -> Dict[str, str]:
+        """Map the UID of each document summary to the text of one of its items."""
+        return {
+            summary.findtext("Id"): summary.findtext(f"Item[@Name='{item}']") or ""
+            for summary in root.iterfind("DocSum")
+        }
+
+    @classmethod
+    def _parse_links(cls, root: etree._Element) -> Dict[str, Set[str]]:
+        """Map each source UID to the UIDs of its linked SRA records."""
+        return {
+            link_set.findtext("IdList/Id"): {
+                uid.text for uid in link_set.iterfind("LinkSetDb[DbTo='sra']/Link/Id")
+            }
+            for link_set in root.iterfind("LinkSet")
+        }
@@ -1,5 +1,5 @@
 from functools import partial
-from typing import List, cast
+from typing import ClassVar, Dict, FrozenSet, List, cast
 
 import aiometer
 import httpx
@@ -10,20 +10,25 @@ from .ncbi_eutils_settings import NCBIEutilsSettings
 
 
 class NCBIEutilsRequestService(RequestService):
+
+    _secret_parameters: ClassVar[FrozenSet[str]] = frozenset({"api_key"})
+
     def __init__(self, *, settings: NCBIEutilsSettings, **kwargs) -> None:
         """"""
         super().__init__(settings=settings, **kwargs)
-        self._client = httpx.AsyncClient(
-            base_url=self.settings.api_url,
-            params={"tool": self.settings.tool, "email": self.settings.email},
-            timeout=self.settings.timeout,
-        )
 
     @property
     def settings(self) -> NCBIEutilsSettings:
         """"""
         return cast(NCBIEutilsSettings, self._settings)
 
+    def _get_parameters(self) -> Dict[str, str]:
+        """"""
+        result = {"tool": self.settings.tool, "email": self.settings.email}
+        if self.settings.api_key:
+            result["api_key"] = self.settings.api_key
+        return result
+
     async def perform_requests(
         self, requests: List[httpx.Request]
     ) -> List[httpx.Response]:
@@ -33,5 +38,4 @@ class NCBIEutilsRequestService(RequestService):
         return await aiometer.run_all(
             [partial(self._make_request, self.client, r) for r in requests],
             max_at_once=self.settings.concurrency,
-            max_per_second=self.settings.concurrency,
         )
@@ -0,0 +1,128 @@
+from typing import AsyncIterator, ClassVar, Iterator, List, Optional, Set
+
+import httpx
+from lxml import etree
+
+from ffqf.application.service import IncompleteResponseError, RunInformationService
+from ffqf.domain.model import INSDCRunSet, RunInformation
+
+from .ncbi_eutils_experiment_package_parser import NCBIEutilsExperimentPackageParser
+from .ncbi_eutils_file_link_service import NCBIEutilsFileLinkService
+from .ncbi_eutils_request_service import NCBIEutilsRequestService
+
+
+class NCBIEutilsRunInformationService(RunInformationService):
+    """
+    Define a service that retrieves run information from SRA experiment packages.
+
+    The same efetch response that lists a run's files also describes its
+    experiment, sample, study and submission. Field names follow the ENA portal,
+    such that studies and samples are identified by their BioProject and
+    BioSample accessions, where available.
+
+    """
+
+    provides_file_links: ClassVar[bool] = True
+
+    @classmethod
+    def prepare_request(
+        cls, request_service: NCBIEutilsRequestService, run_set: INSDCRunSet, **kwargs
+    ) -> httpx.Request:
+        """"""
+        return NCBIEutilsFileLinkService.prepare_request(request_service, run_set)
+
+    @classmethod
+    def parse_run_info(
+        cls, response: httpx.Response, run_set: INSDCRunSet, strict: bool = False
+    ) -> List[RunInformation]:
+        """"""
+        result: List[RunInformation] = []
+        for package in NCBIEutilsExperimentPackageParser.parse_packages(response):
+            result.extend(cls._parse_package(package, run_set, strict))
+        cls._check_complete({run.run_accession for run in result}, run_set)
+        return result
+
+    @classmethod
+    async def iter_run_info(
+        cls, response: httpx.Response, run_set: INSDCRunSet, strict: bool = False
+    ) -> AsyncIterator[RunInformation]:
+        """Yield run information while the response body is being downloaded."""
+        found = set()
+        async for package in NCBIEutilsExperimentPackageParser.iter_packages(response):
+            for run in cls._parse_package(package, run_set, strict):
+                found.add(run.run_accession)
+                yield run
+        cls._check_complete(found, run_set)
+
+    @classmethod
+    def _check_complete(cls, found: Set[str], run_set: INSDCRunSet) -> None:
+        missing = run_set.difference(found)
+        if missing:
+            raise IncompleteResponseError(missing)
+
+    @classmethod
+    def _parse_package(
+        cls, package: etree._Element, run_set: INSDCRunSet, strict: bool = False
+    ) -> Iterator[RunInformation]:
+        files = NCBIEutilsExperimentPackageParser.parse_file_links(
+            package, run_set, strict
+        )
+        parser = NCBIEutilsExperimentPackageParser
+        experiment = parser.find_required(package, "EXPERIMENT")
+        study = parser.find_required(package, "STUDY")
+        sample = parser.find_required(package, "SAMPLE")
+        submission = parser.find_required(package, "SUBMISSION")
+        # Library and platform details are optional.
+        descriptor = experiment.find("DESIGN/LIBRARY_DESCRIPTOR")
+        if descriptor is None:
+            descriptor = etree.Element("LIBRARY_DESCRIPTOR")
+        layout = descriptor.find("LIBRARY_LAYOUT/*")
+        platform = experiment.find("PLATFORM/*")
+        study_accession = parser.get_required(study, "accession")
+        sample_accession = parser.get_required(sample, "accession")
+        shared = {
+            "experiment_accession": parser.get_required(experiment, "accession"),
+            "experiment_alias": experiment.get("alias"),
+            "experiment_title": experiment.findtext("TITLE"),
+            "study_accession": cls._external_id(study, "BioProject") or study_accession,
+            "secondary_study_accession": study_accession,
+            "study_alias": study.get("alias"),
+            "study_title": study.findtext("DESCRIPTOR/STUDY_TITLE"),
+            "sample_accession": cls._external_id(sample, "BioSample")
+            or sample_accession,
+            "secondary_sample_accession": sample_accession,
+            "sample_alias": sample.get("alias"),
+            "sample_title": sample.findtext("TITLE"),
+            "tax_id": sample.findtext("SAMPLE_NAME/TAXON_ID"),
+            "scientific_name": sample.findtext("SAMPLE_NAME/SCIENTIFIC_NAME"),
+            "submission_accession": parser.get_required(submission, "accession"),
+            "library_name": descriptor.findtext("LIBRARY_NAME"),
+            "library_strategy": descriptor.findtext("LIBRARY_STRATEGY"),
+            "library_source": descriptor.findtext("LIBRARY_SOURCE"),
+            "library_selection": descriptor.findtext("LIBRARY_SELECTION"),
+            "library_layout": None if layout is None else layout.tag,
+            "instrument_platform": None if platform is None else platform.tag,
+            "instrument_model": (
+                None if platform is None else platform.findtext("INSTRUMENT_MODEL")
+            ),
+        }
+        for run in package.iterfind("RUN_SET/RUN"):  # type: etree._Element
+            accession = run.get("accession")
+            if accession not in files:
+                continue
+            yield RunInformation.from_record(
+                {
+                    "run_accession": accession,
+                    "run_alias": run.get("alias"),
+                    "read_count": run.get("total_spots"),
+                    "base_count": run.get("total_bases"),
+                    "files": files[accession],
+                    **shared,
+                },
+                strict=strict,
+            )
+
+    @classmethod
+    def _external_id(cls, element: etree._Element, namespace: str) -> Optional[str]:
+        """Return an element's identifier in another database, if any."""
+        return element.findtext(f"IDENTIFIERS/EXTERNAL_ID[@namespace='{namespace}']")
@@ -1,4 +1,6 @@
-from pydantic import EmailStr, HttpUrl
+from typing import Any, Dict, Optional
+
+from pydantic import EmailStr, HttpUrl, root_validator
 
 from ffqf.application.service import APISettings
 
@@ -8,4 +10,20 @@ class NCBIEutilsSettings(APISettings):
     email: EmailStr
     api_url: HttpUrl = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
     tool: str = "ffqf"
-    concurrency: int = 3  # 10 with API Key
+    api_key: Optional[str] = None
+    # NCBI allows 3 requests per second, or 10 with an API key.
+    concurrency: Optional[int] = None
+    max_per_second: Optional[float] = None
+    # Keep efetch responses of experiment packages at a manageable size.
+    chunk_size: int = 200
+    # A GEO series may link to hundreds of SRA experiments.
+    geo_chunk_size: int = 50
+
+    @root_validator(skip_on_failure=True)
+    def default_to_allowed_rate(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Default to the highest rate that NCBI allows."""
+        rate = 10 if values.get("api_key") else 3
+        for field in ("concurrency", "max_per_second"):
+            if values.get(field) is None:
+                values[field] = rate
+        return values
@@ -1,2 +1,3 @@
 from .run_information_json_output_writer import RunInformationJSONOutputWriter
+from .run_information_ndjson_output_writer import RunInformationNDJSONOutputWriter
 from .run_information_table_output_writer import RunInformationTableOutputWriter
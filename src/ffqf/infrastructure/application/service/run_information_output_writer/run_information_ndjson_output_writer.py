@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+from typing import AsyncIterable, Iterable, List, Optional, TextIO
+
+from ffqf.application.service import RunInformationOutputWriter
+from ffqf.domain.model import RunInformation
+
+
+class RunInformationNDJSONOutputWriter(RunInformationOutputWriter):
+    """Write run information as newline-delimited JSON, one run per line."""
+
+    @classmethod
+    def write(
+        cls, run_info: List[RunInformation], output: Optional[Path] = None, **kwargs
+    ) -> None:
+        """"""
+        if output:
+            with output.open(mode="w") as handle:
+                cls._write(run_info, handle, **kwargs)
+        else:
+            cls._write(run_info, sys.stdout, **kwargs)
+
+    @classmethod
+    async def write_stream(
+        cls,
+        run_info: AsyncIterable[RunInformation],
+        output: Optional[Path] = None,
+        **kwargs,
+    ) -> None:
+        """Write and flush every record as soon as it is received."""
+        if output:
+            with output.open(mode="w") as handle:
+                await cls._write_stream(run_info, handle, **kwargs)
+        else:
+            await cls._write_stream(run_info, sys.stdout, **kwargs)
+
+    @classmethod
+    def _write(
+        cls, run_info: Iterable[RunInformation], handle: TextIO, **kwargs
+    ) -> None:
+        for run in run_info:
+            cls._write_record(run, handle, **kwargs)
+
+    @classmethod
+    async def _write_stream(
+        cls, run_info: AsyncIterable[RunInformation], handle: TextIO, **kwargs
+    ) -> None:
+        async for run in run_info:
+            cls._write_record(run, handle, **kwargs)
+            handle.flush()
+
+    @classmethod
+    def _write_record(cls, run: RunInformation, handle: TextIO, **kwargs) -> None:
+        handle.write(run.json(**kwargs))
+        handle.write("\n")
@@ -14,8 +14,7 @@ class RunInformationTableOutputWriter(RunInformationOutputWriter):
     ) -> None:
         """"""
         if "fieldnames" not in kwargs:
-            kwargs["fieldnames"] = header = list(run_info[0].dict(exclude={"files"}))
-            header.extend(["aws_files", "aws_md5", "gcp_files", "gcp_md5"])
+            kwargs["fieldnames"] = cls._header(run_info)
         if "dialect" not in kwargs:
             kwargs["dialect"] = "excel-tab"
         if "quoting" not in kwargs:
@@ -26,6 +25,17 @@ class RunInformationTableOutputWriter(RunInformationOutputWriter):
         else:
             cls._write(run_info, sys.stdout, **kwargs)
 
+    @classmethod
+    def _header(cls, run_info: List[RunInformation]) -> List[str]:
+        """Collect the fields of all runs, since they differ between sources."""
+        header = dict.fromkeys(RunInformation.__fields__)
+        for run in run_info:
+            for name, _ in run:
+                header.setdefault(name)
+        del header["files"]
+        header.update(dict.fromkeys(["aws_files", "aws_md5", "gcp_files", "gcp_md5"]))
+        return list(header)
+
     @classmethod
     def _write(cls, run_info: List[RunInformation], handle: TextIO, **kwargs) -> None:
         writer = csv.DictWriter(handle, **kwargs)
@@ -0,0 +1,2 @@
+from .sqlite_run_information_cache import SQLiteRunInformationCache
+from .sqlite_mapping_cache import SQLiteMappingCache
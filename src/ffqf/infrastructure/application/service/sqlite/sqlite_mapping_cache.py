@@ -0,0 +1,83 @@
+import logging
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Union
+
+from ffqf.application.service import CachedRunMapping, MappingCache
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_TTL = timedelta(days=7)
+
+
+class SQLiteMappingCache(MappingCache):
+    """
+    Define a persistent cache of accession to run mappings backed by SQLite.
+
+    Every accession is stored with the time that its runs were fetched. Entries
+    older than the time to live are returned marked as expired such that only runs
+    added since then need to be fetched.
+
+    """
+
+    # Stay well below SQLite's limit on the number of query parameters.
+    _max_parameters = 500
+
+    def __init__(
+        self, *, path: Union[str, Path], ttl: timedelta = DEFAULT_TTL, **kwargs
+    ) -> None:
+        """"""
+        super().__init__(**kwargs)
+        self._ttl = ttl
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS run_mapping ("
+                "accession TEXT PRIMARY KEY, "
+                "fetched_at REAL NOT NULL, "
+                "runs TEXT NOT NULL)"
+            )
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def get_many(self, accessions: Iterable[str]) -> Dict[str, CachedRunMapping]:
+        """"""
+        oldest = datetime.now(timezone.utc) - self._ttl
+        accessions = sorted(accessions)
+        result = {}
+        for start in range(0, len(accessions), self._max_parameters):
+            chunk = accessions[start : start + self._max_parameters]
+            rows = self._connection.execute(
+                "SELECT accession, fetched_at, runs FROM run_mapping "
+                f"WHERE accession IN ({', '.join('?' * len(chunk))})",  # noqa: S608
+                chunk,
+            )
+            for accession, timestamp, runs in rows:
+                fetched_at = datetime.fromtimestamp(timestamp, timezone.utc)
+                result[accession] = CachedRunMapping(
+                    runs=frozenset(runs.split(",")) if runs else frozenset(),
+                    fetched_at=fetched_at,
+                    is_expired=fetched_at < oldest,
+                )
+        logger.debug(
+            "Found %d of %d mappings in the cache.", len(result), len(accessions)
+        )
+        return result
+
+    def put_many(
+        self, mappings: Mapping[str, Iterable[str]], fetched_at: datetime
+    ) -> None:
+        """"""
+        timestamp = fetched_at.timestamp()
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO run_mapping VALUES (?, ?, ?)",
+                (
+                    (accession, timestamp, ",".join(sorted(runs)))
+                    for accession, runs in mappings.items()
+                ),
+            )
@@ -0,0 +1,88 @@
+import json
+import logging
+import sqlite3
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Iterable, List, Union
+
+from ffqf.application.service import RunInformationCache
+from ffqf.domain.model import INSDCRunSet, RunInformation
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_TTL = timedelta(days=30)
+
+
+class SQLiteRunInformationCache(RunInformationCache):
+    """
+    Define a persistent run information cache backed by an SQLite database.
+
+    Every entry is stored as JSON together with the time that it was stored at.
+    Entries older than the time to live are ignored and replaced when the same run
+    is stored again. Like records from the archives, entries are only validated
+    when they are read in strict mode. Invalid entries are then treated as missing.
+
+    """
+
+    # Stay well below SQLite's limit on the number of query parameters.
+    _max_parameters = 500
+
+    def __init__(
+        self,
+        *,
+        path: Union[str, Path],
+        ttl: timedelta = DEFAULT_TTL,
+        strict: bool = False,
+        **kwargs,
+    ) -> None:
+        """"""
+        super().__init__(**kwargs)
+        self._ttl = ttl
+        self._strict = strict
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS run_information ("
+                "run_accession TEXT PRIMARY KEY, "
+                "stored_at REAL NOT NULL, "
+                "data TEXT NOT NULL)"
+            )
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def get_many(self, run_set: INSDCRunSet) -> List[RunInformation]:
+        """"""
+        oldest = time.time() - self._ttl.total_seconds()
+        accessions = sorted(run_set)
+        result = []
+        for start in range(0, len(accessions), self._max_parameters):
+            chunk = accessions[start : start + self._max_parameters]
+            rows = self._connection.execute(
+                "SELECT data FROM run_information WHERE stored_at >= ? "
+                f"AND run_accession IN ({', '.join('?' * len(chunk))})",  # noqa: S608
+                [oldest, *chunk],
+            )
+            for (data,) in rows:
+                try:
+                    result.append(
+                        RunInformation.from_record(
+                            json.loads(data), strict=self._strict
+                        )
+                    )
+                except ValueError as error:
+                    logger.warning("Ignore an invalid cache entry: %s", error)
+        logger.debug("Found %d of %d runs in the cache.", len(result), len(run_set))
+        return result
+
+    def put_many(self, run_info: Iterable[RunInformation]) -> None:
+        """"""
+        now = time.time()
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO run_information VALUES (?, ?, ?)",
+                ((run.run_accession, now, run.json()) for run in run_info),
+            )
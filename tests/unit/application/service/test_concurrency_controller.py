@@ -0,0 +1,40 @@
+from ffqf.application.service import AIMDConcurrencyController, ConcurrencyController
+
+
+def test_fixed():
+    controller = ConcurrencyController(max_concurrency=10)
+    controller.record(started=0.0, latency=100.0, is_success=False)
+    assert controller.concurrency == 10
+    assert controller.scale_chunk_size(500) == 500
+
+
+def test_additive_increase():
+    controller = AIMDConcurrencyController(max_concurrency=10)
+    assert controller.concurrency == 5
+    for _ in range(100):
+        controller.record(started=0.0, latency=1.0, is_success=True)
+    assert controller.concurrency == 10
+
+
+def test_multiplicative_decrease():
+    controller = AIMDConcurrencyController(max_concurrency=10, min_concurrency=2)
+    controller.record(started=0.0, latency=1.0, is_success=False)
+    assert controller.concurrency == 2
+    assert controller.scale_chunk_size(500) == 500
+
+
+def test_decrease_once_per_burst():
+    controller = AIMDConcurrencyController(max_concurrency=16)
+    controller.record(started=0.0, latency=1.0, is_success=False)
+    # Requests that were already in flight do not count again.
+    controller.record(started=0.5, latency=1.0, is_success=False)
+    assert controller.concurrency == 4
+    controller.record(started=2.0, latency=1.0, is_success=False)
+    assert controller.concurrency == 2
+
+
+def test_slow_responses_shrink_chunks():
+    controller = AIMDConcurrencyController(max_concurrency=10, latency_target=5.0)
+    controller.record(started=0.0, latency=6.0, is_success=True)
+    assert controller.concurrency == 5
+    assert controller.scale_chunk_size(500) == 250
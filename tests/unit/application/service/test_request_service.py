@@ -1,17 +1,23 @@
+import time
 from functools import partial
-from typing import List
+from typing import AsyncIterator, List, Tuple
 
 import aiometer
+import anyio
 import httpx
+import pytest
 
-from ffqf.application.service import APISettings, RequestService
+from ffqf.application.service import (
+    APISettings,
+    ConcurrencyController,
+    RequestService,
+)
 
 
 class HTTPService(RequestService):
     def __init__(self, *, settings: APISettings, **kwargs) -> None:
         """"""
         super().__init__(settings=settings, **kwargs)
-        self._client = httpx.AsyncClient(base_url=self.settings.api_url)
 
     async def perform_requests(
         self, requests: List[httpx.Request]
@@ -36,3 +42,127 @@ async def test_requests():
     ]
     async with client:
         results = await client.perform_requests(requests)
+
+
+class RecordingController(ConcurrencyController):
+    def __init__(self, **kwargs) -> None:
+        """"""
+        super().__init__(max_concurrency=2, **kwargs)
+        self.outcomes: List[Tuple[float, bool]] = []
+
+    def record(self, *, started: float, latency: float, is_success: bool) -> None:
+        """"""
+        self.outcomes.append((latency, is_success))
+
+
+class SlowBody(httpx.AsyncByteStream):
+    def __init__(self, error: bool = False) -> None:
+        self.error = error
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield b"["
+        await anyio.sleep(0.05)
+        if self.error:
+            raise httpx.RemoteProtocolError("peer closed connection")
+        yield b"]"
+
+
+def make_service(handler) -> HTTPService:
+    return HTTPService(
+        settings=APISettings(
+            api_url="https://example.org",
+            concurrency=2,
+            max_per_second=1000,
+            backoff_base=0.001,
+        ),
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def test_retry_transient_status():
+    statuses = [503, 429, 200]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(statuses.pop(0), headers={"Retry-After": "0"})
+
+    service = make_service(handler)
+
+    async def run():
+        async with service:
+            return await service.perform_requests(
+                [service.client.build_request("GET", "/")]
+            )
+
+    (response,) = anyio.run(run)
+    assert response.status_code == 200
+    assert statuses == []
+
+
+def test_retry_budget():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    service = make_service(handler)
+    service.settings.max_retries = 2
+
+    async def run():
+        async with service:
+            async with service.stream(service.client.build_request("GET", "/")):
+                pass
+
+    with pytest.raises(httpx.ReadTimeout):
+        anyio.run(run)
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize("error", [False, True])
+def test_record_streamed_body(error: bool):
+    service = make_service(lambda request: httpx.Response(200, stream=SlowBody(error)))
+    controller = service._controller = RecordingController()
+
+    async def run():
+        async with service:
+            async with service.stream(service.client.build_request("GET", "/")) as r:
+                assert controller.outcomes == []
+                await r.aread()
+
+    if error:
+        with pytest.raises(httpx.RemoteProtocolError):
+            anyio.run(run)
+    else:
+        anyio.run(run)
+    ((latency, is_success),) = controller.outcomes
+    # The time to download the body counts towards the latency.
+    assert latency >= 0.05
+    assert is_success is not error
+
+
+def test_rate_limit_by_default():
+    started = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        started.append(time.monotonic())
+        return httpx.Response(200)
+
+    service = HTTPService(
+        settings=APISettings(api_url="https://example.org", concurrency=20),
+        transport=httpx.MockTransport(handler),
+    )
+
+    async def fetch() -> None:
+        async with service.stream(service.client.build_request("GET", "/")):
+            pass
+
+    async def run():
+        async with service:
+            async with anyio.create_task_group() as group:
+                for _ in range(5):
+                    group.start_soon(fetch)
+
+    anyio.run(run)
+    # Streamed requests are spaced out at the concurrency per second.
+    assert len(started) == 5
+    assert started[-1] - started[0] >= 4 / 20 - 0.01
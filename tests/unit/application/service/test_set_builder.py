@@ -0,0 +1,61 @@
+import pytest
+
+from ffqf.application.service import SetBuilder
+
+
+ACCESSIONS = {
+    "bio_projects": ["PRJNA1", "PRJEB2", "PRJDB3"],
+    "bio_samples": ["SAMN1", "SAMEA2", "SAMEG3", "SAMD4"],
+    "studies": ["SRP1", "ERP2", "DRP3"],
+    "samples": ["SRS1", "ERS2", "DRS3"],
+    "experiments": ["SRX1", "ERX2", "DRX3"],
+    "runs": ["SRR1", "ERR000002", "DRR3", "SRR1"],
+    "submissions": ["SRA1", "ERA2", "DRA3"],
+    "geo_series": ["GSE1"],
+    "geo_samples": ["GSM1"],
+}
+
+
+def test_classify():
+    builder = SetBuilder()
+    invalid = builder.from_accessions(
+        [acc for accessions in ACCESSIONS.values() for acc in accessions]
+    )
+    assert invalid == []
+    for name, accessions in ACCESSIONS.items():
+        assert getattr(builder, name) == set(accessions)
+
+
+@pytest.mark.parametrize("accession", ["PRJXX1", "SRR", "SRR1a", "srr1", "XYZ1", ""])
+def test_strict(accession: str):
+    with pytest.raises(RuntimeError):
+        SetBuilder().from_accessions(["SRR1", accession])
+
+
+def test_report_invalid():
+    builder = SetBuilder()
+    invalid = builder.from_accessions(
+        ["SRR1", "PRJXX1", "SRR2", "GSE", "SAMN1"], strict=False
+    )
+    assert invalid == ["PRJXX1", "GSE"]
+    assert builder.runs == {"SRR1", "SRR2"}
+    assert builder.bio_samples == {"SAMN1"}
+
+
+def test_accumulate():
+    builder = SetBuilder()
+    builder.from_accessions(["SRR1"])
+    builder.from_accessions(["SRR2", "SRR1"])
+    assert builder.runs == {"SRR1", "SRR2"}
+
+
+def test_update_new():
+    builder = SetBuilder()
+    builder.from_accessions(["SRR1", "PRJNA1"])
+    window = SetBuilder()
+    window.from_accessions(["SRR1", "SRR2", "PRJNA1", "GSE1"])
+    new = builder.update_new(window)
+    assert new.runs == {"SRR2"}
+    assert new.bio_projects == set()
+    assert new.geo_series == {"GSE1"}
+    assert builder.runs == {"SRR1", "SRR2"}
@@ -0,0 +1,30 @@
+import anyio
+import pytest
+
+from ffqf.application.service import TokenBucket
+
+
+def test_even_spacing():
+    bucket = TokenBucket(rate=50)
+    times = []
+
+    async def take():
+        await bucket.acquire()
+        times.append(anyio.current_time())
+
+    async def run():
+        async with anyio.create_task_group() as group:
+            for _ in range(6):
+                group.start_soon(take)
+
+    anyio.run(run)
+    times.sort()
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    # No two requests happen in a burst.
+    assert min(gaps) >= 0.015
+    assert times[-1] - times[0] == pytest.approx(0.1, abs=0.05)
+
+
+def test_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
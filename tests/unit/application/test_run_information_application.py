@@ -0,0 +1,308 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import anyio
+import httpx
+import pytest
+
+from ffqf.application import RunInformationApplication
+from ffqf.domain.model import INSDCRunSet
+from ffqf.infrastructure.application.service import (
+    ENAAPIPortalBioProjectMappingService,
+    ENAAPIPortalBioSampleMappingService,
+    ENAAPIPortalFileLinkService,
+    ENAAPIPortalINSDCExperimentMappingService,
+    ENAAPIPortalINSDCSampleMappingService,
+    ENAAPIPortalINSDCStudyMappingService,
+    ENAAPIPortalINSDCSubmissionMappingService,
+    ENAAPIPortalRequestService,
+    ENAAPIPortalRunInformationService,
+    ENAAPIPortalSettings,
+    NCBIEutilsFileLinkService,
+    NCBIEutilsRequestService,
+    NCBIEutilsRunInformationService,
+    NCBIEutilsSettings,
+    SQLiteMappingCache,
+    SQLiteRunInformationCache,
+)
+
+
+PROJECTS = {
+    "PRJNA1": ["SRR1", "SRR2", "SRR3", "SRR4"],
+    "PRJNA3": ["SRR1", "SRR2"],
+}
+# Runs that the portal omits from its response.
+WITHDRAWN = {"SRR3"}
+# Runs that make the portal fail whenever they are part of a request.
+BROKEN = {"SRR4"}
+# Runs for which NCBI responds with a truncated body or an error document.
+TRUNCATED = {"SRR5"}
+REJECTED = {"SRR6"}
+# Runs that were first made public after any mapping in the tests was cached.
+RECENT = {"SRR2"}
+
+
+def run_record(run: str) -> Dict[str, str]:
+    return {
+        "run_accession": run,
+        "experiment_accession": "SRX1",
+        "sample_accession": "SAMN1",
+        "secondary_sample_accession": "SRS1",
+        "submission_accession": "SRA1",
+        "study_accession": "PRJNA1",
+        "secondary_study_accession": "SRP1",
+    }
+
+
+def make_runs(*accessions: str) -> INSDCRunSet:
+    result = INSDCRunSet()
+    result.update(accessions)
+    return result
+
+
+def experiment_package(run: str) -> str:
+    return (
+        '<EXPERIMENT_PACKAGE><EXPERIMENT accession="SRX1"><DESIGN>'
+        "<LIBRARY_DESCRIPTOR/></DESIGN></EXPERIMENT>"
+        '<SUBMISSION accession="SRA1"/><STUDY accession="SRP1"/>'
+        f'<SAMPLE accession="SRS1"/><RUN_SET><RUN accession="{run}"/></RUN_SET>'
+        "</EXPERIMENT_PACKAGE>"
+    )
+
+
+@pytest.fixture()
+def ena_requests() -> List[Set[str]]:
+    return []
+
+
+@pytest.fixture()
+def ncbi_requests() -> List[Set[str]]:
+    return []
+
+
+def make_app(
+    ena_requests: List[Set[str]],
+    ncbi_requests: List[Set[str]],
+    ena_queries: Optional[List[str]] = None,
+    **kwargs,
+) -> RunInformationApplication:
+    def ena(request: httpx.Request) -> httpx.Response:
+        data = dict(httpx.QueryParams(request.content.decode()))
+        accessions = set(data["includeAccessions"].split(","))
+        ena_requests.append(accessions)
+        if ena_queries is not None and "query" in data:
+            ena_queries.append(data["query"])
+        if data["includeAccessionType"] == "study":
+            return httpx.Response(
+                200,
+                json=[
+                    {**run_record(run), "study_accession": project}
+                    for project in sorted(accessions)
+                    for run in PROJECTS.get(project, [])
+                    if "first_public" not in data.get("query", "") or run in RECENT
+                ],
+            )
+        if accessions & BROKEN:
+            return httpx.Response(500)
+        return httpx.Response(
+            200, json=[run_record(run) for run in sorted(accessions - WITHDRAWN)]
+        )
+
+    def ncbi(request: httpx.Request) -> httpx.Response:
+        data = dict(httpx.QueryParams(request.content.decode()))
+        runs = set(data["id"].split(","))
+        ncbi_requests.append(runs)
+        if runs & TRUNCATED:
+            return httpx.Response(
+                200, text="<EXPERIMENT_PACKAGE_SET>" + experiment_package("SRR5")[:50]
+            )
+        if runs & REJECTED:
+            return httpx.Response(
+                200, text="<eFetchResult><ERROR>Internal error</ERROR></eFetchResult>"
+            )
+        return httpx.Response(
+            200,
+            text="<EXPERIMENT_PACKAGE_SET>"
+            + "".join(experiment_package(run) for run in sorted(runs - WITHDRAWN))
+            + "</EXPERIMENT_PACKAGE_SET>",
+        )
+
+    return RunInformationApplication(
+        bio_project_mapping_service=ENAAPIPortalBioProjectMappingService,
+        bio_sample_mapping_service=ENAAPIPortalBioSampleMappingService,
+        insdc_study_mapping_service=ENAAPIPortalINSDCStudyMappingService,
+        insdc_sample_mapping_service=ENAAPIPortalINSDCSampleMappingService,
+        insdc_experiment_mapping_service=ENAAPIPortalINSDCExperimentMappingService,
+        insdc_submission_mapping_service=ENAAPIPortalINSDCSubmissionMappingService,
+        run_information_service=ENAAPIPortalRunInformationService,
+        file_link_service=NCBIEutilsFileLinkService,
+        ena_request_service=ENAAPIPortalRequestService(
+            settings=ENAAPIPortalSettings(max_retries=0),
+            transport=httpx.MockTransport(ena),
+        ),
+        ncbi_request_service=NCBIEutilsRequestService(
+            settings=NCBIEutilsSettings(email="test@example.org", max_per_second=100),
+            transport=httpx.MockTransport(ncbi),
+        ),
+        linger=0.01,
+        **kwargs,
+    )
+
+
+@pytest.fixture()
+def app(
+    ena_requests: List[Set[str]], ncbi_requests: List[Set[str]]
+) -> RunInformationApplication:
+    return make_app(ena_requests, ncbi_requests)
+
+
+def test_isolate_failures(app: RunInformationApplication, ena_requests: List[Set[str]]):
+    result = anyio.run(app.run, ["PRJNA1", "PRJNA2"])
+    assert sorted(run.run_accession for run in result) == ["SRR1", "SRR2"]
+    assert set(app.failures) == {"PRJNA2", "SRR3", "SRR4"}
+    # Only the unmapped project is retried, and bad runs are bisected.
+    assert {"SRR1", "SRR2"} in ena_requests
+    assert len(ena_requests) == 7
+
+
+def test_run_passthrough(
+    app: RunInformationApplication,
+    ena_requests: List[Set[str]],
+    ncbi_requests: List[Set[str]],
+):
+    result = anyio.run(app.run, ["SRR2", "SRR1", "SRR1"])
+    assert sorted(run.run_accession for run in result) == ["SRR1", "SRR2"]
+    # Runs need no mapping, only one request for information and one for files.
+    assert ena_requests == [{"SRR1", "SRR2"}]
+    assert ncbi_requests == [{"SRR1", "SRR2"}]
+
+
+def test_merge_direct_and_mapped_runs(
+    app: RunInformationApplication, ena_requests: List[Set[str]]
+):
+    result = anyio.run(app.run, ["SRR1", "PRJNA3"])
+    assert sorted(run.run_accession for run in result) == ["SRR1", "SRR2"]
+    requested = [
+        acc for accessions in ena_requests for acc in accessions if acc != "PRJNA3"
+    ]
+    assert sorted(requested) == ["SRR1", "SRR2"]
+
+
+def test_ena_file_links(
+    app: RunInformationApplication,
+    ena_requests: List[Set[str]],
+    ncbi_requests: List[Set[str]],
+):
+    app.file_link_service = ENAAPIPortalFileLinkService
+    result = anyio.run(app.run, ["SRR1", "SRR2"])
+    assert sorted(run.run_accession for run in result) == ["SRR1", "SRR2"]
+    assert ena_requests == [{"SRR1", "SRR2"}]
+    assert ncbi_requests == []
+
+
+def test_ncbi_run_information(
+    app: RunInformationApplication,
+    ena_requests: List[Set[str]],
+    ncbi_requests: List[Set[str]],
+):
+    app.run_information_service = NCBIEutilsRunInformationService
+    app.run_information_request_service = app.ncbi_request_service
+    result = anyio.run(app.run, ["SRR1", "SRR2"])
+    assert sorted(run.run_accession for run in result) == ["SRR1", "SRR2"]
+    assert result[0].secondary_study_accession == "SRP1"
+    # Run information and file links stem from a single request.
+    assert ena_requests == []
+    assert ncbi_requests == [{"SRR1", "SRR2"}]
+
+
+def test_malformed_ncbi_responses(
+    app: RunInformationApplication, ncbi_requests: List[Set[str]]
+):
+    app.run_information_service = NCBIEutilsRunInformationService
+    app.run_information_request_service = app.ncbi_request_service
+    result = anyio.run(app.run, ["SRR1", "SRR5", "SRR6"])
+    assert [run.run_accession for run in result] == ["SRR1"]
+    assert set(app.failures) == {"SRR5", "SRR6"}
+    assert "Malformed" in app.failures["SRR5"]
+    assert "eFetchResult" in app.failures["SRR6"]
+    assert {"SRR1"} in ncbi_requests
+
+
+def test_fused_mapping(
+    app: RunInformationApplication,
+    ena_requests: List[Set[str]],
+    ncbi_requests: List[Set[str]],
+):
+    app.fused_mapping = True
+    result = anyio.run(app.run, ["SRR1", "PRJNA3"])
+    assert sorted(run.run_accession for run in result) == ["SRR1", "SRR2"]
+    # The mapping response already describes the project's runs.
+    assert sorted(map(sorted, ena_requests)) == [["PRJNA3"], ["SRR1"]]
+    assert sorted(run for runs in ncbi_requests for run in runs) == ["SRR1", "SRR2"]
+
+
+def test_stream_windows(
+    app: RunInformationApplication,
+    ena_requests: List[Set[str]],
+    ncbi_requests: List[Set[str]],
+):
+    async def windows():
+        yield ["SRR1", "PRJNA3"]
+        yield ["PRJNA3", "SRR2", "SRR1", "invalid"]
+
+    async def collect():
+        send_results, receive_results = anyio.create_memory_object_stream(100)
+        async with anyio.create_task_group() as group:
+            group.start_soon(app.stream_windows, windows(), send_results)
+            async with receive_results:
+                return [run async for run in receive_results]
+
+    result = anyio.run(collect)
+    assert sorted(run.run_accession for run in result) == ["SRR1", "SRR2"]
+    assert set(app.failures) == {"invalid"}
+    # Accessions repeated in later windows are neither mapped nor requested again.
+    assert [acc for accessions in ena_requests for acc in accessions].count(
+        "PRJNA3"
+    ) == 1
+    assert sorted(run for runs in ncbi_requests for run in runs) == ["SRR1", "SRR2"]
+
+
+def test_run_information_cache(tmp_path: Path):
+    cache = SQLiteRunInformationCache(path=tmp_path / "cache.sqlite")
+    ena_requests, ncbi_requests = [], []
+    first = anyio.run(
+        make_app(ena_requests, ncbi_requests, run_information_cache=cache).run,
+        ["SRR1", "SRR5"],
+    )
+    assert sorted(run.run_accession for run in first) == ["SRR1", "SRR5"]
+    # Runs whose file links failed are not cached, lest they lack them until expiry.
+    cached = cache.get_many(make_runs("SRR1", "SRR5"))
+    assert [run.run_accession for run in cached] == ["SRR1"]
+    ena_requests.clear()
+    ncbi_requests.clear()
+    app = make_app(ena_requests, ncbi_requests, run_information_cache=cache)
+    second = anyio.run(app.run, ["SRR1", "SRR5"])
+    assert sorted(run.run_accession for run in second) == ["SRR1", "SRR5"]
+    assert [run for run in second if run.run_accession == "SRR1"] == [
+        run for run in first if run.run_accession == "SRR1"
+    ]
+    assert ena_requests == [{"SRR5"}]
+    assert {"SRR5"} in ncbi_requests
+    assert "SRR1" not in {run for runs in ncbi_requests for run in runs}
+
+
+def test_mapping_cache_refresh(tmp_path: Path):
+    cache = SQLiteMappingCache(path=tmp_path / "cache.sqlite")
+    fetched_at = datetime.now(timezone.utc) - timedelta(days=30)
+    cache.put_many({"PRJNA3": {"SRR1"}}, fetched_at=fetched_at)
+    ena_requests, ncbi_requests, ena_queries = [], [], []
+    app = make_app(ena_requests, ncbi_requests, ena_queries, mapping_cache=cache)
+    result = anyio.run(app.run, ["PRJNA3"])
+    assert sorted(run.run_accession for run in result) == ["SRR1", "SRR2"]
+    # Only runs made public since a day before the last fetch are requested.
+    since = (fetched_at - timedelta(days=1)).date().isoformat()
+    assert ena_queries == [f"first_public>={since}"]
+    refreshed = cache.get_many(["PRJNA3"])["PRJNA3"]
+    assert refreshed.runs == {"SRR1", "SRR2"}
+    assert not refreshed.is_expired
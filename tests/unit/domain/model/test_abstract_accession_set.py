@@ -1,6 +1,8 @@
 import re
 
-from ffqf.domain.model import AbstractAccessionSet
+import pytest
+
+from ffqf.domain.model import AbstractAccessionSet, GEOSampleSet, GEOSeriesSet
 
 
 class ConcreteAccessionSet(AbstractAccessionSet):
@@ -32,3 +34,77 @@ def test_len():
     expected = ["foo", "bar"]
     acc_set = ConcreteAccessionSet.from_accessions(expected)
     assert len(acc_set) == 2
+
+
+def test_chunks():
+    acc_set = ConcreteAccessionSet.from_accessions(["foo", "bar", "baz", "qux", "quux"])
+    chunks = list(acc_set.chunks(2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert all(isinstance(chunk, ConcreteAccessionSet) for chunk in chunks)
+    assert [acc for chunk in chunks for acc in sorted(chunk)] == sorted(acc_set)
+
+
+class NumericAccessionSet(AbstractAccessionSet):
+
+    _validation_pattern = re.compile(r"^((SR|ER)R)(\d+)$", flags=re.ASCII)
+    _merge_threshold = 2
+
+
+def test_leading_zeros():
+    acc_set = NumericAccessionSet.from_accessions(["SRR000001", "SRR1", "SRR01"])
+    assert len(acc_set) == 3
+    assert set(acc_set) == {"SRR000001", "SRR1", "SRR01"}
+    assert "SRR001" not in acc_set
+
+
+def test_natural_order():
+    accessions = ["SRR10", "ERR5", "SRR9", "SRR2", "SRR2", "SRR11", "SRR1"]
+    acc_set = NumericAccessionSet.from_accessions(accessions)
+    assert list(acc_set) == ["ERR5", "SRR1", "SRR2", "SRR9", "SRR10", "SRR11"]
+    chunks = list(acc_set.chunks(4))
+    assert [list(chunk) for chunk in chunks] == [
+        ["ERR5", "SRR1", "SRR2", "SRR9"],
+        ["SRR10", "SRR11"],
+    ]
+
+
+def test_invalid():
+    acc_set = NumericAccessionSet()
+    with pytest.raises(ValueError):
+        acc_set.add("SRX1")
+    assert "SRX1" not in acc_set
+    assert 1 not in acc_set
+
+
+def test_difference():
+    acc_set = NumericAccessionSet.from_accessions(f"SRR{i}" for i in range(100))
+    other = NumericAccessionSet.from_accessions(f"SRR{i}" for i in range(50, 200))
+    expected = {f"SRR{i}" for i in range(50)}
+    assert acc_set.difference(other) == expected
+    assert acc_set.difference(set(other) | {"invalid"}) == expected
+    assert other.difference(acc_set) == {f"SRR{i}" for i in range(100, 200)}
+
+
+def test_update_and_eq():
+    acc_set = NumericAccessionSet.from_accessions(["SRR3", "SRR1"])
+    other = NumericAccessionSet.from_accessions(["SRR2"])
+    other.update(acc_set)
+    other.add("SRR1")
+    assert len(other) == 3
+    assert other == NumericAccessionSet.from_accessions(["SRR1", "SRR2", "SRR3"])
+    assert other != acc_set
+
+
+def test_update_merges_duplicates():
+    acc_set = NumericAccessionSet.from_accessions(f"SRR{i}" for i in range(0, 20, 2))
+    acc_set.update(f"SRR{i}" for i in range(10))
+    assert len(acc_set) == 15
+    assert list(acc_set) == [f"SRR{i}" for i in sorted({*range(0, 20, 2), *range(10)})]
+
+
+def test_update_validates_other_kinds():
+    series = GEOSeriesSet.from_accessions(["GSE1"])
+    with pytest.raises(ValueError):
+        series.update(GEOSampleSet.from_accessions(["GSM1"]))
+    series.update(GEOSeriesSet.from_accessions(["GSE2"]))
+    assert series == {"GSE1", "GSE2"}
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from ffqf.domain.model import FileDescription, RunInformation, URLType
+
+
+@pytest.fixture()
+def record() -> dict:
+    return {
+        "run_accession": "SRR390277",
+        "experiment_accession": "SRX110958",
+        "sample_accession": "SAMN00768039",
+        "secondary_sample_accession": "SRS281687",
+        "submission_accession": "SRA048649",
+        "study_accession": "PRJNA80291",
+        "secondary_study_accession": "SRP009896",
+        "library_layout": "PAIRED",
+        "read_count": "1031541",
+        "files": [
+            {
+                "name": "SRR390277",
+                "type": "sra",
+                "size": "205301853",
+                "md5": "6efb8bab3b3cba1ce0ab9b0da7bdb3d6",
+                "url": "s3://sra-pub-run-odp/sra/SRR390277/SRR390277",
+                "urltype": "aws",
+                "region": "us-east-1",
+            }
+        ],
+    }
+
+
+def test_from_record_equals_strict(record: dict):
+    trusted = RunInformation.from_record(record)
+    strict = RunInformation.from_record(record, strict=True)
+    assert trusted == strict
+    assert json.loads(trusted.json()) == json.loads(strict.json())
+
+
+def test_from_record_types(record: dict):
+    run = RunInformation.from_record(record)
+    (desc,) = run.files
+    assert isinstance(desc, FileDescription)
+    assert desc.size == 205301853
+    assert desc.urltype is URLType.AWS
+
+
+def test_from_record_interns(record: dict):
+    first = RunInformation.from_record(record)
+    second = RunInformation.from_record(
+        {key: "".join(value) for key, value in record.items() if key != "files"}
+    )
+    assert first.study_accession is second.study_accession
+    assert first.library_layout is second.library_layout
+    assert first.run_accession == second.run_accession
+
+
+def test_from_record_keeps_file_descriptions(record: dict):
+    desc = FileDescription.from_record(record["files"][0])
+    run = RunInformation.from_record({**record, "files": [desc]})
+    assert run.files[0] is desc
+
+
+def test_from_record_strict_rejects_invalid(record: dict):
+    del record["run_accession"]
+    with pytest.raises(ValueError):
+        RunInformation.from_record(record, strict=True)
@@ -0,0 +1,54 @@
+import httpx
+
+from ffqf.domain.model import INSDCRunSet, RunInformation, URLType
+from ffqf.infrastructure.application.service.ena_api_portal import (
+    ENAAPIPortalFileLinkService,
+)
+
+
+RECORD = {
+    "run_accession": "SRR1",
+    "fastq_ftp": "ftp.sra.ebi.ac.uk/vol1/fastq/SRR1/SRR1_1.fastq.gz;"
+    "ftp.sra.ebi.ac.uk/vol1/fastq/SRR1/SRR1_2.fastq.gz",
+    "fastq_md5": "aaa;bbb",
+    "fastq_bytes": "10;20",
+    "fastq_aspera": "fasp.sra.ebi.ac.uk:/vol1/fastq/SRR1/SRR1_1.fastq.gz;"
+    "fasp.sra.ebi.ac.uk:/vol1/fastq/SRR1/SRR1_2.fastq.gz",
+}
+
+
+def make_run(**kwargs) -> RunInformation:
+    return RunInformation(
+        experiment_accession="SRX1",
+        sample_accession="SAMN1",
+        secondary_sample_accession="SRS1",
+        submission_accession="SRA1",
+        study_accession="PRJNA1",
+        secondary_study_accession="SRP1",
+        **kwargs,
+    )
+
+
+def test_parse_run_information():
+    files = ENAAPIPortalFileLinkService.parse_run_information(make_run(**RECORD))
+    assert [(f.name, f.size, f.md5, f.urltype) for f in files] == [
+        ("SRR1_1.fastq.gz", 10, "aaa", URLType.FTP),
+        ("SRR1_1.fastq.gz", 10, "aaa", URLType.EBI),
+        ("SRR1_2.fastq.gz", 20, "bbb", URLType.FTP),
+        ("SRR1_2.fastq.gz", 20, "bbb", URLType.EBI),
+    ]
+    assert files[0].url == "ftp://ftp.sra.ebi.ac.uk/vol1/fastq/SRR1/SRR1_1.fastq.gz"
+    assert files[1].url == "fasp://fasp.sra.ebi.ac.uk/vol1/fastq/SRR1/SRR1_1.fastq.gz"
+
+
+def test_without_fastq():
+    run = make_run(run_accession="SRR2", fastq_ftp="", fastq_md5="", fastq_bytes="")
+    assert ENAAPIPortalFileLinkService.parse_run_information(run) == []
+
+
+def test_parse_file_links():
+    response = httpx.Response(
+        200, json=[RECORD], request=httpx.Request("POST", "https://ena/search")
+    )
+    links = ENAAPIPortalFileLinkService.parse_file_links(response, INSDCRunSet())
+    assert len(links["SRR1"]) == 4
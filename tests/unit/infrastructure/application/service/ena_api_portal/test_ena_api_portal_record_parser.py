@@ -0,0 +1,84 @@
+import json
+from typing import List
+
+import anyio
+import httpx
+import pytest
+
+from ffqf.infrastructure.application.service.ena_api_portal import (
+    ENAAPIPortalRecordParser,
+)
+
+
+RECORDS = [
+    {"run_accession": "SRR000001", "study_title": "Brackets [], braces {}, é"},
+    {"run_accession": "SRR000002", "study_title": 'Escaped \\"quote\\"'},
+]
+
+
+TSV = (
+    "run_accession\tstudy_title\n"
+    "SRR000001\tBrackets [], braces {}, é\n"
+    "SRR000002\tEscaped \\\"quote\\\"\n"
+)
+
+
+def parse(chunks: List[bytes], decode=ENAAPIPortalRecordParser.iter_json_records):
+    async def collect() -> List[dict]:
+        async def produce():
+            for chunk in chunks:
+                yield chunk
+
+        return [record async for record in decode(produce())]
+
+    return anyio.run(collect)
+
+
+def test_single_chunk():
+    assert parse([json.dumps(RECORDS).encode()]) == RECORDS
+
+
+def test_every_split():
+    body = json.dumps(RECORDS, ensure_ascii=False, indent=2).encode()
+    for split in range(len(body)):
+        assert parse([body[:split], body[split:]]) == RECORDS
+
+
+@pytest.mark.parametrize("body", [b"", b"[]", b" [ ] \n"])
+def test_empty(body: bytes):
+    assert parse([body]) == []
+
+
+@pytest.mark.parametrize("body", [b"[{}", b'{"a": 1}', b"[{}] x"])
+def test_invalid(body: bytes):
+    with pytest.raises(ValueError):
+        parse([body])
+
+
+def test_tsv_every_split():
+    body = TSV.encode()
+    for split in range(len(body)):
+        assert (
+            parse(
+                [body[:split], body[split:]],
+                ENAAPIPortalRecordParser.iter_tsv_records,
+            )
+            == RECORDS
+        )
+
+
+@pytest.mark.parametrize(
+    "body", [json.dumps(RECORDS).encode(), TSV.encode()], ids=["json", "tsv"]
+)
+def test_detect_format(body: bytes):
+    assert parse([b"", body], ENAAPIPortalRecordParser.iter_any_records) == RECORDS
+
+
+@pytest.mark.parametrize("body", [json.dumps(RECORDS), TSV], ids=["json", "tsv"])
+def test_parse_records(body: str):
+    response = httpx.Response(
+        status_code=200,
+        text=body,
+        request=httpx.Request("POST", "https://www.ebi.ac.uk/ena/portal/api/search"),
+    )
+    assert ENAAPIPortalRecordParser.parse_records(response) == RECORDS
@@ -0,0 +1,141 @@
+import gzip
+from pathlib import Path
+from typing import AsyncIterator, List
+
+import anyio
+import httpx
+
+from ffqf.infrastructure.application.service import FileCacheTransport
+
+
+ERROR_DOCUMENT = (
+    b"<eFetchResult><ERROR>Unable to obtain query #1</ERROR></eFetchResult>"
+)
+
+
+class ChunkedBody(httpx.AsyncByteStream):
+    def __init__(self, body: bytes, size: int) -> None:
+        self.body = body
+        self.size = size
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for start in range(0, len(self.body), self.size):
+            yield self.body[start : start + self.size]
+
+
+def make_client(tmp_path: Path, calls: List[httpx.Request], **kwargs):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if b"fail" in request.content:
+            return httpx.Response(500)
+        if b"error" in request.content:
+            # E-utilities report some errors with 200 OK, possibly across chunks.
+            return httpx.Response(200, stream=ChunkedBody(ERROR_DOCUMENT, size=20))
+        if b"gzip" in request.content:
+            return httpx.Response(
+                200,
+                headers={"Content-Encoding": "gzip"},
+                stream=ChunkedBody(gzip.compress(ERROR_DOCUMENT), size=20),
+            )
+        return httpx.Response(200, text=f"body{len(calls)}")
+
+    return httpx.AsyncClient(
+        base_url="https://example.org/",
+        transport=FileCacheTransport(
+            directory=tmp_path, transport=httpx.MockTransport(handler), **kwargs
+        ),
+    )
+
+
+def post(client: httpx.AsyncClient, accessions: str) -> str:
+    async def send() -> str:
+        response = await client.post(
+            "search", data={"result": "read_run", "accessions": accessions}
+        )
+        return response.text
+
+    return anyio.run(send)
+
+
+def test_cache_key_ignores_order():
+    client = httpx.Client(base_url="https://example.org/")
+    first = client.build_request("POST", "search", data={"a": "1", "id": "X,Y"})
+    second = client.build_request("POST", "search", data={"id": "Y,X", "a": "1"})
+    third = client.build_request("POST", "search", data={"id": "Y,Z", "a": "1"})
+    assert FileCacheTransport.cache_key(first) == FileCacheTransport.cache_key(second)
+    assert FileCacheTransport.cache_key(first) != FileCacheTransport.cache_key(third)
+
+
+def test_replay(tmp_path: Path):
+    calls = []
+    client = make_client(tmp_path, calls)
+    assert post(client, "SRR1,SRR2") == "body1"
+    assert post(client, "SRR2,SRR1") == "body1"
+    assert len(calls) == 1
+    # A new transport finds the previous entries on disk.
+    calls = []
+    client = make_client(tmp_path, calls)
+    assert post(client, "SRR1,SRR2") == "body1"
+    assert calls == []
+
+
+def test_errors_are_not_cached(tmp_path: Path):
+    calls = []
+    client = make_client(tmp_path, calls)
+    post(client, "fail")
+    post(client, "fail")
+    assert len(calls) == 2
+
+
+def test_error_documents_are_not_cached(tmp_path: Path):
+    calls = []
+    client = make_client(tmp_path, calls)
+    assert post(client, "error") == ERROR_DOCUMENT.decode()
+    assert post(client, "error") == ERROR_DOCUMENT.decode()
+    assert len(calls) == 2
+    assert list(tmp_path.glob("*.response")) == []
+
+
+def test_compressed_error_documents_are_not_cached(tmp_path: Path):
+    calls = []
+    client = make_client(tmp_path, calls)
+    assert post(client, "gzip") == ERROR_DOCUMENT.decode()
+    assert post(client, "gzip") == ERROR_DOCUMENT.decode()
+    assert len(calls) == 2
+    assert list(tmp_path.glob("*.response")) == []
+
+
+def test_cached_error_documents_are_discarded(tmp_path: Path):
+    calls = []
+    client = make_client(tmp_path, calls)
+    post(client, "SRR1")
+    (path,) = tmp_path.glob("*.response")
+    header, _ = path.read_bytes().split(b"\n", 1)
+    path.write_bytes(header + b"\n" + ERROR_DOCUMENT)
+    client = make_client(tmp_path, calls)
+    assert post(client, "SRR1") == "body2"
+    assert len(calls) == 2
+
+
+def test_cached_compressed_error_documents_are_discarded(tmp_path: Path):
+    calls = []
+    client = make_client(tmp_path, calls)
+    post(client, "SRR1")
+    (path,) = tmp_path.glob("*.response")
+    path.write_bytes(
+        b'{"status_code": 200, "headers": [["Content-Encoding", "gzip"]]}\n'
+        + gzip.compress(ERROR_DOCUMENT)
+    )
+    client = make_client(tmp_path, calls)
+    assert post(client, "SRR1") == "body2"
+    assert len(calls) == 2
+
+
+def test_eviction(tmp_path: Path):
+    calls = []
+    client = make_client(tmp_path, calls, max_size=1)
+    post(client, "SRR1")
+    post(client, "SRR2")
+    assert len(list(tmp_path.glob("*.response"))) == 1
+    assert post(client, "SRR2") == "body2"
+    assert post(client, "SRR1") == "body3"
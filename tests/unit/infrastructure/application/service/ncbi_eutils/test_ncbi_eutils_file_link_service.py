@@ -0,0 +1,104 @@
+from pathlib import Path
+
+import anyio
+import httpx
+import pytest
+
+from ffqf.domain.model import INSDCRunSet, URLType
+from ffqf.infrastructure.application.service import NCBIEutilsFileLinkService
+
+
+@pytest.fixture(scope="module")
+def efetch_response() -> httpx.Response:
+    return httpx.Response(
+        status_code=200,
+        content=(Path(__file__).parents[5] / "data" / "efetch.fcgi.xml").read_bytes(),
+        request=httpx.Request("POST", "https://eutils.ncbi.nlm.nih.gov/"),
+    )
+
+
+@pytest.fixture(scope="module")
+def run_set() -> INSDCRunSet:
+    return INSDCRunSet.from_accessions(["SRR390277", "SRR390278", "DRR171822"])
+
+
+def test_parse_file_links(efetch_response: httpx.Response, run_set: INSDCRunSet):
+    result = NCBIEutilsFileLinkService.parse_file_links(efetch_response, run_set)
+    assert set(result) == run_set
+    assert all(len(files) > 0 for files in result.values())
+    assert any(
+        desc.urltype is URLType.AWS for files in result.values() for desc in files
+    )
+
+
+def test_iter_file_links(efetch_response: httpx.Response, run_set: INSDCRunSet):
+    async def collect() -> dict:
+        return {
+            run: files
+            async for run, files in NCBIEutilsFileLinkService.iter_file_links(
+                efetch_response, run_set
+            )
+        }
+
+    expected = NCBIEutilsFileLinkService.parse_file_links(efetch_response, run_set)
+    assert anyio.run(collect) == expected
+
+
+def test_unexpected_root(run_set: INSDCRunSet):
+    response = httpx.Response(
+        status_code=200,
+        content=b"<eFetchResult><ERROR>Empty result</ERROR></eFetchResult>",
+        request=httpx.Request("POST", "https://eutils.ncbi.nlm.nih.gov/"),
+    )
+
+    async def collect() -> None:
+        async for _ in NCBIEutilsFileLinkService.iter_file_links(response, run_set):
+            pass
+
+    with pytest.raises(ValueError, match="eFetchResult"):
+        NCBIEutilsFileLinkService.parse_file_links(response, run_set)
+    with pytest.raises(ValueError, match="eFetchResult"):
+        anyio.run(collect)
+
+
+def make_response(content: bytes) -> httpx.Response:
+    return httpx.Response(
+        status_code=200,
+        content=content,
+        request=httpx.Request("POST", "https://eutils.ncbi.nlm.nih.gov/"),
+    )
+
+
+def test_alternatives_without_url(
+    efetch_response: httpx.Response, run_set: INSDCRunSet
+):
+    alternative = (
+        b'<Alternatives url="https://sra-pub-run-odp.s3.amazonaws.com/sra/SRR390277/'
+        b'SRR390277"'
+    )
+    assert alternative in efetch_response.content
+    response = make_response(
+        efetch_response.content.replace(alternative, b"<Alternatives")
+    )
+    expected = NCBIEutilsFileLinkService.parse_file_links(efetch_response, run_set)
+    result = NCBIEutilsFileLinkService.parse_file_links(response, run_set)
+    assert len(result["SRR390277"]) == len(expected["SRR390277"]) - 1
+    assert all(desc.url for files in result.values() for desc in files)
+
+
+@pytest.mark.parametrize("size", [b"", b' size="unknown"'])
+def test_invalid_size(
+    efetch_response: httpx.Response, run_set: INSDCRunSet, size: bytes
+):
+    response = make_response(
+        efetch_response.content.replace(b' size="725696469"', size)
+    )
+
+    async def collect() -> None:
+        async for _ in NCBIEutilsFileLinkService.iter_file_links(response, run_set):
+            pass
+
+    with pytest.raises(ValueError, match="size"):
+        NCBIEutilsFileLinkService.parse_file_links(response, run_set)
+    with pytest.raises(ValueError, match="size"):
+        anyio.run(collect)
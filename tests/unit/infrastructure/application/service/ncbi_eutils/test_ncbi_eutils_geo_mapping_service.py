@@ -0,0 +1,80 @@
+import anyio
+import httpx
+import pytest
+
+from ffqf.domain.model import GEOSeriesSet
+from ffqf.infrastructure.application.service import (
+    NCBIEutilsGEOMappingService,
+    NCBIEutilsRequestService,
+    NCBIEutilsSettings,
+)
+
+
+RESPONSES = {
+    "esearch.fcgi": """<eSearchResult>
+<Count>3</Count><IdList><Id>200033811</Id><Id>200000002</Id><Id>100001</Id></IdList>
+</eSearchResult>""",
+    "esummary.fcgi/gds": """<eSummaryResult>
+<DocSum><Id>200033811</Id><Item Name="Accession" Type="String">GSE33811</Item></DocSum>
+<DocSum><Id>200000002</Id><Item Name="Accession" Type="String">GSE2</Item></DocSum>
+<DocSum><Id>100001</Id><Item Name="Accession" Type="String">GPL1</Item></DocSum>
+</eSummaryResult>""",
+    "elink.fcgi": """<eLinkResult>
+<LinkSet><DbFrom>gds</DbFrom><IdList><Id>200033811</Id></IdList>
+<LinkSetDb><DbTo>sra</DbTo><LinkName>gds_sra</LinkName>
+<Link><Id>1</Id></Link><Link><Id>2</Id></Link></LinkSetDb></LinkSet>
+<LinkSet><DbFrom>gds</DbFrom><IdList><Id>200000002</Id></IdList></LinkSet>
+</eLinkResult>""",
+    "esummary.fcgi/sra": """<eSummaryResult>
+<DocSum><Id>1</Id><Item Name="Runs" Type="String">&lt;Run acc="SRR390277" \
+total_spots="1"/&gt;</Item></DocSum>
+<DocSum><Id>2</Id><Item Name="Runs" Type="String">&lt;Run acc="SRR390278" \
+total_spots="1"/&gt;&lt;Run acc="SRR390279" total_spots="1"/&gt;</Item></DocSum>
+</eSummaryResult>""",
+}
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    data = httpx.QueryParams(request.content.decode())
+    endpoint = request.url.path.rsplit("/", 1)[-1]
+    if endpoint == "esummary.fcgi":
+        endpoint = f"{endpoint}/{data['db']}"
+    if endpoint == "elink.fcgi":
+        assert data.get_list("id") == ["200033811", "200000002"]
+    return httpx.Response(200, text=RESPONSES[endpoint])
+
+
+def test_map_accessions():
+    service = NCBIEutilsRequestService(
+        settings=NCBIEutilsSettings(email="test@example.org", max_per_second=100),
+        transport=httpx.MockTransport(handler),
+    )
+
+    async def run():
+        async with service:
+            return await NCBIEutilsGEOMappingService.map_accessions(
+                service, GEOSeriesSet.from_accessions(["GSE33811", "GSE2", "GSE3"])
+            )
+
+    result = anyio.run(run)
+    assert result["GSE33811"] == {"SRR390277", "SRR390278", "SRR390279"}
+    assert result["GSE2"] == set()
+    assert result["GSE3"] == set()
+
+
+def test_malformed_response():
+    service = NCBIEutilsRequestService(
+        settings=NCBIEutilsSettings(email="test@example.org", max_per_second=100),
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, text="<eSearchResult><IdL")
+        ),
+    )
+
+    async def run():
+        async with service:
+            return await NCBIEutilsGEOMappingService.map_accessions(
+                service, GEOSeriesSet.from_accessions(["GSE33811"])
+            )
+
+    with pytest.raises(ValueError, match="Malformed"):
+        anyio.run(run)
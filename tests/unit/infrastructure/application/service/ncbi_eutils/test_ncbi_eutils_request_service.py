@@ -0,0 +1,51 @@
+import logging
+
+import anyio
+import httpx
+import pytest
+
+from ffqf.infrastructure.application.service import (
+    NCBIEutilsRequestService,
+    NCBIEutilsSettings,
+)
+
+
+API_KEY = "0123456789abcdef"
+
+
+def test_api_key_redacted(caplog: pytest.LogCaptureFixture):
+    statuses = [503, 404]
+    urls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        urls.append(str(request.url))
+        return httpx.Response(statuses.pop(0))
+
+    service = NCBIEutilsRequestService(
+        settings=NCBIEutilsSettings(
+            email="test@example.org",
+            api_key=API_KEY,
+            max_retries=1,
+            backoff_base=0.001,
+        ),
+        transport=httpx.MockTransport(handler),
+    )
+
+    async def run():
+        async with service:
+            request = service.client.build_request("POST", "efetch.fcgi")
+            async with service.stream(request) as response:
+                response.raise_for_status()
+
+    caplog.set_level(logging.DEBUG)
+    with pytest.raises(httpx.HTTPStatusError) as error:
+        anyio.run(run)
+    # The key is still sent but never shown.
+    assert all(API_KEY in url for url in urls)
+    assert "404" in str(error.value)
+    assert "efetch.fcgi" in str(error.value)
+    assert API_KEY not in str(error.value)
+    # The CLI keeps httpx's own request log quiet.
+    messages = [r.getMessage() for r in caplog.records if r.name.startswith("ffqf")]
+    assert any("Retry 1 of 1" in message for message in messages)
+    assert not any(API_KEY in message for message in messages)
@@ -0,0 +1,158 @@
+from typing import List
+
+import anyio
+import httpx
+import pytest
+
+from ffqf.application.service import IncompleteResponseError
+from ffqf.domain.model import INSDCRunSet, RunInformation
+from ffqf.infrastructure.application.service.ncbi_eutils import (
+    NCBIEutilsRunInformationService,
+)
+
+
+PACKAGE_SET = b"""<?xml version="1.0" encoding="UTF-8" ?>
+<EXPERIMENT_PACKAGE_SET>
+<EXPERIMENT_PACKAGE>
+  <EXPERIMENT accession="SRX1" alias="exp1">
+    <TITLE>An experiment</TITLE>
+    <STUDY_REF accession="SRP1"/>
+    <DESIGN>
+      <LIBRARY_DESCRIPTOR>
+        <LIBRARY_NAME>lib1</LIBRARY_NAME>
+        <LIBRARY_STRATEGY>WGS</LIBRARY_STRATEGY>
+        <LIBRARY_SOURCE>GENOMIC</LIBRARY_SOURCE>
+        <LIBRARY_SELECTION>RANDOM</LIBRARY_SELECTION>
+        <LIBRARY_LAYOUT><PAIRED/></LIBRARY_LAYOUT>
+      </LIBRARY_DESCRIPTOR>
+    </DESIGN>
+    <PLATFORM><ILLUMINA><INSTRUMENT_MODEL>NextSeq 500</INSTRUMENT_MODEL></ILLUMINA>
+    </PLATFORM>
+  </EXPERIMENT>
+  <SUBMISSION accession="SRA1"/>
+  <STUDY accession="SRP1" alias="study1">
+    <IDENTIFIERS>
+      <PRIMARY_ID>SRP1</PRIMARY_ID>
+      <EXTERNAL_ID namespace="BioProject">PRJNA1</EXTERNAL_ID>
+    </IDENTIFIERS>
+    <DESCRIPTOR><STUDY_TITLE>A study</STUDY_TITLE></DESCRIPTOR>
+  </STUDY>
+  <SAMPLE accession="SRS1" alias="sample1">
+    <IDENTIFIERS>
+      <PRIMARY_ID>SRS1</PRIMARY_ID>
+      <EXTERNAL_ID namespace="BioSample">SAMN1</EXTERNAL_ID>
+    </IDENTIFIERS>
+    <TITLE>A sample</TITLE>
+    <SAMPLE_NAME>
+      <TAXON_ID>562</TAXON_ID>
+      <SCIENTIFIC_NAME>Escherichia coli</SCIENTIFIC_NAME>
+    </SAMPLE_NAME>
+  </SAMPLE>
+  <RUN_SET>
+    <RUN accession="SRR1" alias="run1" total_spots="100" total_bases="30000">
+      <SRAFiles>
+        <SRAFile filename="SRR1" size="42" md5="abc">
+          <Alternatives url="https://sra-pub-run-odp.s3.amazonaws.com/sra/SRR1/SRR1"
+            org="AWS"/>
+        </SRAFile>
+      </SRAFiles>
+      <CloudFiles>
+        <CloudFile provider="s3" location="s3.us-east-1"/>
+      </CloudFiles>
+    </RUN>
+    <RUN accession="SRR2" alias="run2" total_spots="5" total_bases="500"/>
+  </RUN_SET>
+</EXPERIMENT_PACKAGE>
+</EXPERIMENT_PACKAGE_SET>
+"""
+
+
+def make_response(body: bytes) -> httpx.Response:
+    return httpx.Response(
+        200, content=body, request=httpx.Request("POST", "https://ncbi/efetch.fcgi")
+    )
+
+
+def make_run_set(*accessions: str) -> INSDCRunSet:
+    result = INSDCRunSet()
+    result.update(accessions)
+    return result
+
+
+def iter_run_info(response: httpx.Response, run_set: INSDCRunSet):
+    async def collect() -> List[RunInformation]:
+        return [
+            run
+            async for run in NCBIEutilsRunInformationService.iter_run_info(
+                response, run_set
+            )
+        ]
+
+    return anyio.run(collect)
+
+
+def test_parse_run_info():
+    (run,) = NCBIEutilsRunInformationService.parse_run_info(
+        make_response(PACKAGE_SET), make_run_set("SRR1")
+    )
+    assert run.run_accession == "SRR1"
+    assert run.experiment_accession == "SRX1"
+    assert run.study_accession == "PRJNA1"
+    assert run.secondary_study_accession == "SRP1"
+    assert run.sample_accession == "SAMN1"
+    assert run.secondary_sample_accession == "SRS1"
+    assert run.submission_accession == "SRA1"
+    assert run.read_count == "100"
+    assert run.base_count == "30000"
+    assert run.library_layout == "PAIRED"
+    assert run.instrument_platform == "ILLUMINA"
+    assert run.instrument_model == "NextSeq 500"
+    assert run.scientific_name == "Escherichia coli"
+    assert [(f.name, f.size, f.md5) for f in run.files] == [("SRR1", 42, "abc")]
+
+
+def test_iter_run_info():
+    runs = iter_run_info(make_response(PACKAGE_SET), make_run_set("SRR1", "SRR2"))
+    assert [run.run_accession for run in runs] == ["SRR1", "SRR2"]
+    assert runs[1].files == []
+
+
+def test_incomplete():
+    with pytest.raises(IncompleteResponseError) as error:
+        iter_run_info(make_response(PACKAGE_SET), make_run_set("SRR1", "SRR3"))
+    assert error.value.missing == {"SRR3"}
+
+
+def test_error_document():
+    response = make_response(b"<eFetchResult><ERROR>Oops</ERROR></eFetchResult>")
+    with pytest.raises(ValueError, match="eFetchResult"):
+        NCBIEutilsRunInformationService.parse_run_info(response, make_run_set("SRR1"))
+    with pytest.raises(ValueError, match="eFetchResult"):
+        iter_run_info(response, make_run_set("SRR1"))
+
+
+def test_package_without_design():
+    start = PACKAGE_SET.index(b"<DESIGN>")
+    end = PACKAGE_SET.index(b"</DESIGN>") + len(b"</DESIGN>")
+    body = PACKAGE_SET[:start] + PACKAGE_SET[end:]
+    (run,) = NCBIEutilsRunInformationService.parse_run_info(
+        make_response(body), make_run_set("SRR1")
+    )
+    assert run.library_layout is None
+    assert run.library_strategy is None
+
+
+@pytest.mark.parametrize(
+    "old, new, match",
+    [
+        (b'<SUBMISSION accession="SRA1"/>', b"", "SUBMISSION"),
+        (b'<SAMPLE accession="SRS1" alias', b"<SAMPLE alias", "accession"),
+        (b'<EXPERIMENT accession="SRX1"', b"<EXPERIMENT", "accession"),
+    ],
+)
+def test_truncated_package(old: bytes, new: bytes, match: str):
+    response = make_response(PACKAGE_SET.replace(old, new))
+    with pytest.raises(ValueError, match=match):
+        NCBIEutilsRunInformationService.parse_run_info(response, make_run_set("SRR1"))
+    with pytest.raises(ValueError, match=match):
+        iter_run_info(response, make_run_set("SRR1"))
@@ -0,0 +1,42 @@
+import csv
+from pathlib import Path
+
+from ffqf.domain.model import RunInformation
+from ffqf.infrastructure.application.service import RunInformationTableOutputWriter
+
+
+def make_run(accession: str, **kwargs) -> RunInformation:
+    return RunInformation(
+        run_accession=accession,
+        experiment_accession="SRX1",
+        sample_accession="SAMN1",
+        secondary_sample_accession="SRS1",
+        submission_accession="SRA1",
+        study_accession="PRJNA1",
+        secondary_study_accession="SRP1",
+        **kwargs,
+    )
+
+
+def test_header_covers_all_runs(tmp_path: Path):
+    output = tmp_path / "runs.tsv"
+    # Runs from different sources carry different additional fields.
+    RunInformationTableOutputWriter.write(
+        [
+            make_run("SRR1", read_count="100"),
+            make_run("SRR2", library_strategy="WGS"),
+        ],
+        output,
+    )
+    with output.open(newline="") as handle:
+        rows = list(csv.DictReader(handle, dialect="excel-tab"))
+    assert list(rows[0])[:2] == ["run_accession", "experiment_accession"]
+    assert list(rows[0])[-4:] == ["aws_files", "aws_md5", "gcp_files", "gcp_md5"]
+    assert [row["read_count"] for row in rows] == ["100", ""]
+    assert [row["library_strategy"] for row in rows] == ["", "WGS"]
+
+
+def test_empty(tmp_path: Path):
+    output = tmp_path / "runs.tsv"
+    RunInformationTableOutputWriter.write([], output)
+    assert output.read_text().startswith('"run_accession"\t')
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from ffqf.infrastructure.application.service import SQLiteMappingCache
+
+
+def test_round_trip(tmp_path: Path):
+    cache = SQLiteMappingCache(path=tmp_path / "cache.sqlite")
+    fetched_at = datetime(2022, 1, 2, tzinfo=timezone.utc)
+    cache.put_many(
+        {"PRJNA63661": {"SRR390277", "SRR390278"}, "SRX111814": set()},
+        fetched_at=fetched_at,
+    )
+    result = cache.get_many(["PRJNA63661", "SRX111814", "SRP003255"])
+    assert set(result) == {"PRJNA63661", "SRX111814"}
+    assert result["PRJNA63661"].runs == {"SRR390277", "SRR390278"}
+    assert result["PRJNA63661"].fetched_at == fetched_at
+    assert result["SRX111814"].runs == frozenset()
+
+
+def test_expired(tmp_path: Path):
+    cache = SQLiteMappingCache(path=tmp_path / "cache.sqlite", ttl=timedelta(days=1))
+    now = datetime.now(timezone.utc)
+    cache.put_many({"PRJNA63661": {"SRR390277"}}, fetched_at=now)
+    cache.put_many({"SRP003255": {"SRR390277"}}, fetched_at=now - timedelta(days=2))
+    result = cache.get_many(["PRJNA63661", "SRP003255"])
+    assert not result["PRJNA63661"].is_expired
+    assert result["SRP003255"].is_expired
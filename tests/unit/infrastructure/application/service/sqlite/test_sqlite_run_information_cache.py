@@ -0,0 +1,61 @@
+import json
+import sqlite3
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from ffqf.domain.model import FileDescription, INSDCRunSet, RunInformation, URLType
+from ffqf.infrastructure.application.service import SQLiteRunInformationCache
+
+
+@pytest.fixture()
+def run_info() -> RunInformation:
+    return RunInformation(
+        run_accession="SRR390277",
+        experiment_accession="SRX111814",
+        sample_accession="SAMN00764034",
+        secondary_sample_accession="SRS282569",
+        submission_accession="SRA045837",
+        study_accession="PRJNA63661",
+        secondary_study_accession="SRP003255",
+        library_strategy="ChIP-Seq",
+        files=[
+            FileDescription(
+                name="SRR390277",
+                type="sra",
+                size=1,
+                md5="d41d8cd98f00b204e9800998ecf8427e",
+                url="https://sra-pub-run-odp.s3.amazonaws.com/sra/SRR390277/SRR390277",
+                urltype=URLType.AWS,
+                region="us-east-1",
+            )
+        ],
+    )
+
+
+def test_round_trip(tmp_path: Path, run_info: RunInformation):
+    cache = SQLiteRunInformationCache(path=tmp_path / "cache.sqlite")
+    cache.put_many([run_info])
+    result = cache.get_many(INSDCRunSet.from_accessions(["SRR390277", "SRR390278"]))
+    assert result == [run_info]
+
+
+def test_expired(tmp_path: Path, run_info: RunInformation):
+    cache = SQLiteRunInformationCache(
+        path=tmp_path / "cache.sqlite", ttl=timedelta(seconds=-1)
+    )
+    cache.put_many([run_info])
+    assert cache.get_many(INSDCRunSet.from_accessions(["SRR390277"])) == []
+
+
+def test_strict_revalidates(tmp_path: Path, run_info: RunInformation):
+    path = tmp_path / "cache.sqlite"
+    SQLiteRunInformationCache(path=path).put_many([run_info])
+    data = json.loads(run_info.json())
+    del data["experiment_accession"]
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE run_information SET data = ?", [json.dumps(data)])
+    run_set = INSDCRunSet.from_accessions(["SRR390277"])
+    assert len(SQLiteRunInformationCache(path=path).get_many(run_set)) == 1
+    assert SQLiteRunInformationCache(path=path, strict=True).get_many(run_set) == []
@@ -0,0 +1,106 @@
+import gzip
+import json
+import time
+from pathlib import Path
+from typing import AsyncIterable, Iterable
+
+import anyio
+import pytest
+from anyio.streams.memory import MemoryObjectSendStream
+
+from ffqf.domain.model import RunInformation
+from ffqf.infrastructure.application.cli import (
+    OutputFormat,
+    iter_windows,
+    open_input,
+    peek_lines,
+    write_run_information,
+)
+
+
+class StaticApplication:
+    """Send one run per accession, like the application, without any requests."""
+
+    async def stream_windows(
+        self,
+        windows: AsyncIterable[Iterable[str]],
+        send_results: MemoryObjectSendStream,
+    ) -> None:
+        async with send_results:
+            async for accessions in windows:
+                for index, acc in enumerate(accessions):
+                    await send_results.send(
+                        RunInformation(
+                            run_accession=acc,
+                            experiment_accession=f"SRX{index}",
+                            sample_accession="SAMN1",
+                            secondary_sample_accession="SRS1",
+                            submission_accession="SRA1",
+                            study_accession="PRJNA1",
+                            secondary_study_accession="SRP1",
+                            study_title="A study\nspanning lines",
+                        )
+                    )
+
+
+def test_iter_windows():
+    lines = ["SRR1\n", "\n", " SRR2 \n", "SRR1\n", "SRR3\n", "SRR4"]
+    # Duplicates across windows are left to the application.
+    assert list(iter_windows(lines, size=3)) == [["SRR1", "SRR2", "SRR3"], ["SRR4"]]
+    assert list(iter_windows(lines, size=2))[1] == ["SRR1", "SRR3"]
+
+
+def test_iter_windows_max_delay():
+    def slow_input():
+        for line in ["SRR1", "SRR2", "SRR3"]:
+            time.sleep(0.02)
+            yield line
+
+    assert list(iter_windows(slow_input(), size=10)) == [["SRR1", "SRR2", "SRR3"]]
+    # A window is passed on once the delay has passed since its first accession.
+    assert list(iter_windows(slow_input(), size=10, max_delay=0.01)) == [
+        ["SRR1", "SRR2"],
+        ["SRR3"],
+    ]
+
+
+def test_peek_lines():
+    read = []
+
+    def slow_input():
+        for line in ["\n", "SRR1\n", "SRR2\n"]:
+            read.append(line)
+            yield line
+
+    lines = peek_lines(slow_input())
+    # Nothing beyond the first accession is read before retrieval starts.
+    assert read == ["\n", "SRR1\n"]
+    assert list(lines) == ["SRR1\n", "SRR2\n"]
+    assert peek_lines([" \n", "\n"]) is None
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_open_input(tmp_path: Path, compressed: bool):
+    path = tmp_path / "accessions.txt"
+    content = "SRR1\nPRJNA1\n"
+    if compressed:
+        with gzip.open(path, "wt") as handle:
+            handle.write(content)
+    else:
+        path.write_text(content)
+    with open_input(path) as handle:
+        assert list(iter_windows(handle, size=10)) == [["SRR1", "PRJNA1"]]
+
+
+def test_write_ndjson(tmp_path: Path):
+    output = tmp_path / "runs.ndjson"
+    windows = iter_windows(["SRR1", "SRR2", "SRR3"], size=2)
+    anyio.run(
+        write_run_information, StaticApplication(), windows, OutputFormat.NDJSON, output
+    )
+    lines = output.read_text().splitlines()
+    # Every line holds exactly one complete record.
+    records = [json.loads(line) for line in lines]
+    assert [record["run_accession"] for record in records] == ["SRR1", "SRR2", "SRR3"]
+    assert records[0]["study_title"] == "A study\nspanning lines"
+    assert records[0]["files"] == []